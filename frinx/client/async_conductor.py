@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import tempfile
+from types import TracebackType
+from typing import Any
+
+import aiohttp
+
+from frinx.client.conductor import BaseClient
+from frinx.client.conductor import RawHeaders
+from frinx.client.conductor import RawJsonIO
+from frinx.client.conductor import TaskClient
+from frinx.client.external_payload import DOWNLOAD_CHUNK_SIZE
+from frinx.client.external_payload import ExternalPayloadCache
+from frinx.client.external_payload import load_spooled_payload
+from frinx.common import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBaseClient:
+    """Asyncio counterpart of BaseClient, all requests share one pooled aiohttp session."""
+
+    def __init__(
+            self, base_url: str, base_resource: str, headers: RawHeaders = None, connection_limit: int = 100
+    ) -> None:
+        self.base_url = base_url
+        self.base_resource = base_resource
+        self.headers = BaseClient.merge_two_dicts(BaseClient.headers, dict(headers or {}))
+        self.connection_limit = connection_limit
+        self.session: aiohttp.ClientSession | None = None
+
+    async def open(self) -> None:
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.connection_limit)
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> AsyncBaseClient:
+        await self.open()
+        return self
+
+    async def __aexit__(
+            self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        await self.close()
+
+    async def get(self, res_path: str, query_params: dict[str, Any] | None = None) -> Any:
+        return await self.request('GET', f'{self.base_url}/{res_path}', query_params)
+
+    async def post(
+            self, res_path: str, query_params: dict[str, Any] | None,
+            body: RawJsonIO | None = None, headers: RawHeaders = None
+    ) -> Any:
+        return await self.request('POST', f'{self.base_url}/{res_path}', query_params, body, headers)
+
+    async def request(
+            self, method: str, url: str, query_params: dict[str, Any] | None = None,
+            body: RawJsonIO | None = None, headers: RawHeaders = None
+    ) -> Any:
+        await self.open()
+        assert self.session is not None
+
+        data = None
+        if body is not None:
+            data = json_codec.encode(body)
+
+        async with self.session.request(
+                method, url, params=query_params, data=data, headers=headers
+        ) as resp:
+            content = await resp.read()
+            if not resp.ok:
+                logger.error('ERROR: %s', content.decode('utf8', errors='replace'))
+                resp.raise_for_status()
+
+            if content == b'':
+                return None
+            if resp.content_type == 'application/json':
+                return json_codec.loads(content)
+            return content.decode('utf8')
+
+    def make_url(self, urlformat: str | None = None, *argv: Any) -> Any:
+        url = self.base_resource + '/'
+        if urlformat:
+            url += urlformat.format(*argv)
+        return url
+
+
+class AsyncTaskClient(AsyncBaseClient):
+    BASE_RESOURCE = TaskClient.BASE_RESOURCE
+    EXTERNAL_INPUT_KEY = TaskClient.EXTERNAL_INPUT_KEY
+
+    def __init__(self, base_url: str, headers: RawHeaders = None, connection_limit: int = 100) -> None:
+        AsyncBaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers, connection_limit)
+
+    async def update_task(self, task_obj: dict[str, Any]) -> Any:
+        url = self.make_url('')
+        headers = {'Accept': 'text/plain'}
+        await self.post(url, None, task_obj, headers)
+
+    async def poll_for_task(self, task_type: str, worker_id: str, domain: str | None = None) -> Any:
+        url = self.make_url('poll/{}', task_type)
+        params = {'workerid': worker_id}
+        if domain is not None:
+            params['domain'] = domain
+
+        try:
+            return await self.get(url, params)
+        except Exception as err:
+            logger.error('Error while polling %s', err)
+            return None
+
+    async def poll_for_batch(
+            self, task_type: str, count: int, timeout: int, worker_id: str, domain: str | None = None
+    ) -> Any:
+        url = self.make_url('poll/batch/{}', task_type)
+        params: dict[str, Any] = {'workerid': worker_id, 'count': count, 'timeout': timeout}
+
+        if domain is not None:
+            params['domain'] = domain
+
+        try:
+            return await self.get(url, params)
+        except Exception as err:
+            logger.error('Error while polling %s', err)
+            return None
+
+    async def get_task_input_external_payload_location(self, path: str) -> Any:
+        url = self.make_url('externalstoragelocation')
+        params = {'path': path, 'operation': 'READ', 'payloadType': 'TASK_INPUT'}
+        return await self.get(url, params)
+
+    async def get_external_payload(
+            self, uri: str, spool_size: int = 0, cache: ExternalPayloadCache | None = None,
+            cache_key: str | None = None
+    ) -> Any:
+        await self.open()
+        assert self.session is not None
+
+        async with self.session.get(uri) as resp:
+            resp.raise_for_status()
+            with tempfile.SpooledTemporaryFile(max_size=spool_size) as body:
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    body.write(chunk)
+                # Parsing and caching of a large payload would block the event loop
+                return await asyncio.to_thread(load_spooled_payload, body, cache, cache_key)  # type: ignore[arg-type]
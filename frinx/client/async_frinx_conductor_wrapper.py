@@ -0,0 +1,212 @@
+import asyncio
+import inspect
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+from frinx.client.async_conductor import AsyncTaskClient
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.frinx_conductor_wrapper import RawTaskIO
+from frinx.client.frinx_conductor_wrapper import RegisteredWorkerTask
+from frinx.common.telemetry.common import increment_external_payload_used
+from frinx.common.telemetry.common import increment_task_lease_extended
+from frinx.common.telemetry.common import record_task_in_flight
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncFrinxConductorWrapper(FrinxConductorWrapper):
+    """
+    Worker runtime executing every in-flight task as an asyncio task of one event loop.
+
+    Each registered task type is long-polled by its own coroutine, up to max_task_count tasks are executed
+    concurrently. Workers with 'async def execute' run directly on the event loop, workers with a blocking
+    execute are offloaded to the default thread pool executor of the loop. Raise batch_poll_size in settings,
+    so that a single poll request is able to claim more tasks of a busy task type.
+    """
+
+    def __init__(
+        self, server_url: str, max_task_count: int, polling_interval: float = 0.1,
+            worker_id: str | None = None, headers: dict[str, Any] | None = None,
+            settings: ConductorWrapperSettings | None = None
+    ) -> None:
+        super().__init__(server_url, max_task_count, polling_interval, worker_id, headers, settings)
+        self.async_task_client = AsyncTaskClient(server_url, headers, connection_limit=max_task_count)
+        self.free_slots = max_task_count
+        self.running_counts: dict[str, int] = defaultdict(int)
+        self.slot_released = asyncio.Condition()
+        self.running_tasks: set[asyncio.Task[None]] = set()
+
+    def start_workers(self) -> None:
+        asyncio.run(self.start_workers_async())
+
+    async def start_workers_async(self) -> None:
+        logger.info('Starting a long polling of %s task types', len(self.task_source.task_types_list))
+        async with self.async_task_client:
+            heartbeats = []
+            if self.settings.heartbeat_interval is not None:
+                heartbeats.append(self.send_heartbeats_async())
+            await asyncio.gather(
+                *heartbeats,
+                *[self.long_poll_task_type_async(task_type) for task_type in self.task_source.task_types_list]
+            )
+
+    async def send_heartbeats_async(self) -> None:
+        while True:
+            await asyncio.sleep(float(self.settings.heartbeat_interval or self.polling_interval))
+            in_flight_counts = self.in_flight.counts()
+            for task_type in self.task_source.task_types_list:
+                record_task_in_flight(self.metrics, task_type, in_flight_counts.get(task_type, 0))
+
+            for in_flight in self.in_flight.due_for_extension(self.settings.lease_extension_ratio):
+                lease_start = time.monotonic()
+                try:
+                    await self.async_task_client.update_task(self.lease_extension(in_flight))
+                except Exception:
+                    logger.error('Unable to extend a lease of a task %s', in_flight.task_id, exc_info=True)
+                    continue
+                self.in_flight.lease_extended(in_flight.task_id, lease_start)
+                increment_task_lease_extended(self.metrics, in_flight.task_type)
+
+    async def long_poll_task_type_async(self, task_type: str) -> None:
+        registered_task: RegisteredWorkerTask = self.task_source.task_types[task_type]
+        limit = registered_task.concurrency_limit
+        while True:
+            async with self.slot_released:
+                await self.slot_released.wait_for(
+                    lambda: self.free_slots > 0 and (limit is None or self.running_counts[task_type] < limit)
+                )
+                count = min(self.free_slots, self.settings.batch_poll_size)
+                if limit is not None:
+                    count = min(count, limit - self.running_counts[task_type])
+                # Slots are reserved while the poll is open, so pollers of other task types can not take them
+                self.free_slots -= count
+                self.running_counts[task_type] += count
+
+            reserved = count
+            count = self.rate_limiter.acquire(task_type, count)
+            if count == 0:
+                await self.release_slots(task_type, reserved)
+                await asyncio.sleep(self.rate_limiter.delay(task_type))
+                continue
+
+            polled_tasks: list[RawTaskIO] | None = None
+            try:
+                polled_tasks = await self.async_task_client.poll_for_batch(
+                    task_type, count, self.settings.long_poll_timeout, self.worker_id
+                )
+            finally:
+                await self.release_slots(task_type, reserved - len(polled_tasks or []))
+            # Pollers of other task types woken by the release take the slots before this one polls again
+            await asyncio.sleep(0)
+
+            if polled_tasks is None:
+                # Polling failed, do not flood the server with requests
+                await asyncio.sleep(float(self.polling_interval))
+                continue
+
+            for polled_task in polled_tasks:
+                running_task = asyncio.create_task(
+                    self.process_task_async(task_type, polled_task, registered_task.exec_function)
+                )
+                self.running_tasks.add(running_task)
+                running_task.add_done_callback(self.running_tasks.discard)
+
+    async def process_task_async(self, task_type: str, task: RawTaskIO, exec_function: Callable[[Any], Any]) -> None:
+        registered_task: RegisteredWorkerTask = self.task_source.task_types[task_type]
+        self.in_flight.add(task_type, task, registered_task.response_timeout_seconds)
+        try:
+            logger.info('Polled for a task %s of type %s', task['taskId'], task_type)
+
+            # Check if task input is externalized and if so, download the input
+            polled_task = await self.replace_external_payload_input_async(task)
+            if polled_task is None:
+                # Error replacing external payload
+                return
+
+            await self.execute_async(polled_task, exec_function)
+        finally:
+            self.in_flight.remove(task['taskId'])
+            await self.release_slots(task_type, 1)
+
+    async def release_slots(self, task_type: str, count: int) -> None:
+        """Give back slots reserved by a poll for tasks it did not return, or of a finished task."""
+        if count <= 0:
+            return
+        async with self.slot_released:
+            self.free_slots += count
+            self.running_counts[task_type] -= count
+            self.slot_released.notify_all()
+
+    async def replace_external_payload_input_async(self, task: RawTaskIO) -> RawTaskIO | None:
+        # No external payload placeholder present, just return original task
+        if self.async_task_client.EXTERNAL_INPUT_KEY not in task:
+            return task
+
+        location = {}
+        try:
+            # Get the exact uri from conductor where the payload is stored
+            location = await self.async_task_client.get_task_input_external_payload_location(
+                task[self.async_task_client.EXTERNAL_INPUT_KEY]
+            )
+            if location is None:
+                location = {}
+
+            if 'uri' not in location:
+                raise Exception('Unexpected output for external payload location: %s' % location)
+
+            # Replace placeholder with real output
+            path = task.pop(self.async_task_client.EXTERNAL_INPUT_KEY)
+            task['inputData'] = await self.download_external_payload_async(path, location['uri'])
+            increment_external_payload_used(self.metrics, str(task.get('taskType')), 'READ', 'TASK_INPUT')
+            return task
+
+        except Exception:
+            logger.error(
+                'Unable to download external task input: %s for path: %s',
+                task['taskId'],
+                location,
+                exc_info=True,
+            )
+            await self.handle_task_exception_async(task)
+            return None
+
+    async def download_external_payload_async(self, path: str, uri: str) -> Any:
+        if self.payload_cache is not None:
+            payload = await asyncio.to_thread(self.payload_cache.load, path)
+            if payload is not None:
+                logger.debug('External payload %s read from the cache', path)
+                return payload
+
+        return await self.async_task_client.get_external_payload(
+            uri, self.settings.external_payload_spool_size, self.payload_cache, path
+        )
+
+    async def execute_async(self, task: RawTaskIO, exec_function: Callable[[Any], Any]) -> None:
+        try:
+            logger.info('Executing a task %s', task['taskId'])
+            if inspect.iscoroutinefunction(exec_function):
+                resp = await exec_function(task)
+            else:
+                resp = await asyncio.to_thread(exec_function, task)
+            self.apply_task_response(task, resp)
+            await self.report_task_result_async(task)
+        except Exception:
+            await self.handle_task_exception_async(task)
+
+    async def report_task_result_async(self, task: RawTaskIO) -> None:
+        # Large outputs are uploaded to external payload storage by a blocking client
+        task_result = await asyncio.to_thread(self.prepare_task_result, task)
+        await self.async_task_client.update_task(task_result)
+
+    async def handle_task_exception_async(self, task: RawTaskIO) -> None:
+        self.apply_task_failure(task)
+        try:
+            await self.report_task_result_async(task)
+        except Exception:
+            logger.error(
+                'Unable to update a task %s, it may have timed out', task['taskId'], exc_info=True
+            )
@@ -0,0 +1,134 @@
+import threading
+from dataclasses import dataclass
+from dataclasses import field
+from enum import Enum
+
+from pydantic import BaseModel
+from pydantic import Field
+
+from frinx.common.telemetry.common import record_task_concurrency_limit
+from frinx.common.telemetry.metrics import Metrics
+
+# Baseline latencies follow longer latencies with this smoothing factor, so a lasting change of the backend
+# is accepted after a while instead of keeping the limit at its minimum forever
+BASELINE_ALPHA = 0.05
+# Baseline latencies are clamped to this minimum, so jitter of instant requests is not taken as an overload
+MIN_BASELINE_LATENCY = 0.01
+
+
+class LatencyStage(str, Enum):
+    POLL = 'POLL'
+    EXECUTE = 'EXECUTE'
+    UPDATE = 'UPDATE'
+
+
+class AdaptiveConcurrencySettings(BaseModel):
+    # Limit of a task type is adjusted after every window of this count of samples of the task type
+    window: int = Field(default=30, ge=1)
+    # Limit grows by this step after a window without an overload
+    increase: float = Field(default=1.0, gt=0)
+    # Limit is multiplied by this factor after a window with an overload
+    decrease_factor: float = Field(default=0.5, gt=0, lt=1)
+    # Window with a larger fraction of failed samples is an overload
+    error_threshold: float = Field(default=0.1, ge=0, le=1)
+    # Window with an average latency of some stage longer than this multiple of its baseline is an overload
+    latency_tolerance: float = Field(default=2.0, gt=1)
+    # Bounds of limits, the maximal limit defaults to the size of the thread pool of a task type
+    min_limit: int = Field(default=1, ge=1)
+    max_limit: int | None = Field(default=None, ge=1)
+
+
+@dataclass
+class TaskTypeLimit:
+    limit: float
+    max_limit: int
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # Latency sums and sample counts of the current window per stage
+    latency_sums: dict[LatencyStage, float] = field(default_factory=dict)
+    latency_counts: dict[LatencyStage, int] = field(default_factory=dict)
+    # Latency of a stage without an overload, the fastest window average seen, drifting towards later ones
+    baselines: dict[LatencyStage, float] = field(default_factory=dict)
+    samples: int = 0
+    errors: int = 0
+
+
+class AdaptiveConcurrencyController:
+    """
+    Finds the count of tasks of each type the backend handles without slowing down, using AIMD.
+
+    Latencies and failures of polls, executions and result updates of a task type are collected in windows.
+    After a window with too many failures or with an average latency of some stage well above its baseline,
+    the limit of the task type is cut by a factor, otherwise it grows by a constant step. A slow Uniconfig
+    or Conductor therefore gets fewer concurrent requests quickly and the limit probes for more capacity
+    slowly once the backend recovers. Limits are kept per task type under the lock of the task type and
+    exported as gauges.
+    """
+
+    def __init__(self, metrics: Metrics, settings: AdaptiveConcurrencySettings | None = None) -> None:
+        self.metrics = metrics
+        self.settings = settings or AdaptiveConcurrencySettings()
+        self.limits: dict[str, TaskTypeLimit] = {}
+
+    def register_task_type(self, task_type: str, max_limit: int) -> None:
+        """Limits start at their maximum, so the worker is not slowed down until an overload is seen."""
+        max_limit = max(self.settings.max_limit or max_limit, self.settings.min_limit)
+        self.limits[task_type] = TaskTypeLimit(limit=float(max_limit), max_limit=max_limit)
+        record_task_concurrency_limit(self.metrics, task_type, max_limit)
+
+    def limit(self, task_type: str, concurrency_limit: int | None = None) -> int | None:
+        """Adaptive limit of a task type lowered to its static concurrency_limit, None for no limit."""
+        task_type_limit = self.limits.get(task_type)
+        if task_type_limit is None:
+            return concurrency_limit
+        limit = int(task_type_limit.limit)
+        return limit if concurrency_limit is None else min(limit, concurrency_limit)
+
+    def record(self, task_type: str, stage: LatencyStage, latency: float | None, failed: bool = False) -> None:
+        """Record a sample of a task type, latency is None for samples counted only as successes or failures."""
+        task_type_limit = self.limits.get(task_type)
+        if task_type_limit is None:
+            return
+
+        with task_type_limit.lock:
+            if latency is not None:
+                task_type_limit.latency_sums[stage] = task_type_limit.latency_sums.get(stage, 0.0) + latency
+                task_type_limit.latency_counts[stage] = task_type_limit.latency_counts.get(stage, 0) + 1
+            task_type_limit.samples += 1
+            if failed:
+                task_type_limit.errors += 1
+            if task_type_limit.samples < self.settings.window:
+                return
+            previous_limit = int(task_type_limit.limit)
+            limit = self.adjust(task_type_limit)
+
+        if limit != previous_limit:
+            record_task_concurrency_limit(self.metrics, task_type, limit)
+
+    def adjust(self, task_type_limit: TaskTypeLimit) -> int:
+        """Adjust the limit at the end of a window and start a new one, called under the lock of the task type."""
+        overloaded = task_type_limit.errors > self.settings.error_threshold * task_type_limit.samples
+
+        for stage, latency_sum in task_type_limit.latency_sums.items():
+            latency = latency_sum / task_type_limit.latency_counts[stage]
+            baseline = task_type_limit.baselines.get(stage)
+            if baseline is None or latency < baseline:
+                task_type_limit.baselines[stage] = latency
+                continue
+            if latency > max(baseline, MIN_BASELINE_LATENCY) * self.settings.latency_tolerance:
+                overloaded = True
+            task_type_limit.baselines[stage] = baseline + BASELINE_ALPHA * (latency - baseline)
+
+        if overloaded:
+            task_type_limit.limit = max(
+                task_type_limit.limit * self.settings.decrease_factor, float(self.settings.min_limit)
+            )
+        else:
+            task_type_limit.limit = min(
+                task_type_limit.limit + self.settings.increase, float(task_type_limit.max_limit)
+            )
+
+        task_type_limit.latency_sums = {}
+        task_type_limit.latency_counts = {}
+        task_type_limit.samples = 0
+        task_type_limit.errors = 0
+        return int(task_type_limit.limit)
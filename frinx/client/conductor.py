@@ -14,51 +14,119 @@
 #  limitations under the License.
 #
 
-import json
 import socket
+from dataclasses import dataclass
 from typing import Any
 from typing import TypeAlias
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from frinx.common import json_codec
 
 hostname = socket.gethostname()
 
 RawJsonIO: TypeAlias = dict[str, Any]
 RawHeaders: TypeAlias = dict[str, Any] | None
+Timeout: TypeAlias = float | tuple[float, float] | None
+
+# Connect and read timeouts in seconds, the read timeout has to outlast long-poll requests
+DEFAULT_TIMEOUT = (5.0, 30.0)
+DEFAULT_POOL_SIZE = 10
+
+
+@dataclass
+class ConnectionStats:
+    request_count: int = 0
+    connection_count: int = 0
+
+    @property
+    def reused_count(self) -> int:
+        """Count of requests sent over an already open keep-alive connection."""
+        return self.request_count - self.connection_count
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTP adapter keeping up to pool_size keep-alive connections per host and counting their reuse."""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE) -> None:
+        # Threads above pool_size open extra connections instead of blocking, those are not kept alive
+        super().__init__(pool_maxsize=pool_size, pool_block=False)
+
+    def connection_stats(self) -> ConnectionStats:
+        stats = ConnectionStats()
+        # Container of pools supports only a snapshot of keys, not an iteration
+        for key in self.poolmanager.pools.keys():  # noqa: SIM118
+            pool = self.poolmanager.pools.get(key)
+            if pool is not None:
+                stats.request_count += pool.num_requests
+                stats.connection_count += pool.num_connections
+        return stats
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def resize_session(session: requests.Session, pool_size: int) -> None:
+    """Keep up to pool_size keep-alive connections per host, connections of the previous adapter are closed."""
+    previous = session.get_adapter('http://')
+    adapter = PooledHTTPAdapter(pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    previous.close()
 
 
 class BaseClient:
     print_url = False
     headers: dict[str, Any] = {'Content-Type': 'application/json', 'Accept': 'application/json'}
 
-    def __init__(self, base_url: str, base_resource: str, headers: RawHeaders = None) -> None:
+    def __init__(
+            self, base_url: str, base_resource: str, headers: RawHeaders = None,
+            session: requests.Session | None = None, timeout: Timeout = DEFAULT_TIMEOUT
+    ) -> None:
         self.base_url = base_url
         self.base_resource = base_resource
         if headers is not None:
             self.headers = self.merge_two_dicts(self.headers, headers)
+        # Clients of one WFClientMgr share a session and so a pool of keep-alive connections
+        self.session = session or create_session()
+        self.timeout = timeout
+
+    def connection_stats(self) -> ConnectionStats:
+        adapter = self.session.get_adapter(self.base_url)
+        if isinstance(adapter, PooledHTTPAdapter):
+            return adapter.connection_stats()
+        return ConnectionStats()
 
     def get(self, res_path: str, query_params: Any | None = None) -> Any:
         the_url = f'{self.base_url}/{res_path}'
-        resp = requests.get(the_url, params=query_params, headers=self.headers)
+        resp = self.session.get(the_url, params=query_params, headers=self.headers, timeout=self.timeout)
         self.__check_for_success(resp)
         if resp.content == b'':
             return None
         else:
-            return resp.json()
+            return json_codec.loads(resp.content)
 
     def post(
             self, res_path: str, query_params: dict[str, Any] | None,
-            body: RawJsonIO | None = None, headers: RawHeaders = None
+            body: RawJsonIO | list[RawJsonIO] | None = None, headers: RawHeaders = None
     ) -> Any:
         the_url = f'{self.base_url}/{res_path}'
         the_header = self.headers
         if headers is not None:
             the_header = self.merge_two_dicts(self.headers, headers)
         if body is not None:
-            json_body = json.dumps(body, ensure_ascii=False).encode('utf8')
-            resp = requests.post(the_url, params=query_params, data=json_body, headers=the_header)
+            json_body = json_codec.encode(body)
+            resp = self.session.post(
+                the_url, params=query_params, data=json_body, headers=the_header, timeout=self.timeout
+            )
         else:
-            resp = requests.post(the_url, params=query_params, headers=the_header)
+            resp = self.session.post(the_url, params=query_params, headers=the_header, timeout=self.timeout)
 
         self.__check_for_success(resp)
         return self.__return(resp, the_header)
@@ -73,17 +141,19 @@ class BaseClient:
             the_header = self.merge_two_dicts(self.headers, headers)
 
         if body is not None:
-            json_body = json.dumps(body, ensure_ascii=False).encode('utf8')
-            resp = requests.put(the_url, params=query_params, data=json_body, headers=the_header)
+            json_body = json_codec.encode(body)
+            resp = self.session.put(
+                the_url, params=query_params, data=json_body, headers=the_header, timeout=self.timeout
+            )
         else:
-            resp = requests.put(the_url, params=query_params, headers=the_header)
+            resp = self.session.put(the_url, params=query_params, headers=the_header, timeout=self.timeout)
 
         self.__print(resp)
         return self.__return(resp, the_header)
 
     def delete(self, res_path: str, query_params: Any) -> Any:
         the_url = f'{self.base_url}/{res_path}'
-        resp = requests.delete(the_url, params=query_params, headers=self.headers)
+        resp = self.session.delete(the_url, params=query_params, headers=self.headers, timeout=self.timeout)
         self.__print(resp)
         return self.__check_for_success(resp)
 
@@ -114,7 +184,7 @@ class BaseClient:
             if header['Accept'] == 'text/plain':
                 retval = resp.text
             elif header['Accept'] == 'application/json':
-                retval = resp.json()
+                retval = json_codec.loads(resp.content)
             else:
                 retval = resp.text
         return retval
@@ -131,8 +201,11 @@ class BaseClient:
 class MetadataClient(BaseClient):
     BASE_RESOURCE = 'metadata'
 
-    def __init__(self, base_url: str, headers: RawHeaders = None) -> None:
-        BaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers)
+    def __init__(
+            self, base_url: str, headers: RawHeaders = None,
+            session: requests.Session | None = None, timeout: Timeout = DEFAULT_TIMEOUT
+    ) -> None:
+        BaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers, session, timeout)
 
     def get_workflow_def(self, wf_name: str, version: int | None = None) -> Any:
         url = self.make_url('workflow/{}', wf_name)
@@ -158,7 +231,7 @@ class MetadataClient(BaseClient):
         url = self.make_url('taskdefs/{}', td_name)
         return self.get(url)
 
-    def register_task_defs(self, list_of_task_def_obj: RawJsonIO) -> Any:
+    def register_task_defs(self, list_of_task_def_obj: list[RawJsonIO]) -> Any:
         url = self.make_url('taskdefs')
         return self.post(url, None, list_of_task_def_obj)
 
@@ -179,8 +252,11 @@ class TaskClient(BaseClient):
     BASE_RESOURCE = 'tasks'
     EXTERNAL_INPUT_KEY = 'externalInputPayloadStoragePath'
 
-    def __init__(self, base_url: str, headers: RawHeaders = None) -> None:
-        BaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers)
+    def __init__(
+            self, base_url: str, headers: RawHeaders = None,
+            session: requests.Session | None = None, timeout: Timeout = DEFAULT_TIMEOUT
+    ) -> None:
+        BaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers, session, timeout)
 
     def get_task(self, task_id: str) -> Any:
         url = self.make_url('{}', task_id)
@@ -227,17 +303,30 @@ class TaskClient(BaseClient):
         params = {'taskType': task_type}
         return self.get(url, params)
 
+    def get_task_queue_sizes(self, task_types: list[str]) -> Any:
+        url = self.make_url('queue/sizes')
+        params = {'taskType': task_types}
+        return self.get(url, params)
+
     def get_task_input_external_payload_location(self, path: str) -> Any:
         url = self.make_url('externalstoragelocation')
         params = {'path': path, 'operation': 'READ', 'payloadType': 'TASK_INPUT'}
         return self.get(url, params)
 
+    def get_task_output_external_payload_location(self, path: str = '') -> Any:
+        url = self.make_url('externalstoragelocation')
+        params = {'path': path, 'operation': 'WRITE', 'payloadType': 'TASK_OUTPUT'}
+        return self.get(url, params)
+
 
 class WorkflowClient(BaseClient):
     BASE_RESOURCE = 'workflow'
 
-    def __init__(self, base_url: str, headers: dict[str, Any] | None = None):
-        BaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers)
+    def __init__(
+            self, base_url: str, headers: dict[str, Any] | None = None,
+            session: requests.Session | None = None, timeout: Timeout = DEFAULT_TIMEOUT
+    ):
+        BaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers, session, timeout)
 
     def get_workflow(self, wf_id: str, include_tasks: bool = True) -> Any:
         url = self.make_url('{}', wf_id)
@@ -293,8 +382,11 @@ class WorkflowClient(BaseClient):
 class EventServicesClient(BaseClient):
     BASE_RESOURCE = 'event'
 
-    def __init__(self, base_url: str, headers: RawHeaders = None) -> None:
-        BaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers)
+    def __init__(
+            self, base_url: str, headers: RawHeaders = None,
+            session: requests.Session | None = None, timeout: Timeout = DEFAULT_TIMEOUT
+    ) -> None:
+        BaseClient.__init__(self, base_url, self.BASE_RESOURCE, headers, session, timeout)
 
     def get_event_handler_def(self, event: str, active_only: bool = True) -> Any:
         url = self.make_url('{}', event)
@@ -327,7 +419,11 @@ class EventServicesClient(BaseClient):
 
 
 class WFClientMgr:
-    def __init__(self, server_url: str = 'http://localhost:8080/api/', headers: dict[str, Any] | None = None) -> None:
-        self.workflow_client = WorkflowClient(server_url, headers)
-        self.task_client = TaskClient(server_url, headers)
-        self.metadata_client = MetadataClient(server_url, headers)
+    def __init__(
+            self, server_url: str = 'http://localhost:8080/api/', headers: dict[str, Any] | None = None,
+            pool_size: int = DEFAULT_POOL_SIZE, timeout: Timeout = DEFAULT_TIMEOUT
+    ) -> None:
+        self.session = create_session(pool_size)
+        self.workflow_client = WorkflowClient(server_url, headers, self.session, timeout)
+        self.task_client = TaskClient(server_url, headers, self.session, timeout)
+        self.metadata_client = MetadataClient(server_url, headers, self.session, timeout)
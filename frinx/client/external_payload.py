@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import IO
+from typing import Any
+
+import requests
+
+from frinx.common import json_codec
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Names of cached files and of files still being written
+CACHE_FILE_NAME = re.compile(r'[0-9a-f]{64}(\.[0-9a-f]{32}\.part)?')
+
+
+class ExternalPayloadCache:
+    """
+    Bounded on-disk LRU cache of downloaded external payloads, keyed by their storage path.
+
+    Retried tasks refer to the same externalInputPayloadStoragePath, so their input is read from a local
+    file instead of being downloaded again. Least recently used payloads are deleted once the total size of
+    cached files exceeds max_size bytes. Files are kept in a new temporary directory unless directory is set.
+
+    The temporary directory is removed when the cache is garbage collected or the interpreter exits. Cached
+    files left in a set directory by a previous process can not be loaded anymore, they are removed before
+    the directory is used.
+    """
+
+    def __init__(self, max_size: int, directory: str | None = None) -> None:
+        self.max_size = max_size
+        self.directory = directory
+        self.directory_ready = False
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self.size = 0
+
+    def get_directory(self) -> str:
+        with self.lock:
+            if self.directory is None:
+                self.directory = tempfile.mkdtemp(prefix='frinx-external-payload-')
+                weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+                self.directory_ready = True
+            elif not self.directory_ready:
+                os.makedirs(self.directory, exist_ok=True)
+                self.remove_stale_files(self.directory)
+                self.directory_ready = True
+            return self.directory
+
+    @staticmethod
+    def remove_stale_files(directory: str) -> None:
+        for file_name in os.listdir(directory):
+            if CACHE_FILE_NAME.fullmatch(file_name):
+                try:
+                    os.remove(os.path.join(directory, file_name))
+                except OSError:
+                    logger.warning('Unable to remove stale external payload %s', file_name, exc_info=True)
+
+    def load(self, path: str) -> Any | None:
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None:
+                return None
+            self.entries.move_to_end(path)
+            # Opened under the lock, an evicted file stays readable until it is closed
+            payload_file = open(entry[0], 'rb')
+
+        with payload_file:
+            return json_codec.loads(payload_file.read())
+
+    def store(self, path: str, payload: IO[bytes], size: int) -> None:
+        if size > self.max_size:
+            return
+
+        directory = self.get_directory()
+        file_name = os.path.join(directory, hashlib.sha256(path.encode('utf8')).hexdigest())
+        part_file_name = f'{file_name}.{uuid.uuid4().hex}.part'
+        with open(part_file_name, 'wb') as part_file:
+            shutil.copyfileobj(payload, part_file)
+        os.replace(part_file_name, file_name)
+
+        with self.lock:
+            previous = self.entries.pop(path, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self.entries[path] = (file_name, size)
+            self.size += size
+
+            while self.size > self.max_size:
+                _, (evicted_file_name, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                try:
+                    os.remove(evicted_file_name)
+                except OSError:
+                    logger.warning('Unable to remove cached external payload %s', evicted_file_name, exc_info=True)
+
+
+def download_payload(
+        session: requests.Session, uri: str, headers: dict[str, Any] | None = None,
+        timeout: Any = None, spool_size: int = 0, cache: ExternalPayloadCache | None = None,
+        cache_key: str | None = None
+) -> Any:
+    """
+    Stream a JSON payload from uri into a temporary file and parse it from there.
+
+    Bodies up to spool_size bytes stay in memory, larger ones are spooled to disk while downloading instead
+    of being buffered by the response. The downloaded body is stored in cache under cache_key.
+
+    Spooling bounds only the memory of the download. The JSON codecs parse whole documents, so the body is
+    read back into memory at once for parsing and the payload has to fit into memory together with its body.
+    """
+    with session.get(uri, headers=headers, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        with tempfile.SpooledTemporaryFile(max_size=spool_size) as body:
+            for chunk in resp.iter_content(DOWNLOAD_CHUNK_SIZE):
+                body.write(chunk)
+            return load_spooled_payload(body, cache, cache_key)  # type: ignore[arg-type]
+
+
+def load_spooled_payload(
+        body: IO[bytes], cache: ExternalPayloadCache | None = None, cache_key: str | None = None
+) -> Any:
+    """Parse a JSON payload written to body and store it in cache, body is positioned at its end.
+
+    The whole body is read into memory for parsing, see download_payload.
+    """
+    size = body.tell()
+    body.seek(0)
+    payload = json_codec.loads(body.read())
+
+    if cache is not None and cache_key is not None:
+        body.seek(0)
+        cache.store(cache_key, body, size)
+    return payload
@@ -1,6 +1,9 @@
+import asyncio
 import copy
-import json
+import inspect
 import logging
+import queue
+import signal
 import socket
 import sys
 import threading
@@ -8,15 +11,47 @@ import time
 import traceback
 import uuid
 from collections import defaultdict
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
+from enum import Enum
+from functools import partial
+from queue import SimpleQueue
 from threading import Thread
+from types import FrameType
 from typing import Any
 from typing import TypeAlias
 
 import requests
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import validator
 
+from frinx.client.concurrency_controller import AdaptiveConcurrencyController
+from frinx.client.concurrency_controller import AdaptiveConcurrencySettings
+from frinx.client.concurrency_controller import LatencyStage
 from frinx.client.conductor import WFClientMgr
+from frinx.client.conductor import resize_session
+from frinx.client.external_payload import ExternalPayloadCache
+from frinx.client.external_payload import download_payload
+from frinx.client.in_flight import InFlightRegistry
+from frinx.client.in_flight import InFlightTask
+from frinx.client.process_pool import TaskProcessPool
+from frinx.client.rate_limiter import EndpointRateLimitSettings
+from frinx.client.rate_limiter import RateLimiter
+from frinx.client.result_reporter import TaskResultReporter
+from frinx.client.task_scheduler import WeightedFairScheduler
+from frinx.common import json_codec
+from frinx.common.telemetry.common import increment_external_payload_used
+from frinx.common.telemetry.common import increment_task_lease_extended
+from frinx.common.telemetry.common import increment_thread_pool_saturated
+from frinx.common.telemetry.common import increment_thread_pool_scaled
+from frinx.common.telemetry.common import record_task_in_flight
+from frinx.common.telemetry.common import record_task_result_payload_size
+from frinx.common.telemetry.common import record_thread_pool_busy
+from frinx.common.telemetry.common import record_thread_pool_threads
+from frinx.common.telemetry.metrics import Metrics
+from frinx.common.worker.task_def import ExecutionBackend
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +68,12 @@ DEFAULT_TASK_DEFINITION = {
 
 hostname = socket.gethostname()
 
+# Count of task types asked for in a single batched queue size request, keeps the query string short
+QUEUE_SIZES_CHUNK = 100
+
+# Name of the pool of consumer threads executing task types not assigned to any thread pool
+SHARED_POOL = 'shared'
+
 RawTaskIO: TypeAlias = dict[str, Any]
 
 
@@ -40,6 +81,170 @@ RawTaskIO: TypeAlias = dict[str, Any]
 class RegisteredWorkerTask:
     task_type: str
     exec_function: Callable[[Any], Any]
+    # Maximal count of tasks of this type executed at once by this worker, None for no limit
+    concurrency_limit: int | None = None
+    # Claimed tasks have to start before this timeout of Conductor expires, None for no limit
+    response_timeout_seconds: float | None = None
+
+
+class DispatchMode(str, Enum):
+    # Scan depths of all queues every polling interval and poll only non-empty queues
+    QUEUE_SCAN = 'QUEUE_SCAN'
+    # Keep a long-poll request open for every registered task type
+    LONG_POLL = 'LONG_POLL'
+
+
+class ThreadPoolSettings(BaseModel):
+    # Maximal count of consumer threads of the pool
+    size: int = Field(ge=1)
+    # Count of consumer threads kept while the pool is idle, None keeps all size threads
+    min_size: int | None = Field(default=None, ge=1)
+    # Task types executed only by the consumer threads of the pool
+    task_types: list[str] = Field(default=[])
+
+
+class ConductorWrapperSettings(BaseModel):
+    dispatch_mode: DispatchMode = DispatchMode.QUEUE_SCAN
+    # Maximal number of tasks claimed by a single poll request, 1 disables batch polling
+    batch_poll_size: int = Field(default=1, ge=1)
+    # Server-side timeout of a batch poll request in milliseconds
+    batch_poll_timeout: int = Field(default=100, ge=0)
+    # Server-side timeout of a long-poll request in milliseconds, Conductor accepts at most 5 seconds
+    long_poll_timeout: int = Field(default=1000, ge=0, le=5000)
+    # Process pool shared by task types with the PROCESS execution backend, size defaults to the CPU count
+    process_pool_size: int | None = Field(default=None, ge=1)
+    # Pool processes are replaced after executing this count of tasks, None keeps them forever
+    process_max_tasks_per_child: int | None = Field(default=1000, ge=1)
+    process_start_method: str = 'spawn'
+    # Queue-scan interval grows by this factor up to max_polling_interval seconds while the worker is idle
+    # for more than idle_scans_before_backoff consecutive scans. The backoff saves queue scans of idle workers,
+    # but the first task after an idle period then waits up to max_polling_interval, None disables it
+    polling_backoff_factor: float = Field(default=2.0, ge=1.0)
+    max_polling_interval: float | None = Field(default=None, gt=0)
+    idle_scans_before_backoff: int = Field(default=10, ge=0)
+    # Ask only for queue depths of registered task types instead of all queues of the cluster
+    scoped_queue_query: bool = True
+    # Task results are sent by this count of background threads, 0 sends them from consumer threads
+    result_sender_count: int = Field(default=4, ge=0)
+    # Consumer threads block when this count of results waits for sending
+    result_queue_size: int = Field(default=100, ge=1)
+    # Failed result updates are retried with an exponential backoff starting at result_retry_backoff seconds
+    result_update_retries: int = Field(default=3, ge=0)
+    result_retry_backoff: float = Field(default=0.5, gt=0)
+    # Results waiting for a sender thread are sent for at most this count of seconds when the worker stops
+    result_flush_timeout: float = Field(default=10.0, ge=0)
+    # Timeouts of Conductor requests in seconds, the read timeout has to outlast long_poll_timeout
+    connect_timeout: float = Field(default=5.0, gt=0)
+    read_timeout: float = Field(default=30.0, gt=0)
+    # Count of tasks per task type claimed ahead by a background fetcher in the queue-scan mode, 0 disables it.
+    # Prefetched tasks have to start within prefetch_timeout_ratio of responseTimeoutSeconds of their task type,
+    # the buffer shrinks for slow task types accordingly.
+    prefetch_size: int = Field(default=0, ge=0)
+    prefetch_timeout_ratio: float = Field(default=0.5, gt=0, le=1)
+    # Leases of running tasks are checked every heartbeat_interval seconds and extended, when more than
+    # lease_extension_ratio of their responseTimeoutSeconds passed since the poll or the last extension.
+    # None disables heartbeats.
+    heartbeat_interval: float | None = Field(default=5.0, gt=0)
+    lease_extension_ratio: float = Field(default=0.5, gt=0, lt=1)
+    # Externalized task inputs larger than external_payload_spool_size bytes are downloaded to temporary files,
+    # they are still read into memory at once for parsing.
+    # Downloaded inputs are cached on disk up to external_payload_cache_size bytes, 0 disables the cache.
+    # The cache is kept in external_payload_cache_dir, or in a temporary directory removed at exit.
+    external_payload_spool_size: int = Field(default=1024 * 1024, ge=0)
+    external_payload_cache_size: int = Field(default=0, ge=0)
+    external_payload_cache_dir: str | None = None
+    # Task outputs larger than this count of bytes are uploaded to external payload storage and only their
+    # storage path is sent to Conductor, None sends all outputs inline
+    external_output_threshold: int | None = Field(default=3 * 1024 * 1024, ge=0)
+    # Relative priorities of task types used by the queue-scan scheduler, task types default to 1.0
+    task_priorities: dict[str, float] = Field(default={})
+    # Named pools of consumer threads dedicated to groups of task types, so a burst of slow tasks cannot take
+    # threads of other task types. Task types without a pool share the max_thread_count consumer threads.
+    thread_pools: dict[str, ThreadPoolSettings] = Field(default={})
+    # Consumer threads kept by the shared pool while it is idle, None keeps all max_thread_count threads.
+    # Pools start threads up to their size while tasks wait for a thread, threads idle for thread_idle_timeout
+    # seconds retire down to the minimal count.
+    min_thread_count: int | None = Field(default=None, ge=1)
+    thread_idle_timeout: float = Field(default=60.0, gt=0)
+    # Concurrency limits of task types adapted to latencies and error rates of polls, executions and result
+    # updates, so a slow Uniconfig or Conductor gets fewer concurrent requests. None keeps only static limits.
+    adaptive_concurrency: AdaptiveConcurrencySettings | None = None
+    # Token buckets of downstream endpoints shared by groups of task types, e.g. CLI sessions of devices.
+    # Task types get their own buckets from rateLimitPerFrequency and rateLimitFrequencyInSeconds of their
+    # definitions, a task is polled only while all buckets of its type hold a token.
+    endpoint_rate_limits: dict[str, EndpointRateLimitSettings] = Field(default={})
+
+    @validator('thread_pools')
+    def validate_thread_pools(
+            cls, thread_pools: dict[str, ThreadPoolSettings]  # noqa: N805
+    ) -> dict[str, ThreadPoolSettings]:
+        if SHARED_POOL in thread_pools:
+            raise ValueError(f"Thread pool name '{SHARED_POOL}' is reserved for task types without a pool")
+        assigned: set[str] = set()
+        for thread_pool in thread_pools.values():
+            duplicates = assigned.intersection(thread_pool.task_types)
+            if duplicates:
+                raise ValueError(f'Task types {sorted(duplicates)} are assigned to more than one thread pool')
+            assigned.update(thread_pool.task_types)
+        return thread_pools
+
+    @validator('endpoint_rate_limits')
+    def validate_endpoint_rate_limits(
+            cls, endpoint_rate_limits: dict[str, EndpointRateLimitSettings]  # noqa: N805
+    ) -> dict[str, EndpointRateLimitSettings]:
+        assigned: set[str] = set()
+        for endpoint in endpoint_rate_limits.values():
+            duplicates = assigned.intersection(endpoint.task_types)
+            if duplicates:
+                raise ValueError(f'Task types {sorted(duplicates)} are assigned to more than one endpoint')
+            assigned.update(endpoint.task_types)
+        return endpoint_rate_limits
+
+
+@dataclass
+class TaskResultUpdate:
+    """Fields of a finished task read by Conductor, the rest of the polled task is not sent back."""
+
+    task_id: str
+    workflow_instance_id: str | None
+    status: str
+    output_data: RawTaskIO
+    logs: list[Any]
+    worker_id: str
+    callback_after_seconds: int | None = None
+    extend_lease: bool = False
+    external_output_payload_storage_path: str | None = None
+
+    @classmethod
+    def from_task(cls, task: RawTaskIO, worker_id: str) -> 'TaskResultUpdate':
+        return cls(
+            task_id=task['taskId'],
+            workflow_instance_id=task.get('workflowInstanceId'),
+            status=task['status'],
+            output_data=task.get('outputData', {}),
+            logs=task.get('logs', []),
+            worker_id=worker_id,
+            callback_after_seconds=task.get('callbackAfterSeconds'),
+        )
+
+    def to_dict(self) -> RawTaskIO:
+        task_result: RawTaskIO = {
+            'taskId': self.task_id,
+            'workflowInstanceId': self.workflow_instance_id,
+            'status': self.status,
+            'outputData': self.output_data,
+            'logs': self.logs,
+            'workerId': self.worker_id,
+        }
+        if self.callback_after_seconds is not None:
+            # IN_PROGRESS task is handed back to a worker after this delay
+            task_result['callbackAfterSeconds'] = self.callback_after_seconds
+        if self.extend_lease:
+            # Conductor restarts the response timeout of the running task
+            task_result['extendLease'] = True
+        if self.external_output_payload_storage_path is not None:
+            task_result['externalOutputPayloadStoragePath'] = self.external_output_payload_storage_path
+        return task_result
 
 
 @dataclass
@@ -47,79 +252,537 @@ class NextWorkerTask:
     task_type: str
     exec_function: Callable[[Any], Any]
     poll_uuid: uuid.UUID | None
+    poll_count: int = 1
+    polled_task: RawTaskIO | None = None
+    # Monotonic time of the poll which claimed the task, None while it is not polled yet
+    polled_at: float | None = None
+    # Claimed task waited for a consumer thread too long, it is handed back to Conductor instead of executed
+    stale: bool = False
 
 
-class TaskSource:
+class TaskTypeCounters:
+    """Running and claimed tasks of one task type, guarded by a lock of the task type."""
+
     def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.running = 0
+        self.claimed = 0
+        # Tasks granted to batch and prefetch polls still in progress, claimed or released when they return
+        self.reserved = 0
+
+
+class QueueSnapshot:
+    """Queue depths found by one queue scan, decremented by polls of consumer threads."""
+
+    def __init__(self, queue: dict[str, int]) -> None:
+        self.uuid = uuid.uuid4()
+        self.queue = queue
+        # Guards the queue depths and the scheduler weights, which start over with every snapshot
+        self.lock = threading.Lock()
+        self.current_weights: dict[str, float] = {}
+
+
+class TaskSource:
+    """
+    Hands tasks of non-empty queues over to consumer threads of the queue-scan mode.
+
+    Consumer threads do not share a single lock. Running and claimed tasks are counted per task type under
+    the lock of the task type, tasks claimed by batch polls are handed over through a deque and a queue scan
+    replaces the whole queue snapshot, so it never waits for consumer threads. Only the selection of a task type
+    to poll holds the lock of the current snapshot, and idle consumer threads take no lock until they park.
+    """
+
+    def __init__(
+            self, max_batch_size: int = 1, worker_count: int = 1, task_priorities: dict[str, float] | None = None,
+            prefetch_size: int = 0, prefetch_timeout_ratio: float = 0.5,
+            concurrency_controller: AdaptiveConcurrencyController | None = None,
+            rate_limiter: RateLimiter | None = None
+    ) -> None:
+        # Guards only parking of idle consumer threads and of the prefetch thread
         self.lock = threading.Lock()
         self.task_types: RawTaskIO = {}
         self.task_types_list: list[str] = []
+        self.counters: dict[str, TaskTypeCounters] = {}
+
+        self.snapshot = QueueSnapshot({})
+
+        self.max_batch_size = max_batch_size
+        self.worker_count = worker_count
+        # Tasks already claimed by a batch poll and waiting for a free consumer thread, together with their
+        # type and the monotonic time of their claim
+        self.claimed_tasks: deque[tuple[str, float, RawTaskIO]] = deque()
+        # One item per running task, appends and pops of a deque are thread-safe, so the total count of running
+        # tasks is kept without a shared lock
+        self.running_tasks: deque[str] = deque()
+
+        self.prefetch_size = prefetch_size
+        self.prefetch_timeout_ratio = prefetch_timeout_ratio
+
+        self.scheduler = WeightedFairScheduler(task_priorities)
+        # Adaptive limits lower the static concurrency limits of task types
+        self.concurrency_controller = concurrency_controller
+        # Tasks are polled only while the token buckets of their type hold a token
+        self.rate_limiter = rate_limiter
+        # Idle consumer threads are parked here until new tasks appear
+        self.tasks_available = threading.Condition(self.lock)
+        # Prefetch thread is parked here until some buffer of claimed tasks can be refilled
+        self.prefetch_needed = threading.Condition(self.lock)
+
+    @property
+    def filtered_queue(self) -> dict[str, int]:
+        return self.snapshot.queue
+
+    @property
+    def actual_uuid(self) -> uuid.UUID:
+        return self.snapshot.uuid
+
+    @property
+    def claimed_count(self) -> int:
+        return len(self.claimed_tasks)
 
-        self.actual_uuid: uuid.UUID | None = None
-        self.filtered_queue: dict[str, Any] = {}
-        self.actual_task_types_running: dict[str, Any] = defaultdict(int)
-        self.last_task_position: int = 0
+    @property
+    def running_count(self) -> int:
+        return len(self.running_tasks)
 
-    def register_task_type(self, task_type: str, exec_function: Any) -> None:
-        self.task_types[task_type] = RegisteredWorkerTask(task_type, exec_function)
+    @property
+    def actual_task_types_running(self) -> dict[str, int]:
+        return defaultdict(int, {task_type: counters.running for task_type, counters in list(self.counters.items())})
+
+    def register_task_type(
+            self, task_type: str, exec_function: Any, concurrency_limit: int | None = None,
+            response_timeout_seconds: float | None = None
+    ) -> None:
+        self.counters.setdefault(task_type, TaskTypeCounters())
+        self.task_types[task_type] = RegisteredWorkerTask(
+            task_type, exec_function, concurrency_limit, response_timeout_seconds
+        )
         self.task_types_list = list(self.task_types)
 
+    def free_capacity(self, task_type: str) -> int | None:
+        """Count of tasks of the type which can be started without exceeding its concurrency limit."""
+        registered_task: RegisteredWorkerTask = self.task_types[task_type]
+        concurrency_limit = registered_task.concurrency_limit
+        if self.concurrency_controller is not None:
+            concurrency_limit = self.concurrency_controller.limit(task_type, concurrency_limit)
+        if concurrency_limit is None:
+            return None
+        counters = self.counters[task_type]
+        return max(concurrency_limit - counters.running - counters.claimed - counters.reserved, 0)
+
     def handle_tasks(self, queue: dict[str, int]) -> None:
-        with self.lock:
-            self.actual_uuid = uuid.uuid4()
-            self.filtered_queue = {
-                key: value
-                for key, value in queue.items()
-                if key in self.task_types.keys() and value > 0
-            }
+        snapshot = QueueSnapshot({
+            key: value
+            for key, value in queue.items()
+            if key in self.task_types and value > 0
+        })
+        # Consumer threads still selecting from the previous snapshot finish with it undisturbed
+        self.snapshot = snapshot
+        if snapshot.queue:
+            with self.lock:
+                self.tasks_available.notify(sum(snapshot.queue.values()))
+                self.prefetch_needed.notify()
 
-    def round_robin_task_types(self) -> str:
-        task_type = self.task_types_list[self.last_task_position]
-        self.last_task_position += 1
-        if self.last_task_position == len(self.task_types):
-            self.last_task_position = 0
-        return task_type
+    def has_queued_tasks(self) -> bool:
+        return bool(self.snapshot.queue)
 
-    def get_next_task(self, last_task_type: str | None) -> NextWorkerTask | None:
+    def is_idle(self) -> bool:
+        """True when no task is queued, claimed or running."""
+        return not self.snapshot.queue and not self.claimed_tasks and self.running_count == 0
 
-        with self.lock:
-            if last_task_type:
-                self.actual_task_types_running[last_task_type] -= 1
+    def task_demand(self) -> int:
+        """Count of tasks queued, claimed or running, consumer threads needed to execute them all at once."""
+        snapshot = self.snapshot
+        with snapshot.lock:
+            queued = sum(snapshot.queue.values())
+        return queued + self.claimed_count + self.running_count
+
+    def wait_for_tasks(self, timeout: float | None = None) -> None:
+        """Park a consumer thread until some task can be polled or claimed, or until timeout."""
+        if self.rate_limiter is not None:
+            # Nothing notifies about refilled token buckets, throttled task types are checked again in time
+            delays = [
+                self.rate_limiter.delay(task_type) for task_type in list(self.snapshot.queue)
+                if not self.rate_limiter.available(task_type)
+            ]
+            if delays and (timeout is None or min(delays) < timeout):
+                timeout = min(delays)
+        with self.tasks_available:
+            self.tasks_available.wait_for(self.__has_available_tasks, timeout)
+
+    def __has_available_tasks(self) -> bool:
+        if self.claimed_tasks:
+            return True
+        return any(
+            self.free_capacity(task_type) != 0 and (self.rate_limiter is None or self.rate_limiter.available(task_type))
+            for task_type in list(self.snapshot.queue)
+        )
+
+    def get_next_task(
+            self, last_task_type: str | None, last_execution_time: float | None = None
+    ) -> NextWorkerTask | None:
+
+        if last_task_type:
+            self.task_finished(last_task_type, last_execution_time)
+
+        while self.claimed_tasks:
+            next_claimed_task = self.__next_claimed_task()
+            if next_claimed_task is not None:
+                return next_claimed_task
+
+        snapshot = self.snapshot
+        if not snapshot.queue:
+            return None
 
-            if len(self.filtered_queue) == 0:
+        with snapshot.lock:
+            # Only non-empty queues are visited, saturated task types are not polled at all
+            task_type = self.scheduler.select(snapshot.queue, self.__can_poll, snapshot.current_weights)
+            if task_type is None:
                 return None
 
-            task_type = ''
-            while task_type not in self.filtered_queue:
-                task_type = self.round_robin_task_types()
+            counters = self.counters[task_type]
+            with counters.lock:
+                free_capacity = self.free_capacity(task_type)
+                if free_capacity == 0:
+                    # Filled up by a claimed task since the selection
+                    return None
 
-            self.actual_task_types_running[task_type] += 1
+                poll_count = min(snapshot.queue[task_type], self.max_batch_size)
+                if poll_count > 1:
+                    # Claim only as many tasks as idle consumer threads can pick up right away
+                    idle_workers = self.worker_count - self.running_count - self.claimed_count
+                    poll_count = min(poll_count, idle_workers)
+                if free_capacity is not None:
+                    poll_count = min(poll_count, free_capacity)
+                poll_count = max(1, poll_count)
+                if self.rate_limiter is not None:
+                    poll_count = self.rate_limiter.acquire(task_type, poll_count)
+                    if poll_count == 0:
+                        # Tokens were taken by another consumer thread since the selection
+                        return None
+
+                counters.running += 1
+                # Tasks of the batch over the first one count against the concurrency limit until claimed
+                counters.reserved += poll_count - 1
+            self.running_tasks.append(task_type)
 
             registered_task: RegisteredWorkerTask = self.task_types[task_type]
 
-            self.filtered_queue[task_type] -= 1
-            if self.filtered_queue[task_type] <= 0:
-                self.filtered_queue.pop(task_type, None)
+            snapshot.queue[task_type] -= poll_count
+            if snapshot.queue[task_type] <= 0:
+                snapshot.queue.pop(task_type, None)
 
-            next_worker = NextWorkerTask(
-                task_type=task_type,
-                exec_function=registered_task.exec_function,
-                poll_uuid=self.actual_uuid
-            )
-            return next_worker
+        return NextWorkerTask(
+            task_type=task_type,
+            exec_function=registered_task.exec_function,
+            poll_uuid=snapshot.uuid,
+            poll_count=poll_count
+        )
 
-    def task_not_found_anymore(self, task_not_found: NextWorkerTask) -> None:
+    def __can_poll(self, task_type: str) -> bool:
+        if self.free_capacity(task_type) == 0:
+            return False
+        return self.rate_limiter is None or self.rate_limiter.available(task_type)
+
+    def task_finished(self, task_type: str, execution_time: float | None = None) -> None:
+        counters = self.counters[task_type]
+        with counters.lock:
+            counters.running -= 1
+            if execution_time is not None:
+                self.scheduler.record_execution_time(task_type, execution_time)
+        self.running_tasks.pop()
+        self.__notify_prefetch()
+
+    def claim_tasks(
+            self, task_type: str, tasks: list[RawTaskIO], claimed_at: float | None = None, reserved: int = 0
+    ) -> None:
+        """
+        Hand over tasks polled in a batch to the other consumer threads, claimed_at is the time of the poll.
+
+        The reserved count of tasks granted to the poll is released, claimed tasks take its place.
+        """
+        counters = self.counters[task_type]
+        with counters.lock:
+            counters.reserved -= reserved
+            counters.claimed += len(tasks)
+        if reserved > len(tasks):
+            # Released capacity lets parked threads poll the task type again
+            with self.lock:
+                self.tasks_available.notify(reserved - len(tasks))
+                self.prefetch_needed.notify()
+        if not tasks:
+            return
+
+        claimed_at = time.monotonic() if claimed_at is None else claimed_at
+        self.claimed_tasks.extend((task_type, claimed_at, task) for task in tasks)
+        with self.lock:
+            self.tasks_available.notify(len(tasks))
+
+    def __next_claimed_task(self) -> NextWorkerTask | None:
+        try:
+            task_type, claimed_at, polled_task = self.claimed_tasks.popleft()
+        except IndexError:
+            # Taken by another consumer thread in the meantime
+            return None
+
+        registered_task: RegisteredWorkerTask = self.task_types[task_type]
+        response_timeout = polled_task.get('responseTimeoutSeconds') or registered_task.response_timeout_seconds
+        stale = bool(
+            response_timeout and time.monotonic() - claimed_at > self.prefetch_timeout_ratio * response_timeout
+        )
+
+        counters = self.counters[task_type]
+        with counters.lock:
+            counters.claimed -= 1
+            counters.running += 1
+        self.running_tasks.append(task_type)
+        self.__notify_prefetch()
 
-        if self.actual_uuid == task_not_found.poll_uuid:
+        return NextWorkerTask(
+            task_type=task_type,
+            exec_function=registered_task.exec_function,
+            poll_uuid=self.snapshot.uuid,
+            polled_task=polled_task,
+            polled_at=claimed_at,
+            stale=stale
+        )
+
+    def __notify_prefetch(self) -> None:
+        if self.prefetch_size > 0:
             with self.lock:
-                if task_not_found.task_type is not None:
-                    self.filtered_queue.pop(task_not_found.task_type, None)
+                self.prefetch_needed.notify()
+
+    def prefetch_limit(self, task_type: str) -> int:
+        """Count of claimed tasks of the type which one consumer thread starts within their response timeout."""
+        registered_task: RegisteredWorkerTask = self.task_types[task_type]
+        execution_time = self.scheduler.execution_times.get(task_type)
+        if not registered_task.response_timeout_seconds or execution_time is None:
+            return self.prefetch_size
+        time_budget = self.prefetch_timeout_ratio * registered_task.response_timeout_seconds
+        # Claimed tasks of other types are started first, their execution takes from the budget
+        time_budget -= sum(
+            counters.claimed * self.scheduler.execution_times.get(other_type, 0.0)
+            for other_type, counters in list(self.counters.items()) if other_type != task_type
+        )
+        return max(min(self.prefetch_size, int(time_budget / execution_time)), 0)
+
+    def wait_for_prefetch(self, timeout: float | None = None) -> list[NextWorkerTask]:
+        """Park the prefetch thread until some buffer can be refilled, queued tasks to poll are reserved."""
+        with self.prefetch_needed:
+            self.prefetch_needed.wait_for(lambda: bool(self.__prefetch_demand(self.snapshot)), timeout)
+
+        snapshot = self.snapshot
+        prefetch = []
+        with snapshot.lock:
+            for task_type, demand in self.__prefetch_demand(snapshot).items():
+                counters = self.counters[task_type]
+                with counters.lock:
+                    # Consumer threads may have taken the capacity since the demand was computed
+                    free_capacity = self.free_capacity(task_type)
+                    poll_count = demand if free_capacity is None else min(demand, free_capacity)
+                    if self.rate_limiter is not None and poll_count > 0:
+                        poll_count = self.rate_limiter.acquire(task_type, poll_count)
+                    if poll_count == 0:
+                        continue
+                    counters.reserved += poll_count
+                snapshot.queue[task_type] -= poll_count
+                if snapshot.queue[task_type] <= 0:
+                    snapshot.queue.pop(task_type, None)
+
+                registered_task: RegisteredWorkerTask = self.task_types[task_type]
+                prefetch.append(
+                    NextWorkerTask(
+                        task_type=task_type,
+                        exec_function=registered_task.exec_function,
+                        poll_uuid=snapshot.uuid,
+                        poll_count=poll_count
+                    )
+                )
+        return prefetch
+
+    def __prefetch_demand(self, snapshot: QueueSnapshot) -> dict[str, int]:
+        demand = {}
+        for task_type, queue_depth in list(snapshot.queue.items()):
+            counters = self.counters[task_type]
+            poll_count = min(queue_depth, self.prefetch_limit(task_type) - counters.claimed - counters.reserved)
+            free_capacity = self.free_capacity(task_type)
+            if free_capacity is not None:
+                poll_count = min(poll_count, free_capacity)
+            if poll_count > 0 and (self.rate_limiter is None or self.rate_limiter.available(task_type)):
+                demand[task_type] = poll_count
+        return demand
+
+    def task_not_found_anymore(self, task_not_found: NextWorkerTask) -> None:
+        snapshot = self.snapshot
+        if snapshot.uuid == task_not_found.poll_uuid:
+            with snapshot.lock:
+                snapshot.queue.pop(task_not_found.task_type, None)
+
+
+class DispatchQueue:
+    """Hands tasks claimed by long-poll threads over to consumer threads.
+
+    Long-poll threads only wait for tasks while some consumer thread is free and the task type is below its
+    concurrency limit, and never ask for more tasks than can be executed right away. Workers granted to a poll
+    are reserved until the poll returns, so concurrent pollers never claim more tasks than there are free workers.
+    Free workers are granted to waiting pollers in the order they asked for them, so a poller giving back its
+    workers can not take them again while pollers of other task types wait.
+    """
+
+    def __init__(self, worker_count: int) -> None:
+        self.condition = threading.Condition()
+        self.worker_count = worker_count
+        self.free_workers = worker_count
+        self.in_flight: dict[str, int] = defaultdict(int)
+        self.tasks: SimpleQueue[NextWorkerTask] = SimpleQueue()
+        # Pollers waiting for free workers in arrival order, as [task_type, concurrency_limit]
+        self.waiting: list[list[Any]] = []
+
+    def __below_limit(self, task_type: str, concurrency_limit: int | None) -> bool:
+        return concurrency_limit is None or self.in_flight[task_type] < concurrency_limit
+
+    def __next_waiting(self) -> list[Any] | None:
+        """First waiting poller whose task type is below its concurrency limit."""
+        for waiting in self.waiting:
+            if self.__below_limit(*waiting):
+                return waiting
+        return None
+
+    def wait_for_free_workers(self, task_type: str, max_count: int, concurrency_limit: int | None = None) -> int:
+        """Reserve up to max_count free workers for tasks of the type, unused ones have to be released."""
+        waiting = [task_type, concurrency_limit]
+        with self.condition:
+            self.waiting.append(waiting)
+            try:
+                while self.free_workers <= 0 or self.__next_waiting() is not waiting:
+                    self.condition.wait()
+            finally:
+                self.waiting = [other for other in self.waiting if other is not waiting]
+            count = min(self.free_workers, max_count)
+            if concurrency_limit is not None:
+                count = min(count, concurrency_limit - self.in_flight[task_type])
+            self.free_workers -= count
+            self.in_flight[task_type] += count
+            if self.free_workers > 0:
+                # Workers left over belong to the next waiting poller
+                self.condition.notify_all()
+            return count
+
+    def pollers_waiting(self) -> bool:
+        """Whether some poller below its concurrency limit waits for a free worker."""
+        with self.condition:
+            return self.__next_waiting() is not None
+
+    def release(self, task_type: str, count: int) -> None:
+        """Give back workers reserved for tasks the poll did not return."""
+        if count <= 0:
+            return
+        with self.condition:
+            self.free_workers += count
+            self.in_flight[task_type] -= count
+            self.condition.notify_all()
+
+    def put(self, next_task: NextWorkerTask) -> None:
+        """Hand over a task to a worker reserved by wait_for_free_workers."""
+        self.tasks.put(next_task)
+
+    def get(self, timeout: float | None = None) -> NextWorkerTask:
+        """Raises queue.Empty when no task is handed over within timeout."""
+        return self.tasks.get(timeout=timeout)
+
+    def task_demand(self) -> int:
+        """Count of handed over tasks waiting for a consumer thread or executed right now."""
+        with self.condition:
+            return self.worker_count - self.free_workers
+
+    def task_done(self, task_type: str) -> None:
+        with self.condition:
+            self.free_workers += 1
+            self.in_flight[task_type] -= 1
+            self.condition.notify_all()
+
+
+class ConsumerPool:
+    """
+    Consumer threads executing a group of task types, isolated from the other groups as a bulkhead.
+
+    Task types of the pool are scheduled by its own task source in the queue-scan mode and handed over by its
+    own dispatch queue in the long-poll mode, so they can never take threads of another pool.
+
+    The pool starts with min_size threads and grows up to size threads while tasks wait for a thread.
+    Threads idle for longer than the idle timeout of the wrapper retire until min_size threads are left.
+    """
+
+    def __init__(
+            self, name: str, size: int, task_source: TaskSource, metrics: Metrics, min_size: int | None = None
+    ) -> None:
+        self.name = name
+        self.size = size
+        self.min_size = size if min_size is None else min(min_size, size)
+        self.task_source = task_source
+        self.dispatch_queue = DispatchQueue(size)
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.busy = 0
+        self.threads = 0
+        self.target: Callable[..., None] | None = None
+        self.args: tuple[Any, ...] = ()
+
+    def start(self, target: Callable[..., None], *args: Any) -> None:
+        self.target = target
+        self.args = args
+        self.add_threads(self.min_size)
+
+    def scale(self, task_demand: int) -> None:
+        """Start threads for tasks running or waiting for a thread over the current thread count."""
+        with self.lock:
+            count = min(task_demand, self.size) - self.threads
+        if count > 0:
+            self.add_threads(count)
+
+    def add_threads(self, count: int) -> None:
+        assert self.target is not None
+        with self.lock:
+            count = min(count, self.size - self.threads)
+            self.threads += count
+            threads = self.threads
+        for _ in range(count):
+            thread = Thread(target=self.target, args=self.args)
+            thread.daemon = True
+            thread.start()
+            increment_thread_pool_scaled(self.metrics, self.name, 'UP')
+        record_thread_pool_threads(self.metrics, self.name, threads)
+
+    def retire(self) -> bool:
+        """Called by an idle consumer thread, the thread has to exit when it returns True."""
+        with self.lock:
+            if self.threads <= self.min_size:
+                return False
+            self.threads -= 1
+            threads = self.threads
+        increment_thread_pool_scaled(self.metrics, self.name, 'DOWN')
+        record_thread_pool_threads(self.metrics, self.name, threads)
+        return True
+
+    def task_started(self) -> None:
+        with self.lock:
+            self.busy += 1
+            busy = self.busy
+        record_thread_pool_busy(self.metrics, self.name, busy)
+        if busy >= self.size:
+            increment_thread_pool_saturated(self.metrics, self.name)
+
+    def task_finished(self) -> None:
+        with self.lock:
+            self.busy -= 1
+            busy = self.busy
+        record_thread_pool_busy(self.metrics, self.name, busy)
 
 
 class FrinxConductorWrapper:
     def __init__(
         self, server_url: str, max_thread_count: int, polling_interval: float = 0.1,
-            worker_id: str | None = None, headers: dict[str, Any] | None = None
+            worker_id: str | None = None, headers: dict[str, Any] | None = None,
+            settings: ConductorWrapperSettings | None = None
     ) -> None:
         # Synchronizes access to self.queues by producer thread (in read_queue) and consumer threads (in tasks_in_queue)
         self.lock = threading.Lock()
@@ -127,70 +790,484 @@ class FrinxConductorWrapper:
         self.conductor_task_url = server_url + '/metadata/taskdefs'
         self.headers = headers
         self.consumer_worker_count = max_thread_count
-        self.task_source = TaskSource()
+        self.settings = settings or ConductorWrapperSettings()
+        self.metrics = Metrics()
+        self.concurrency_controller: AdaptiveConcurrencyController | None = None
+        if self.settings.adaptive_concurrency is not None:
+            self.concurrency_controller = AdaptiveConcurrencyController(
+                self.metrics, self.settings.adaptive_concurrency
+            )
+        self.rate_limiter = RateLimiter(self.metrics, self.settings.endpoint_rate_limits)
+        self.task_source = TaskSource(
+            max_batch_size=self.settings.batch_poll_size,
+            worker_count=max_thread_count,
+            task_priorities=self.settings.task_priorities,
+            prefetch_size=self.settings.prefetch_size,
+            prefetch_timeout_ratio=self.settings.prefetch_timeout_ratio,
+            concurrency_controller=self.concurrency_controller,
+            rate_limiter=self.rate_limiter
+        )
+        # Task sources of the pools schedule only their own task types, self.task_source knows all of them
+        self.pools: dict[str, ConsumerPool] = {
+            SHARED_POOL: ConsumerPool(
+                SHARED_POOL, max_thread_count, self.task_source, self.metrics, self.settings.min_thread_count
+            )
+        }
+        self.task_pools: dict[str, str] = {}
+        for name, pool_settings in self.settings.thread_pools.items():
+            task_source = TaskSource(
+                max_batch_size=self.settings.batch_poll_size,
+                worker_count=pool_settings.size,
+                task_priorities=self.settings.task_priorities,
+                prefetch_size=self.settings.prefetch_size,
+                prefetch_timeout_ratio=self.settings.prefetch_timeout_ratio,
+                concurrency_controller=self.concurrency_controller,
+                rate_limiter=self.rate_limiter
+            )
+            self.pools[name] = ConsumerPool(
+                name, pool_settings.size, task_source, self.metrics, pool_settings.min_size
+            )
+            self.task_pools.update(dict.fromkeys(pool_settings.task_types, name))
+
+        self.process_pool = TaskProcessPool(
+            processes=self.settings.process_pool_size,
+            max_tasks_per_child=self.settings.process_max_tasks_per_child,
+            start_method=self.settings.process_start_method
+        )
 
         self.polling_interval = polling_interval
+        self.idle_scan_count = 0
+        self.last_queue_sizes: dict[str, int] | None = None
+        self.batched_queue_sizes = True
 
-        wfc_mgr = WFClientMgr(server_url, headers=headers)
+        # Long-poll threads are known only after task types are registered, the pool grows in start_workers
+        self.http_pool_size = self.connection_pool_size()
+        wfc_mgr = WFClientMgr(
+            server_url,
+            headers=headers,
+            pool_size=self.http_pool_size,
+            timeout=(self.settings.connect_timeout, self.settings.read_timeout)
+        )
         self.task_client = wfc_mgr.task_client
+        self.metadata_client = wfc_mgr.metadata_client
         self.worker_id = worker_id or hostname
+        self.in_flight = InFlightRegistry()
+
+        self.payload_cache: ExternalPayloadCache | None = None
+        if self.settings.external_payload_cache_size > 0:
+            self.payload_cache = ExternalPayloadCache(
+                self.settings.external_payload_cache_size, self.settings.external_payload_cache_dir
+            )
+
+        self.result_reporter: TaskResultReporter | None = None
+        if self.settings.result_sender_count > 0:
+            self.result_reporter = TaskResultReporter(
+                lambda task: self.task_client.update_task(task),
+                sender_count=self.settings.result_sender_count,
+                queue_size=self.settings.result_queue_size,
+                max_retries=self.settings.result_update_retries,
+                retry_backoff=self.settings.result_retry_backoff,
+                observe=lambda task_type, latency, failed: self.observe(task_type, LatencyStage.UPDATE, latency, failed)
+            )
+
+    def connection_pool_size(self) -> int:
+        """Count of threads sending requests to Conductor at once, each keeps its own keep-alive connection."""
+        # Consumer threads, result senders and the queue scanner or the thread registering task types
+        pool_size = sum(pool.size for pool in self.pools.values()) + self.settings.result_sender_count + 1
+        if self.settings.heartbeat_interval is not None:
+            pool_size += 1
+        match self.settings.dispatch_mode:
+            case DispatchMode.LONG_POLL:
+                pool_size += len(self.task_source.task_types_list)
+            case DispatchMode.QUEUE_SCAN if self.settings.prefetch_size > 0:
+                pool_size += len(self.pools)
+        return pool_size
 
     def start_workers(self) -> None:
-        for i in range(self.consumer_worker_count):
-            thread = Thread(target=self.consume_task)
+        pool_size = self.connection_pool_size()
+        if pool_size != self.http_pool_size:
+            resize_session(self.task_client.session, pool_size)
+            self.http_pool_size = pool_size
+
+        if self.settings.heartbeat_interval is not None:
+            thread = Thread(target=self.send_heartbeats)
             thread.daemon = True
             thread.start()
 
+        # SIGTERM would kill the process before results waiting for a sender thread are sent, so it exits through
+        # SystemExit instead, unless the application handles the signal on its own
+        exit_on_sigterm = (
+            threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+        )
+        if exit_on_sigterm:
+            signal.signal(signal.SIGTERM, self.exit_on_signal)
+        try:
+            match self.settings.dispatch_mode:
+                case DispatchMode.LONG_POLL:
+                    self.start_long_poll_workers()
+                case DispatchMode.QUEUE_SCAN:
+                    self.start_queue_scan_workers()
+        finally:
+            if exit_on_sigterm:
+                # Another SIGTERM kills the process right away while the results are flushed
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            self.flush_results()
+
+    def exit_on_signal(self, signum: int, frame: FrameType | None) -> None:
+        logger.info('Stopping the worker on signal %s', signum)
+        sys.exit(128 + signum)
+
+    def flush_results(self) -> None:
+        """Send results still waiting for a sender thread, results left after result_flush_timeout are dropped."""
+        if self.result_reporter is not None:
+            self.result_reporter.flush(self.settings.result_flush_timeout)
+
+    def start_queue_scan_workers(self) -> None:
+        for pool in self.pools.values():
+            pool.start(self.consume_task, pool)
+
+            if self.settings.prefetch_size > 0:
+                thread = Thread(target=self.prefetch_tasks, args=(pool.task_source,))
+                thread.daemon = True
+                thread.start()
+
         logger.info('Starting a queue polling')
         fail_count = 0
         max_fail_count = 10
+        polling_interval = float(self.polling_interval)
         while True:
             try:
-                time.sleep(float(self.polling_interval))
-                queues_temp = self.task_client.get_tasks_in_queue('all')
-                self.task_source.handle_tasks(queues_temp)
+                time.sleep(polling_interval)
+                queues_temp = self.read_queue_sizes()
+                if self.queue_sizes_changed(queues_temp):
+                    self.handle_tasks(queues_temp)
+                for pool in self.pools.values():
+                    pool.scale(pool.task_source.task_demand())
+                polling_interval = self.next_polling_interval(polling_interval)
                 fail_count = 0
             except Exception:
                 logger.error(
                     f'Unable to read a queue info after {fail_count} attempts', exc_info=True
                 )
-                self.task_source.handle_tasks({})
+                self.last_queue_sizes = None
+                self.handle_tasks({})
                 fail_count = +1
                 if fail_count > max_fail_count:
                     sys.exit(1)
 
-    # Consume_task is executing tasks in the queue. The tasks are selected by round-robin from all task types.
-    # If there is no task for processing, the thread is in sleeping for a defined interval.
-    def consume_task(self) -> None:
+    def read_queue_sizes(self) -> dict[str, int]:
+        if not self.settings.scoped_queue_query:
+            return self.task_client.get_tasks_in_queue('all')  # type: ignore[no-any-return]
+
+        task_types = self.task_source.task_types_list
+        if self.batched_queue_sizes:
+            try:
+                queue_sizes: dict[str, int] = {}
+                for index in range(0, len(task_types), QUEUE_SIZES_CHUNK):
+                    queue_sizes.update(
+                        self.task_client.get_task_queue_sizes(task_types[index:index + QUEUE_SIZES_CHUNK]) or {}
+                    )
+                return queue_sizes
+            except requests.HTTPError as error:
+                if error.response is None or error.response.status_code not in (404, 405):
+                    raise
+                logger.warning('Batched queue size endpoint is not available, using per-type lookups')
+                self.batched_queue_sizes = False
+
+        return {task_type: self.task_client.get_task_queue_size(task_type) or 0 for task_type in task_types}
+
+    def handle_tasks(self, queue_sizes: dict[str, int]) -> None:
+        pool_queue_sizes: dict[str, dict[str, int]] = {name: {} for name in self.pools}
+        for task_type, queue_size in queue_sizes.items():
+            pool_queue_sizes[self.task_pools.get(task_type, SHARED_POOL)][task_type] = queue_size
+        for name, pool in self.pools.items():
+            pool.task_source.handle_tasks(pool_queue_sizes[name])
+
+    def pool_of(self, task_type: str) -> ConsumerPool:
+        return self.pools[self.task_pools.get(task_type, SHARED_POOL)]
+
+    # Unchanged queue sizes do not replace the local snapshots while they still hold every non-empty queue,
+    # the snapshots were already decremented by polled tasks and are more accurate than the same data again.
+    # A queue drained from its snapshot is applied again, even while other task types are left there.
+    def queue_sizes_changed(self, queue_sizes: dict[str, int]) -> bool:
+        unchanged = queue_sizes == self.last_queue_sizes
+        self.last_queue_sizes = queue_sizes
+        if not unchanged:
+            return True
+        return not all(
+            task_type in self.pool_of(task_type).task_source.filtered_queue
+            for task_type, queue_size in queue_sizes.items()
+            if queue_size > 0 and task_type in self.task_source.task_types
+        )
+
+    # Queue scans back off exponentially while the worker stays idle and return to the polling interval
+    # as soon as any task is queued or running.
+    def next_polling_interval(self, polling_interval: float) -> float:
+        if not all(pool.task_source.is_idle() for pool in self.pools.values()):
+            self.idle_scan_count = 0
+            return float(self.polling_interval)
+
+        self.idle_scan_count += 1
+        if self.idle_scan_count <= self.settings.idle_scans_before_backoff:
+            return float(self.polling_interval)
+        return min(polling_interval * self.settings.polling_backoff_factor, self.max_polling_interval)
+
+    @property
+    def max_polling_interval(self) -> float:
+        """Longest queue-scan interval, equal to the polling interval while the backoff is disabled."""
+        return max(self.settings.max_polling_interval or 0.0, float(self.polling_interval))
+
+    # Consume_task is executing tasks in the queue. The tasks are selected by weighted fair scheduling from
+    # non-empty queues of all task types of the pool, the shared pool by default.
+    # If there is no task for processing, the thread is parked until the queue scan finds new tasks,
+    # or retires when it stays idle for thread_idle_timeout and the pool has more than its minimal count.
+    def consume_task(self, pool: ConsumerPool | None = None) -> None:
+        pool = pool or self.pools[SHARED_POOL]
         last_task_type = None
+        last_execution_time = None
+        idle_since = time.monotonic()
         while True:
-            next_task = self.task_source.get_next_task(last_task_type)
+            next_task = pool.task_source.get_next_task(last_task_type, last_execution_time)
 
             last_task_type = None
+            last_execution_time = None
 
             if not next_task:
-                time.sleep(float(self.polling_interval))
+                if time.monotonic() - idle_since >= self.settings.thread_idle_timeout and pool.retire():
+                    return
+                pool.task_source.wait_for_tasks(self.max_polling_interval)
                 continue
 
             last_task_type = next_task.task_type
+            start_time = time.monotonic()
+            pool.task_started()
+            try:
+                self.process_task(next_task)
+            finally:
+                pool.task_finished()
+            idle_since = time.monotonic()
+            last_execution_time = idle_since - start_time
 
-            polled_task = self.task_client.poll_for_task(next_task.task_type, self.worker_id)
+    # Prefetch_tasks keeps a small buffer of claimed tasks for every non-empty queue, so consumer threads
+    # start the next task without waiting for a poll request.
+    def prefetch_tasks(self, task_source: TaskSource | None = None) -> None:
+        task_source = task_source or self.task_source
+        while True:
+            try:
+                for next_task in task_source.wait_for_prefetch(self.max_polling_interval):
+                    poll_start = time.monotonic()
+                    polled_tasks = None
+                    try:
+                        polled_tasks = self.task_client.poll_for_batch(
+                            next_task.task_type, next_task.poll_count, self.settings.batch_poll_timeout,
+                            self.worker_id
+                        )
+                    finally:
+                        task_source.claim_tasks(
+                            next_task.task_type, polled_tasks or [], poll_start, next_task.poll_count
+                        )
+                    if not polled_tasks:
+                        task_source.task_not_found_anymore(next_task)
+            except Exception:
+                logger.error('Unable to prefetch tasks', exc_info=True)
+                time.sleep(float(self.polling_interval))
 
-            if polled_task is None:
-                self.task_source.task_not_found_anymore(next_task)
-                continue
+    def start_long_poll_workers(self) -> None:
+        for pool in self.pools.values():
+            pool.start(self.consume_dispatched_task, pool)
 
-            logger.info(
-                'Polled for a task %s of type %s', polled_task['taskId'], next_task.task_type
+        logger.info('Starting a long polling of %s task types', len(self.task_source.task_types_list))
+        pollers = []
+        for task_type in self.task_source.task_types_list:
+            thread = Thread(target=self.long_poll_task_type, args=(task_type, self.pool_of(task_type)))
+            thread.daemon = True
+            thread.start()
+            pollers.append(thread)
+
+        for thread in pollers:
+            thread.join()
+
+    # Long_poll_task_type keeps one poll request of a task type open on the server side, until a task is
+    # enqueued or the long poll times out. Claimed tasks are handed over to the consumer threads.
+    def long_poll_task_type(self, task_type: str, pool: ConsumerPool) -> None:
+        registered_task: RegisteredWorkerTask = self.task_source.task_types[task_type]
+        while True:
+            concurrency_limit = registered_task.concurrency_limit
+            if self.concurrency_controller is not None:
+                concurrency_limit = self.concurrency_controller.limit(task_type, concurrency_limit)
+            count = pool.dispatch_queue.wait_for_free_workers(
+                task_type, self.settings.batch_poll_size, concurrency_limit
             )
+            reserved = count
+            count = self.rate_limiter.acquire(task_type, count)
+            if count == 0:
+                pool.dispatch_queue.release(task_type, reserved)
+                time.sleep(self.rate_limiter.delay(task_type))
+                continue
+            polled_tasks: list[dict[str, Any]] | None = None
+            poll_start = time.monotonic()
+            # While pollers of other task types wait for a worker, an open long poll would keep its reserved
+            # workers away from them for the whole timeout, so only a short poll is made and the workers go around
+            timeout = self.settings.long_poll_timeout
+            if pool.dispatch_queue.pollers_waiting():
+                timeout = min(timeout, self.settings.batch_poll_timeout)
+            try:
+                polled_tasks = self.task_client.poll_for_batch(task_type, count, timeout, self.worker_id)
+            finally:
+                pool.dispatch_queue.release(task_type, reserved - len(polled_tasks or []))
+            # Long polls wait for tasks on the server side, their latency does not tell anything about Conductor
+            self.observe(task_type, LatencyStage.POLL, None, polled_tasks is None)
+
+            if polled_tasks is None:
+                # Polling failed, do not flood the server with requests
+                time.sleep(float(self.polling_interval))
+                continue
+
+            for polled_task in polled_tasks:
+                pool.dispatch_queue.put(
+                    NextWorkerTask(
+                        task_type=task_type,
+                        exec_function=registered_task.exec_function,
+                        poll_uuid=None,
+                        polled_task=polled_task,
+                        polled_at=poll_start
+                    )
+                )
+            pool.scale(pool.dispatch_queue.task_demand())
+
+    def consume_dispatched_task(self, pool: ConsumerPool) -> None:
+        while True:
+            try:
+                next_task = pool.dispatch_queue.get(self.settings.thread_idle_timeout)
+            except queue.Empty:
+                if pool.retire():
+                    return
+                continue
+            pool.task_started()
+            try:
+                self.process_task(next_task)
+            finally:
+                pool.task_finished()
+                pool.dispatch_queue.task_done(next_task.task_type)
+
+    def process_task(self, next_task: NextWorkerTask) -> None:
+        polled_task = self.poll_task(next_task)
+
+        if polled_task is None:
+            self.pool_of(next_task.task_type).task_source.task_not_found_anymore(next_task)
+            return
 
+        if next_task.stale:
+            self.hand_back_task(polled_task)
+            return
+
+        logger.info(
+            'Polled for a task %s of type %s', polled_task['taskId'], next_task.task_type
+        )
+
+        task_id = polled_task['taskId']
+        registered_task: RegisteredWorkerTask = self.task_source.task_types[next_task.task_type]
+        self.in_flight.add(
+            next_task.task_type, polled_task, registered_task.response_timeout_seconds, next_task.polled_at
+        )
+        try:
             # Check if task input is externalized and if so, download the input
             polled_task = self.replace_external_payload_input(polled_task)
             if polled_task is None:
                 # Error replacing external payload
-                continue
+                return
 
             self.execute(polled_task, next_task.exec_function)
+        finally:
+            self.in_flight.remove(task_id)
+
+    # Hand_back_task returns a claimed task which could not start in time to the queue right away, instead of
+    # letting Conductor wait for its response timeout. Output data are kept, so a checkpoint is not lost.
+    def hand_back_task(self, task: RawTaskIO) -> None:
+        logger.warning(
+            'Handing back a task %s of type %s, it waited for a consumer thread too long',
+            task.get('taskId'), task.get('taskType')
+        )
+        task_result = TaskResultUpdate(
+            task_id=task['taskId'],
+            workflow_instance_id=task.get('workflowInstanceId'),
+            status='IN_PROGRESS',
+            output_data=task.get('outputData', {}),
+            logs=[],
+            worker_id=self.worker_id,
+            callback_after_seconds=0,
+        )
+        try:
+            self.task_client.update_task(task_result.to_dict())
+        except Exception:
+            logger.error('Unable to hand back a task %s', task_result.task_id, exc_info=True)
+
+    # Send_heartbeats extends leases of tasks running close to their response timeout, so Conductor does not
+    # reschedule them to another worker while they are still executed here.
+    def send_heartbeats(self) -> None:
+        while True:
+            time.sleep(float(self.settings.heartbeat_interval or self.polling_interval))
+            try:
+                self.extend_leases()
+            except Exception:
+                logger.error('Unable to extend leases of running tasks', exc_info=True)
+
+    def extend_leases(self) -> None:
+        in_flight_counts = self.in_flight.counts()
+        for task_type in self.task_source.task_types_list:
+            record_task_in_flight(self.metrics, task_type, in_flight_counts.get(task_type, 0))
+
+        for in_flight in self.in_flight.due_for_extension(self.settings.lease_extension_ratio):
+            lease_start = time.monotonic()
+            try:
+                self.task_client.update_task(self.lease_extension(in_flight))
+            except Exception:
+                logger.error('Unable to extend a lease of a task %s', in_flight.task_id, exc_info=True)
+                continue
+            logger.debug('Extended a lease of a task %s', in_flight.task_id)
+            self.in_flight.lease_extended(in_flight.task_id, lease_start)
+            increment_task_lease_extended(self.metrics, in_flight.task_type)
+
+    def lease_extension(self, in_flight: InFlightTask) -> RawTaskIO:
+        # Output data are sent unchanged, so a checkpoint of a resumed task is kept
+        return TaskResultUpdate(
+            task_id=in_flight.task_id,
+            workflow_instance_id=in_flight.workflow_instance_id,
+            status='IN_PROGRESS',
+            output_data=in_flight.output_data,
+            logs=[],
+            worker_id=self.worker_id,
+            extend_lease=True,
+        ).to_dict()
+
+    # Tasks claimed by a batch poll over the first one are handed over to the other consumer threads.
+    def poll_task(self, next_task: NextWorkerTask) -> RawTaskIO | None:
+        if next_task.polled_task is not None:
+            return next_task.polled_task
+
+        poll_start = time.monotonic()
+        next_task.polled_at = poll_start
+        if next_task.poll_count <= 1:
+            polled_task = self.task_client.poll_for_task(next_task.task_type, self.worker_id)
+            self.observe(next_task.task_type, LatencyStage.POLL, time.monotonic() - poll_start)
+            return polled_task  # type: ignore[no-any-return]
+
+        polled_tasks = None
+        try:
+            polled_tasks = self.task_client.poll_for_batch(
+                next_task.task_type, next_task.poll_count, self.settings.batch_poll_timeout, self.worker_id
+            )
+        finally:
+            # Tasks reserved for the batch over the first one are claimed, or released when not returned
+            self.pool_of(next_task.task_type).task_source.claim_tasks(
+                next_task.task_type, (polled_tasks or [])[1:], poll_start, next_task.poll_count - 1
+            )
+        # Failed batch polls return None, empty queues an empty list
+        self.observe(next_task.task_type, LatencyStage.POLL, time.monotonic() - poll_start, polled_tasks is None)
+        if not polled_tasks:
+            return None
+        return polled_tasks[0]  # type: ignore[no-any-return]
 
     def replace_external_payload_input(self, task: RawTaskIO) -> RawTaskIO | None:
         # No external payload placeholder present, just return original task
@@ -210,10 +1287,9 @@ class FrinxConductorWrapper:
                 raise Exception('Unexpected output for external payload location: %s' % location)
 
             # Replace placeholder with real output
-            task.pop(self.task_client.EXTERNAL_INPUT_KEY)
-            task['inputData'] = requests.get(
-                location['uri'], headers=self.task_client.headers
-            ).json()
+            path = task.pop(self.task_client.EXTERNAL_INPUT_KEY)
+            task['inputData'] = self.download_external_payload(path, location['uri'])
+            increment_external_payload_used(self.metrics, str(task.get('taskType')), 'READ', 'TASK_INPUT')
             return task
 
         except Exception:
@@ -226,43 +1302,213 @@ class FrinxConductorWrapper:
             self.handle_task_exception(task)
             return None
 
-    def register(self, task_type: str, task_definition: RawTaskIO, exec_function: Callable[[Any], Any]) -> None:
+    def download_external_payload(self, path: str, uri: str) -> Any:
+        if self.payload_cache is not None:
+            payload = self.payload_cache.load(path)
+            if payload is not None:
+                logger.debug('External payload %s read from the cache', path)
+                return payload
+
+        return download_payload(
+            self.task_client.session,
+            uri,
+            headers=self.task_client.headers,
+            timeout=self.task_client.timeout,
+            spool_size=self.settings.external_payload_spool_size,
+            cache=self.payload_cache,
+            cache_key=path
+        )
+
+    def register(
+            self, task_type: str, task_definition: RawTaskIO, exec_function: Callable[[Any], Any],
+            execution_backend: ExecutionBackend = ExecutionBackend.THREAD, register_definition: bool = True
+    ) -> None:
+        task_definition = self.build_task_definition(task_type, task_definition)
+
+        if register_definition:
+            logger.debug('Registering a task of type %s with definition %s', task_type, task_definition)
+            try:
+                requests.post(
+                    self.conductor_task_url, data=json_codec.encode([task_definition]), headers=self.headers
+                )
+            except Exception:
+                logger.error('Unable to register a task', exc_info=True)
+
+        if execution_backend == ExecutionBackend.PROCESS:
+            # Polling and updating stays on the consumer thread, only the execution is sent to the pool
+            exec_function = partial(
+                self.process_pool.execute, exec_function, timeout=task_definition.get('timeoutSeconds') or None
+            )
+
+        concurrency_limit = self.get_concurrency_limit(task_definition)
+        response_timeout_seconds = task_definition.get('responseTimeoutSeconds')
+        self.task_source.register_task_type(task_type, exec_function, concurrency_limit, response_timeout_seconds)
+        if task_type in self.task_pools:
+            self.pool_of(task_type).task_source.register_task_type(
+                task_type, exec_function, concurrency_limit, response_timeout_seconds
+            )
+        if self.concurrency_controller is not None:
+            self.concurrency_controller.register_task_type(task_type, self.pool_of(task_type).size)
+        self.rate_limiter.register_task_type(
+            task_type,
+            task_definition.get('rateLimitPerFrequency'),
+            task_definition.get('rateLimitFrequencyInSeconds')
+        )
+
+    @staticmethod
+    def build_task_definition(task_type: str, task_definition: RawTaskIO | None) -> RawTaskIO:
         if task_definition is None:
             task_definition = copy.deepcopy(DEFAULT_TASK_DEFINITION)
         else:
-            task_definition = {**DEFAULT_TASK_DEFINITION, **task_definition}
+            task_definition = copy.deepcopy({**DEFAULT_TASK_DEFINITION, **task_definition})
 
         task_definition['name'] = task_type
+        return task_definition
+
+    def register_task_definitions(self, task_definitions: list[RawTaskIO]) -> None:
+        """
+        Register task definitions of many workers with a single request.
+
+        Existing definitions are fetched once, only new definitions and definitions with a changed value
+        of some locally defined field are sent. Fields filled in by the server are not compared.
+        """
+        local_definitions = [
+            self.build_task_definition(task_definition['name'], task_definition) for task_definition in task_definitions
+        ]
 
-        logger.debug('Registering a task of type %s with definition %s', task_type, task_definition)
-        task_meta = copy.deepcopy(task_definition)
-        task_meta['name'] = task_type
         try:
-            requests.post(
-                self.conductor_task_url, data=json.dumps([task_meta]), headers=self.headers
-            )
+            remote_definitions = {
+                task_definition['name']: task_definition
+                for task_definition in self.metadata_client.get_all_task_defs() or []
+            }
         except Exception:
-            logger.error('Unable to register a task', exc_info=True)
+            logger.error('Unable to read registered task definitions, registering all of them', exc_info=True)
+            remote_definitions = {}
 
-        self.task_source.register_task_type(task_type, exec_function)
+        changed_definitions = [
+            task_definition for task_definition in local_definitions
+            if self.task_definition_changed(task_definition, remote_definitions.get(task_definition['name']))
+        ]
+        logger.info(
+            'Registering %s new or changed task definitions out of %s',
+            len(changed_definitions), len(local_definitions)
+        )
+        if not changed_definitions:
+            return
+
+        try:
+            self.metadata_client.register_task_defs(changed_definitions)
+        except Exception:
+            logger.error('Unable to register task definitions', exc_info=True)
+
+    @staticmethod
+    def task_definition_changed(local_definition: RawTaskIO, remote_definition: RawTaskIO | None) -> bool:
+        if remote_definition is None:
+            return True
+        return any(remote_definition.get(key) != value for key, value in local_definition.items())
+
+    @staticmethod
+    def get_concurrency_limit(task_definition: RawTaskIO) -> int | None:
+        # Conductor treats missing or zero limits as unlimited
+        limits = [
+            limit for limit in (task_definition.get('concurrentExecLimit'), task_definition.get('limitToThreadCount'))
+            if limit
+        ]
+        return min(limits, default=None)
 
     def execute(self, task: RawTaskIO, exec_function: Callable[[Any], Any]) -> None:
         try:
             logger.info('Executing a task %s', task['taskId'])
-            resp = exec_function(task)
-            if resp is None:
-                error_msg = 'Task execution function MUST return a response as a dict with status and output fields'
-                raise Exception(error_msg)
-            task['status'] = resp['status']
-            task['outputData'] = resp.get('output', {})
-            task['logs'] = resp.get('logs', [])
-            logger.debug('Executing a task %s, response: %s', task['taskId'], resp)
-            logger.debug('Executing a task %s, task body: %s', task['taskId'], task)
-            self.task_client.update_task(task)
+            resp = self.run_exec_function(task, exec_function)
+            self.apply_task_response(task, resp)
+            self.report_task_result(task)
         except Exception:
             self.handle_task_exception(task)
 
-    def handle_task_exception(self, task: RawTaskIO) -> None:
+    def run_exec_function(self, task: RawTaskIO, exec_function: Callable[[Any], Any]) -> Any:
+        execute_start = time.monotonic()
+        failed = True
+        try:
+            resp = exec_function(task)
+            if inspect.iscoroutine(resp):
+                # Worker with async execute, run it to completion on the consumer thread
+                resp = asyncio.run(resp)
+            failed = resp is None or resp.get('status') == 'FAILED'
+            return resp
+        finally:
+            self.observe(str(task.get('taskType')), LatencyStage.EXECUTE, time.monotonic() - execute_start, failed)
+
+    def report_task_result(self, task: RawTaskIO) -> None:
+        task_result = self.prepare_task_result(task)
+        task_type = str(task.get('taskType'))
+        if self.result_reporter is None:
+            update_start = time.monotonic()
+            try:
+                self.task_client.update_task(task_result)
+            except Exception:
+                self.observe(task_type, LatencyStage.UPDATE, time.monotonic() - update_start, True)
+                raise
+            self.observe(task_type, LatencyStage.UPDATE, time.monotonic() - update_start)
+        else:
+            # Consumer thread is free as soon as the result is queued for sending
+            self.result_reporter.report(task_result, task_type)
+
+    def observe(self, task_type: str, stage: LatencyStage, latency: float | None, failed: bool = False) -> None:
+        """Feed the adaptive concurrency controller, if enabled, with a sample of a task type."""
+        if self.concurrency_controller is not None:
+            self.concurrency_controller.record(task_type, stage, latency, failed)
+
+    def prepare_task_result(self, task: RawTaskIO) -> RawTaskIO:
+        task_result = TaskResultUpdate.from_task(task, self.worker_id)
+        output = json_codec.encode(task_result.output_data)
+        record_task_result_payload_size(self.metrics, str(task.get('taskType')), len(output))
+
+        threshold = self.settings.external_output_threshold
+        # Output of an IN_PROGRESS task holds its checkpoint, which has to come back inline
+        if threshold is not None and len(output) > threshold and task_result.status != 'IN_PROGRESS':
+            storage_path = self.upload_external_output(str(task.get('taskType')), task_result.task_id, output)
+            if storage_path is not None:
+                task_result.output_data = {}
+                task_result.external_output_payload_storage_path = storage_path
+                return task_result.to_dict()
+
+        # Output was encoded to measure its size, only the other fields of the result are encoded again
+        result = task_result.to_dict()
+        fields = json_codec.encode({key: value for key, value in result.items() if key != 'outputData'})
+        return json_codec.EncodedDict(result, fields[:-1] + b',"outputData":' + output + b'}')
+
+    def upload_external_output(self, task_type: str, task_id: str, output: bytes) -> str | None:
+        try:
+            location = self.task_client.get_task_output_external_payload_location()
+            if location is None or 'uri' not in location or 'path' not in location:
+                raise Exception('Unexpected output for external payload location: %s' % location)
+
+            resp = self.task_client.session.put(
+                location['uri'], data=output, headers=self.task_client.headers, timeout=self.task_client.timeout
+            )
+            resp.raise_for_status()
+        except Exception:
+            logger.error('Unable to upload an output of a task %s, sending it inline', task_id, exc_info=True)
+            return None
+
+        increment_external_payload_used(self.metrics, task_type, 'WRITE', 'TASK_OUTPUT')
+        storage_path: str = location['path']
+        return storage_path
+
+    @staticmethod
+    def apply_task_response(task: RawTaskIO, resp: RawTaskIO | None) -> None:
+        if resp is None:
+            error_msg = 'Task execution function MUST return a response as a dict with status and output fields'
+            raise Exception(error_msg)
+        task['status'] = resp['status']
+        task['outputData'] = resp.get('output', {})
+        task['logs'] = resp.get('logs', [])
+        task['callbackAfterSeconds'] = resp.get('callback_after_seconds')
+        logger.debug('Executing a task %s, response: %s', task['taskId'], resp)
+        logger.debug('Executing a task %s, task body: %s', task['taskId'], task)
+
+    @staticmethod
+    def apply_task_failure(task: RawTaskIO) -> None:
         logger.error('Unable to execute a task %s', task['taskId'], exc_info=True)
         error_info = traceback.format_exc().split('\n')[:-1]
         task['status'] = 'FAILED'
@@ -271,8 +1517,11 @@ class FrinxConductorWrapper:
             'traceback': error_info,
         }
         task['logs'] = ['Logs: %s' % traceback.format_exc()]
+
+    def handle_task_exception(self, task: RawTaskIO) -> None:
+        self.apply_task_failure(task)
         try:
-            self.task_client.update_task(task)
+            self.report_task_result(task)
         except Exception:
             logger.error(
                 'Unable to update a task %s, it may have timed out', task['taskId'], exc_info=True
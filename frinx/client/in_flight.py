@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class InFlightTask:
+    task_id: str
+    task_type: str
+    workflow_instance_id: str | None
+    output_data: dict[str, Any]
+    response_timeout_seconds: float | None
+    # Monotonic time of the poll or of the last lease extension
+    lease_start: float
+
+
+class InFlightRegistry:
+    """
+    Tasks executed by the worker right now, grouped by task type for metrics.
+
+    Conductor reschedules a task when no update comes within its responseTimeoutSeconds. The registry tells
+    which running tasks are getting close to that deadline, so their lease can be extended in time.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.tasks: dict[str, InFlightTask] = {}
+
+    def add(
+            self, task_type: str, task: dict[str, Any], response_timeout_seconds: float | None,
+            lease_start: float | None = None
+    ) -> None:
+        """Lease_start is the monotonic time of the poll, Conductor starts the response timeout at the poll."""
+        in_flight = InFlightTask(
+            task_id=task['taskId'],
+            task_type=task_type,
+            workflow_instance_id=task.get('workflowInstanceId'),
+            output_data=task.get('outputData') or {},
+            response_timeout_seconds=task.get('responseTimeoutSeconds') or response_timeout_seconds,
+            lease_start=time.monotonic() if lease_start is None else lease_start,
+        )
+        with self.lock:
+            self.tasks[in_flight.task_id] = in_flight
+
+    def remove(self, task_id: str) -> None:
+        with self.lock:
+            self.tasks.pop(task_id, None)
+
+    def counts(self) -> dict[str, int]:
+        with self.lock:
+            return dict(Counter(in_flight.task_type for in_flight in self.tasks.values()))
+
+    def due_for_extension(self, lease_ratio: float) -> list[InFlightTask]:
+        """Tasks running for more than lease_ratio of their response timeout since the last lease start."""
+        now = time.monotonic()
+        with self.lock:
+            return [
+                in_flight for in_flight in self.tasks.values()
+                if in_flight.response_timeout_seconds
+                and now - in_flight.lease_start >= lease_ratio * in_flight.response_timeout_seconds
+            ]
+
+    def lease_extended(self, task_id: str, lease_start: float) -> None:
+        with self.lock:
+            in_flight = self.tasks.get(task_id)
+            if in_flight is not None:
+                in_flight.lease_start = lease_start
@@ -0,0 +1,130 @@
+import gc
+import glob
+import logging
+import os
+import signal
+import tempfile
+import time
+from types import FrameType
+from typing import NoReturn
+
+from pydantic import BaseModel
+from pydantic import Field
+
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.common.telemetry.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SupervisorSettings(BaseModel):
+    # Count of forked worker processes, defaults to the CPU count
+    processes: int | None = Field(default=None, ge=1)
+    # Crashed worker processes are forked again after this delay in seconds
+    restart_delay: float = Field(default=1.0, ge=0)
+    # Directory of metric files shared by worker processes, a new temporary directory by default
+    metrics_dir: str | None = None
+
+
+class PreforkSupervisor:
+    """
+    Runs a registered FrinxConductorWrapper in several forked worker processes, so tasks are not limited by
+    a single GIL.
+
+    Objects created before the fork are frozen by gc.freeze, so garbage collections in the workers do not
+    touch them and their memory stays shared copy-on-write. Crashed workers are forked again. Workers keep
+    their metrics in shared files and the Prometheus endpoint of the supervisor serves them aggregated.
+    Register tasks first, then call run instead of start_workers.
+    """
+
+    def __init__(self, conductor_client: FrinxConductorWrapper, settings: SupervisorSettings | None = None) -> None:
+        self.conductor_client = conductor_client
+        self.settings = settings or SupervisorSettings()
+        self.metrics = Metrics()
+        self.workers: set[int] = set()
+        self.stopping = False
+
+    def run(self) -> None:
+        self.prepare_metrics()
+
+        # Keep-alive connections opened by the registration must not be shared by worker processes
+        self.conductor_client.task_client.session.close()
+
+        previous_handlers = {
+            signum: signal.signal(signum, self.stop) for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        gc.collect()
+        gc.freeze()
+        try:
+            for _ in range(self.settings.processes or os.cpu_count() or 1):
+                self.fork_worker()
+            self.supervise()
+        finally:
+            gc.unfreeze()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def prepare_metrics(self) -> None:
+        directory = self.settings.metrics_dir
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix='frinx-metrics-')
+        else:
+            # Files left by a previous run would be aggregated with the new ones
+            os.makedirs(directory, exist_ok=True)
+            for file_name in glob.glob(os.path.join(directory, '*.db')):
+                os.remove(file_name)
+        self.metrics.enable_multiprocess(directory)
+
+    def supervise(self) -> None:
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            if pid not in self.workers:
+                continue
+
+            self.workers.remove(pid)
+            self.metrics.mark_process_dead(pid)
+            if self.stopping:
+                continue
+
+            logger.error(
+                'Worker process %s exited with code %s, starting a new one', pid, os.waitstatus_to_exitcode(status)
+            )
+            time.sleep(self.settings.restart_delay)
+            if not self.stopping:
+                self.fork_worker()
+
+    def fork_worker(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self.run_worker()
+        self.workers.add(pid)
+        logger.info('Started a worker process %s', pid)
+
+    def run_worker(self) -> NoReturn:
+        # start_workers turns the default SIGTERM action into SystemExit, so queued task results are flushed
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        gc.enable()
+
+        exit_code = 1
+        try:
+            self.conductor_client.start_workers()
+            exit_code = 0
+        except SystemExit as error:
+            exit_code = error.code if isinstance(error.code, int) else 1
+        except BaseException:
+            logger.error('Worker process %s crashed', os.getpid(), exc_info=True)
+        finally:
+            os._exit(exit_code)
+
+    def stop(self, signum: int, frame: FrameType | None) -> None:
+        logger.info('Stopping %s worker processes', len(self.workers))
+        self.stopping = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
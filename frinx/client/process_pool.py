@@ -0,0 +1,105 @@
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from multiprocessing.pool import Pool
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def run_exec_function(exec_function: Callable[[Any], Any], task: dict[str, Any]) -> Any:
+    """Entry point of a pool process, coroutines of async workers are run to completion in the process."""
+    resp = exec_function(task)
+    if inspect.iscoroutine(resp):
+        resp = asyncio.run(resp)
+    return resp
+
+
+class TaskProcessPool:
+    """
+    Pool of processes executing CPU-bound exec functions outside the GIL of consumer threads.
+
+    The pool is started lazily with the first task. Pool processes are replaced by fresh ones after executing
+    max_tasks_per_child tasks, so memory leaked by a worker does not grow without limits. Exec functions and
+    task payloads are pickled, so workers must be importable classes defined at a module level.
+
+    A result is awaited at most timeoutSeconds of the task. A pool process killed in the middle of a task never
+    delivers its result, so the task fails on the timeout instead of blocking its consumer thread forever. Such
+    a pool can not be joined anymore, new tasks go to a fresh pool and the old one is terminated as soon as its
+    other running tasks are finished.
+    """
+
+    def __init__(
+            self, processes: int | None = None, max_tasks_per_child: int | None = None, start_method: str = 'spawn'
+    ) -> None:
+        self.processes = processes
+        self.max_tasks_per_child = max_tasks_per_child
+        self.start_method = start_method
+        self.lock = threading.Lock()
+        self.pool: Pool | None = None
+        # Count of tasks executed right now by every pool, including retired ones
+        self.running: dict[Pool, int] = {}
+        # Pools with a lost task, terminated when their last running task is finished
+        self.retired: set[Pool] = set()
+
+    def get_pool(self) -> Pool:
+        """Current pool, started when missing, called under the lock."""
+        if self.pool is None:
+            logger.info(
+                'Starting a process pool of %s processes, recycled after %s tasks',
+                self.processes, self.max_tasks_per_child
+            )
+            context = multiprocessing.get_context(self.start_method)
+            self.pool = context.Pool(self.processes, maxtasksperchild=self.max_tasks_per_child)
+            self.running[self.pool] = 0
+        return self.pool
+
+    def execute(
+            self, exec_function: Callable[[Any], Any], task: dict[str, Any], timeout: float | None = None
+    ) -> Any:
+        """Raises multiprocessing.TimeoutError when no result comes within timeoutSeconds of the task or timeout."""
+        timeout = task.get('timeoutSeconds') or timeout
+        with self.lock:
+            pool = self.get_pool()
+            self.running[pool] += 1
+            result = pool.apply_async(run_exec_function, (exec_function, task))
+        try:
+            # Blocks only the calling consumer thread, the GIL is released while waiting for the result
+            return result.get(timeout)
+        except multiprocessing.TimeoutError:
+            logger.error(
+                'No result of a task %s from a pool process within %s seconds, replacing the pool',
+                task.get('taskId'), timeout
+            )
+            with self.lock:
+                if self.pool is pool:
+                    self.pool = None
+                self.retired.add(pool)
+            raise
+        finally:
+            self.task_finished(pool)
+
+    def task_finished(self, pool: Pool) -> None:
+        with self.lock:
+            self.running[pool] -= 1
+            terminate = pool in self.retired and self.running[pool] == 0
+            if terminate:
+                self.retired.discard(pool)
+                del self.running[pool]
+        if terminate:
+            pool.terminate()
+
+    def close(self) -> None:
+        with self.lock:
+            if self.pool is not None:
+                self.pool.close()
+                self.pool.join()
+                del self.running[self.pool]
+                self.pool = None
+            for pool in self.retired:
+                pool.terminate()
+                del self.running[pool]
+            self.retired.clear()
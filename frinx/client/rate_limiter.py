@@ -0,0 +1,111 @@
+import threading
+import time
+from contextlib import ExitStack
+
+from pydantic import BaseModel
+from pydantic import Field
+
+from frinx.common.telemetry.common import increment_task_paused
+from frinx.common.telemetry.metrics import Metrics
+
+
+class EndpointRateLimitSettings(BaseModel):
+    # Polls of all task types of the endpoint per second
+    rate: float = Field(gt=0)
+    # Polls allowed at once after an idle period, defaults to one second worth of the rate
+    burst: int | None = Field(default=None, ge=1)
+    # Task types calling the endpoint
+    task_types: list[str] = Field(default=[])
+
+
+class TokenBucket:
+    """Tokens refill continuously at rate per second up to capacity, polling a task takes one token."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self) -> float:
+        """Add tokens accumulated since the last refill and return the available ones, called under the lock."""
+        now = time.monotonic()
+        self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.capacity)
+        self.updated = now
+        return self.tokens
+
+    def available(self) -> float:
+        with self.lock:
+            return self.refill()
+
+    def delay(self) -> float:
+        """Seconds until the next whole token is available."""
+        with self.lock:
+            return max(1 - self.refill(), 0) / self.rate
+
+
+class RateLimiter:
+    """
+    Client-side token buckets checked before every poll, so a fleet of workers does not burst against
+    fragile devices or services.
+
+    Every task type with rateLimitPerFrequency in its definition gets its own bucket refilled with
+    rateLimitPerFrequency tokens per rateLimitFrequencyInSeconds. Task types calling the same downstream endpoint
+    additionally share a bucket of the endpoint. A poll takes tokens from all buckets of its task type at once,
+    the task bucket is always locked before the endpoint bucket, so consumer, prefetch and long-poll threads
+    can take them concurrently. Polls withheld for lack of tokens are counted by the task_paused metric.
+    """
+
+    def __init__(self, metrics: Metrics, endpoints: dict[str, EndpointRateLimitSettings] | None = None) -> None:
+        self.metrics = metrics
+        self.endpoint_buckets: dict[str, TokenBucket] = {}
+        self.endpoints: dict[str, str] = {}
+        for name, endpoint in (endpoints or {}).items():
+            self.endpoint_buckets[name] = TokenBucket(endpoint.rate, endpoint.burst or max(endpoint.rate, 1))
+            self.endpoints.update(dict.fromkeys(endpoint.task_types, name))
+        # Buckets of a task type in their lock order, task types without a limit have none
+        self.buckets: dict[str, tuple[TokenBucket, ...]] = {}
+
+    def register_task_type(
+            self, task_type: str, rate_limit_per_frequency: int | None = None,
+            rate_limit_frequency_in_seconds: int | None = None
+    ) -> None:
+        buckets = []
+        # Conductor treats missing or zero limits as unlimited
+        if rate_limit_per_frequency and rate_limit_frequency_in_seconds:
+            buckets.append(
+                TokenBucket(rate_limit_per_frequency / rate_limit_frequency_in_seconds, rate_limit_per_frequency)
+            )
+        if task_type in self.endpoints:
+            buckets.append(self.endpoint_buckets[self.endpoints[task_type]])
+        self.buckets[task_type] = tuple(buckets)
+
+    def available(self, task_type: str) -> bool:
+        """True when a task of the type can be polled, does not take any token."""
+        return all(bucket.available() >= 1 for bucket in self.buckets.get(task_type, ()))
+
+    def acquire(self, task_type: str, count: int) -> int:
+        """
+        Take tokens for up to count tasks of the type from all its buckets, return the count of taken tokens.
+
+        Only a poll withheld here is counted as paused, checks by available are not.
+        """
+        buckets = self.buckets.get(task_type)
+        if not buckets:
+            return count
+
+        with ExitStack() as stack:
+            for bucket in buckets:
+                stack.enter_context(bucket.lock)
+            granted = min(count, *(int(bucket.refill()) for bucket in buckets))
+            for bucket in buckets:
+                bucket.tokens -= granted
+
+        if granted == 0:
+            increment_task_paused(self.metrics, task_type)
+        return granted
+
+    def delay(self, task_type: str) -> float:
+        """Seconds until a task of the type can be polled again."""
+        return max((bucket.delay() for bucket in self.buckets.get(task_type, ())), default=0.0)
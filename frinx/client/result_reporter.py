@@ -0,0 +1,108 @@
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Status codes of failed updates which are worth sending again
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class TaskResultReporter:
+    """
+    Sends task results to Conductor from a small pool of sender threads.
+
+    Consumer threads only enqueue a finished task and continue with the next one. The queue is bounded,
+    so when Conductor acknowledges updates slower than tasks finish, consumer threads block in report and
+    stop polling new work. Updates failing on connection errors or retryable status codes are sent again
+    with an exponential backoff, a result which cannot be delivered is logged and the task times out on
+    the server side. Sender threads are daemons, so results still queued are lost unless flush is called
+    before the process exits.
+    """
+
+    def __init__(
+            self, update_task: Callable[[dict[str, Any]], Any], sender_count: int = 4, queue_size: int = 100,
+            max_retries: int = 3, retry_backoff: float = 0.5, max_retry_backoff: float = 10.0,
+            observe: Callable[[str, float, bool], None] | None = None
+    ) -> None:
+        self.update_task = update_task
+        # Called with the task type, duration and failure of every update attempt of a result reported with
+        # its task type
+        self.observe = observe
+        self.sender_count = sender_count
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.results: queue.Queue[tuple[dict[str, Any], str | None]] = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.senders: list[threading.Thread] = []
+
+    def start(self) -> None:
+        with self.lock:
+            if self.senders:
+                return
+            for _ in range(self.sender_count):
+                thread = threading.Thread(target=self.send_results, daemon=True)
+                thread.start()
+                self.senders.append(thread)
+
+    def report(self, task: dict[str, Any], task_type: str | None = None) -> None:
+        self.start()
+        # Blocks the calling consumer thread while the queue is full
+        self.results.put((task, task_type))
+
+    def flush(self, timeout: float | None = None) -> int:
+        """Wait up to timeout seconds until all reported results are sent or dropped, returns the count left."""
+        with self.results.all_tasks_done:
+            self.results.all_tasks_done.wait_for(lambda: self.results.unfinished_tasks == 0, timeout)
+            unsent = self.results.unfinished_tasks
+        if unsent > 0:
+            logger.error(
+                'Dropping %s task results not sent within %s seconds, the tasks will time out', unsent, timeout
+            )
+        return unsent
+
+    def send_results(self) -> None:
+        while True:
+            task, task_type = self.results.get()
+            try:
+                self.send(task, task_type)
+            finally:
+                self.results.task_done()
+
+    def send(self, task: dict[str, Any], task_type: str | None = None) -> None:
+        attempt = 0
+        while True:
+            update_start = time.monotonic()
+            try:
+                self.update_task(task)
+                self.observe_update(task_type, update_start, False)
+                return
+            except Exception as error:
+                self.observe_update(task_type, update_start, True)
+                if attempt >= self.max_retries or not is_retryable(error):
+                    logger.error(
+                        'Unable to update a task %s, it may have timed out', task['taskId'], exc_info=True
+                    )
+                    return
+                backoff = min(self.retry_backoff * 2 ** attempt, self.max_retry_backoff)
+                logger.warning(
+                    'Update of a task %s failed, retrying in %s seconds: %s', task['taskId'], backoff, error
+                )
+                attempt += 1
+                time.sleep(backoff)
+
+    def observe_update(self, task_type: str | None, update_start: float, failed: bool) -> None:
+        if self.observe is not None and task_type is not None:
+            self.observe(task_type, time.monotonic() - update_start, failed)
@@ -0,0 +1,78 @@
+from collections.abc import Callable
+from collections.abc import Mapping
+
+# Smoothing factor of the moving average of observed execution times
+EXECUTION_TIME_ALPHA = 0.2
+# Execution times are clamped to this minimum, so instant tasks do not get an unbounded weight
+MIN_EXECUTION_TIME = 0.001
+
+
+class WeightedFairScheduler:
+    """
+    Picks the next task type to poll using smooth weighted round-robin over non-empty queues only.
+
+    Weight of a task type is its queue depth multiplied by its priority and divided by its average execution
+    time. Deep queues therefore drain proportionally to their depth, while each task type gets a share of
+    consumer thread time instead of a share of polls. The scheduler is not thread-safe, callers of select
+    hold a lock guarding the current weights and execution times of a task type are recorded under a lock
+    of the task type.
+    """
+
+    def __init__(self, priorities: Mapping[str, float] | None = None) -> None:
+        self.priorities = dict(priorities or {})
+        self.execution_times: dict[str, float] = {}
+        self.current_weights: dict[str, float] = {}
+
+    def reset(self) -> None:
+        """Forget accumulated weights, called whenever a new queue snapshot arrives."""
+        self.current_weights = {}
+
+    def record_execution_time(self, task_type: str, execution_time: float) -> None:
+        execution_time = max(execution_time, MIN_EXECUTION_TIME)
+        average = self.execution_times.get(task_type)
+        if average is None:
+            self.execution_times[task_type] = execution_time
+        else:
+            self.execution_times[task_type] = average + EXECUTION_TIME_ALPHA * (execution_time - average)
+
+    def weight(self, task_type: str, queue_depth: int) -> float:
+        execution_time = self.execution_times.get(task_type)
+        if execution_time is None:
+            # Task types which were never executed are treated as average ones
+            execution_time = self.average_execution_time()
+        return queue_depth * self.priorities.get(task_type, 1.0) / execution_time
+
+    def average_execution_time(self) -> float:
+        if not self.execution_times:
+            return 1.0
+        # Copied at once, execution times of new task types may be recorded by other threads meanwhile
+        execution_times = list(self.execution_times.values())
+        return sum(execution_times) / len(execution_times)
+
+    def select(
+            self, queue: Mapping[str, int], is_available: Callable[[str], bool],
+            current_weights: dict[str, float] | None = None
+    ) -> str | None:
+        """Select a task type, current_weights kept by the caller replace the weights of the scheduler."""
+        if current_weights is None:
+            current_weights = self.current_weights
+        selected = None
+        selected_weight = 0.0
+        total_weight = 0.0
+
+        for task_type, queue_depth in queue.items():
+            if not is_available(task_type):
+                continue
+
+            weight = self.weight(task_type, queue_depth)
+            current_weight = current_weights.get(task_type, 0.0) + weight
+            current_weights[task_type] = current_weight
+            total_weight += weight
+
+            if selected is None or current_weight > selected_weight:
+                selected = task_type
+                selected_weight = current_weight
+
+        if selected is not None:
+            current_weights[selected] -= total_weight
+        return selected
@@ -1,4 +1,3 @@
-import json
 import logging
 from collections.abc import Callable
 from types import MappingProxyType
@@ -9,6 +8,7 @@ import aiohttp
 import requests
 from websockets.legacy.client import connect as ws_connect
 
+from frinx.common import json_codec
 from frinx.common.type_aliases import DictAny
 from frinx.common.type_aliases import DictStr
 
@@ -52,13 +52,13 @@ class GraphqlClient:
 
         result = requests.post(
             self.endpoint,
-            json=request_body,
-            headers={**self.headers, **headers},
+            data=json_codec.encode(request_body),
+            headers={'Content-Type': 'application/json', **self.headers, **headers},
             **{**self.options, **kwargs},
         )
 
         result.raise_for_status()
-        return result.json()
+        return json_codec.loads(result.content)
 
     async def execute_async(
         self,
@@ -75,10 +75,10 @@ class GraphqlClient:
         async with aiohttp.ClientSession() as session:
             async with session.post(
                     self.endpoint,
-                    json=request_body,
-                    headers={**self.headers, **headers},
+                    data=json_codec.encode(request_body),
+                    headers={'Content-Type': 'application/json', **self.headers, **headers},
             ) as response:
-                return await response.json()
+                return json_codec.loads(await response.read())
 
     async def subscribe(
         self,
@@ -92,13 +92,13 @@ class GraphqlClient:
         headers = headers if headers is not None else {}
         init_payload = init_payload if init_payload is not None else {}
 
-        connection_init_message = json.dumps(
+        connection_init_message = json_codec.dumps(
             {'type': 'connection_init', 'payload': init_payload}
         )
         request_body = self.__request_body(
             query=query, variables=variables, operation_name=operation_name
         )
-        request_message = json.dumps(
+        request_message = json_codec.dumps(
             {'type': 'start', 'id': '1', 'payload': request_body}
         )
 
@@ -110,7 +110,7 @@ class GraphqlClient:
             await websocket.send(connection_init_message)
             await websocket.send(request_message)
             async for response_message in websocket:
-                response_body = json.loads(response_message)
+                response_body = json_codec.loads(response_message)
                 if response_body['type'] == 'connection_ack':
                     logger.info('the server accepted the connection')
                 elif response_body['type'] == 'ka':
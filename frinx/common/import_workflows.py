@@ -1,9 +1,9 @@
-import json
 import logging
 import os
 
 import requests
 
+from frinx.common import json_codec
 from frinx.common.frinx_rest import CONDUCTOR_HEADERS
 from frinx.common.frinx_rest import CONDUCTOR_URL_BASE
 
@@ -17,12 +17,14 @@ def register_workflow(workflow: str, overwrite: bool = False) -> None:
         raise Exception('bad input')
 
     try:
+        # Parsed once to validate the definition, the parsed object is sent as is
+        payload = json_codec.loads(workflow)
+        logger.debug(workflow)
         match overwrite:
             case True:
-                logger.debug(json.dumps([json.loads(workflow)]))
                 response = requests.put(
                     workflow_import_url,
-                    data=json.dumps([json.loads(workflow)]),
+                    data=json_codec.encode([payload]),
                     headers=CONDUCTOR_HEADERS,
                     timeout=60,
                 )
@@ -33,11 +35,9 @@ def register_workflow(workflow: str, overwrite: bool = False) -> None:
                         response.content,
                     )
             case False:
-                logger.debug(json.dumps(json.loads(workflow)))
-
                 response = requests.post(
                     workflow_import_url,
-                    data=json.dumps(json.loads(workflow)),
+                    data=json_codec.encode(payload),
                     headers=CONDUCTOR_HEADERS,
                     timeout=60,
                 )
@@ -63,11 +63,11 @@ def import_workflows(path: str) -> None:
                         with open(entry) as payload_file:
                             # api expects array in payload
                             payload = []
-                            payload_json = json.load(payload_file)
+                            payload_json = json_codec.loads(payload_file.read())
                             payload.append(payload_json)
                             response = requests.put(
                                 workflow_import_url,
-                                data=json.dumps(payload),
+                                data=json_codec.encode(payload),
                                 headers=CONDUCTOR_HEADERS,
                                 timeout=60,
                             )
@@ -0,0 +1,96 @@
+"""
+JSON codec shared by the whole SDK.
+
+Payloads are encoded and decoded by orjson when it is installed ('pip install frinx-python-sdk[fast-json]'),
+with the standard json module as a fallback. Another codec can be plugged in with set_codec.
+"""
+import json
+from typing import Any
+
+JSONDecodeError = json.JSONDecodeError
+
+
+class JsonCodec:
+    """Codec based on the standard json module, non-ASCII characters are kept as they are."""
+
+    name = 'json'
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf8')
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    def loads(self, data: str | bytes | bytearray) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Codec based on orjson, objects not supported by orjson are encoded by the standard json module."""
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson  # noqa: PLC0415 - optional dependency, ImportError selects the json fallback
+
+        self.orjson = orjson
+        self.options = orjson.OPT_NON_STR_KEYS
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            encoded: bytes = self.orjson.dumps(obj, option=self.options)
+            return encoded
+        except TypeError:
+            # E.g. integers over 64 bits or subclasses of builtin types
+            return super().encode(obj)
+
+    def dumps(self, obj: Any) -> str:
+        return self.encode(obj).decode('utf8')
+
+    def loads(self, data: str | bytes | bytearray) -> Any:
+        # orjson.JSONDecodeError is a subclass of json.JSONDecodeError
+        return self.orjson.loads(data)
+
+
+class EncodedDict(dict[str, Any]):
+    """Dict with its JSON encoding computed ahead, encode returns the encoding instead of encoding the dict again.
+
+    The dict must not be changed once encoded, the change would not be sent.
+    """
+
+    def __init__(self, obj: dict[str, Any], encoded: bytes) -> None:
+        super().__init__(obj)
+        self.encoded = encoded
+
+
+def default_codec() -> JsonCodec:
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return JsonCodec()
+
+
+codec = default_codec()
+
+
+def get_codec() -> JsonCodec:
+    return codec
+
+
+def set_codec(new_codec: JsonCodec) -> None:
+    global codec  # noqa: PLW0603 - module-level codec is swapped at runtime by design
+    codec = new_codec
+
+
+def encode(obj: Any) -> bytes:
+    if isinstance(obj, EncodedDict):
+        return obj.encoded
+    return codec.encode(obj)
+
+
+def dumps(obj: Any) -> str:
+    return codec.dumps(obj)
+
+
+def loads(data: str | bytes | bytearray) -> Any:
+    return codec.loads(data)
@@ -26,6 +26,30 @@ def increment_task_execution_queue_full(metrics: Metrics, task_type: str) -> Non
     )
 
 
+def increment_task_lease_extended(metrics: Metrics, task_type: str) -> None:
+    metrics.increment_counter(
+        name=MetricName.TASK_LEASE_EXTENDED,
+        documentation=MetricDocumentation.TASK_LEASE_EXTENDED,
+        labels={MetricLabel.TASK_TYPE: task_type},
+    )
+
+
+def increment_thread_pool_saturated(metrics: Metrics, pool: str) -> None:
+    metrics.increment_counter(
+        name=MetricName.THREAD_POOL_SATURATED,
+        documentation=MetricDocumentation.THREAD_POOL_SATURATED,
+        labels={MetricLabel.POOL: pool},
+    )
+
+
+def increment_thread_pool_scaled(metrics: Metrics, pool: str, direction: str) -> None:
+    metrics.increment_counter(
+        name=MetricName.THREAD_POOL_SCALED,
+        documentation=MetricDocumentation.THREAD_POOL_SCALED,
+        labels={MetricLabel.POOL: pool, MetricLabel.DIRECTION: direction},
+    )
+
+
 def increment_uncaught_exception(metrics: Metrics, task_type: str) -> None:
     metrics.increment_counter(
         name=MetricName.THREAD_UNCAUGHT_EXCEPTION,
@@ -154,3 +178,39 @@ def record_task_execute_time(metrics: Metrics, task_type: str, time_spent: float
         labels={MetricLabel.TASK_TYPE: task_type},
         value=time_spent,
     )
+
+
+def record_task_in_flight(metrics: Metrics, task_type: str, count: int) -> None:
+    metrics.record_gauge(
+        name=MetricName.TASK_IN_FLIGHT,
+        documentation=MetricDocumentation.TASK_IN_FLIGHT,
+        labels={MetricLabel.TASK_TYPE: task_type},
+        value=count,
+    )
+
+
+def record_task_concurrency_limit(metrics: Metrics, task_type: str, limit: int) -> None:
+    metrics.record_gauge(
+        name=MetricName.TASK_CONCURRENCY_LIMIT,
+        documentation=MetricDocumentation.TASK_CONCURRENCY_LIMIT,
+        labels={MetricLabel.TASK_TYPE: task_type},
+        value=limit,
+    )
+
+
+def record_thread_pool_busy(metrics: Metrics, pool: str, count: int) -> None:
+    metrics.record_gauge(
+        name=MetricName.THREAD_POOL_BUSY,
+        documentation=MetricDocumentation.THREAD_POOL_BUSY,
+        labels={MetricLabel.POOL: pool},
+        value=count,
+    )
+
+
+def record_thread_pool_threads(metrics: Metrics, pool: str, count: int) -> None:
+    metrics.record_gauge(
+        name=MetricName.THREAD_POOL_THREADS,
+        documentation=MetricDocumentation.THREAD_POOL_THREADS,
+        labels={MetricLabel.POOL: pool},
+        value=count,
+    )
@@ -5,9 +5,12 @@ class MetricDocumentation(str, Enum):
     EXTERNAL_PAYLOAD_USED = 'Incremented each time external payload storage is used'
     TASK_ACK_ERROR = 'Task ack has encountered an exception'
     TASK_ACK_FAILED = 'Task ack failed'
+    TASK_CONCURRENCY_LIMIT = 'Records count of tasks of a type allowed to run at once by the adaptive controller'
     TASK_EXECUTE_ERROR = 'Execution error'
     TASK_EXECUTE_TIME = 'Time to execute a task'
     TASK_EXECUTION_QUEUE_FULL = 'Counter to record execution queue has saturated'
+    TASK_IN_FLIGHT = 'Records count of tasks executed by the worker right now'
+    TASK_LEASE_EXTENDED = 'Incremented each time a lease of a long-running task is extended'
     TASK_PAUSED = (
         'Counter for number of times the task has been polled, when the worker has been paused'
     )
@@ -16,16 +19,22 @@ class MetricDocumentation(str, Enum):
     TASK_POLL_TIME = 'Time to poll for a batch of tasks'
     TASK_RESULT_SIZE = 'Records output payload size of a task'
     TASK_UPDATE_ERROR = 'Task status cannot be updated back to server'
+    THREAD_POOL_BUSY = 'Records count of consumer threads of a thread pool executing a task'
+    THREAD_POOL_SATURATED = 'Incremented each time all consumer threads of a thread pool become busy'
+    THREAD_POOL_SCALED = 'Incremented each time a consumer thread of a thread pool is started or retired'
+    THREAD_POOL_THREADS = 'Records count of consumer threads of a thread pool'
     THREAD_UNCAUGHT_EXCEPTION = 'thread_uncaught_exceptions'
     WORKFLOW_START_ERROR = 'Counter for workflow start errors'
     WORKFLOW_INPUT_SIZE = 'Records input payload size of a workflow'
 
 
 class MetricLabel(str, Enum):
+    DIRECTION = 'direction'
     ENTITY_NAME = 'entityName'
     EXCEPTION = 'exception'
     OPERATION = 'operation'
     PAYLOAD_TYPE = 'payload_type'
+    POOL = 'pool'
     TASK_TYPE = 'taskType'
     WORKFLOW_TYPE = 'workflowType'
     WORKFLOW_VERSION = 'version'
@@ -35,15 +44,22 @@ class MetricName(str, Enum):
     EXTERNAL_PAYLOAD_USED = 'external_payload_used'
     TASK_ACK_ERROR = 'task_ack_error'
     TASK_ACK_FAILED = 'task_ack_failed'
+    TASK_CONCURRENCY_LIMIT = 'task_concurrency_limit'
     TASK_EXECUTE_ERROR = 'task_execute_error'
     TASK_EXECUTE_TIME = 'task_execute_time'
     TASK_EXECUTION_QUEUE_FULL = 'task_execution_queue_full'
+    TASK_IN_FLIGHT = 'task_in_flight'
+    TASK_LEASE_EXTENDED = 'task_lease_extended'
     TASK_PAUSED = 'task_paused'
     TASK_POLL = 'task_poll'
     TASK_POLL_ERROR = 'task_poll_error'
     TASK_POLL_TIME = 'task_poll_time'
     TASK_RESULT_SIZE = 'task_result_size'
     TASK_UPDATE_ERROR = 'task_update_error'
+    THREAD_POOL_BUSY = 'thread_pool_busy'
+    THREAD_POOL_SATURATED = 'thread_pool_saturated'
+    THREAD_POOL_SCALED = 'thread_pool_scaled'
+    THREAD_POOL_THREADS = 'thread_pool_threads'
     THREAD_UNCAUGHT_EXCEPTION = 'thread_uncaught_exceptions'
     WORKFLOW_INPUT_SIZE = 'workflow_input_size'
     WORKFLOW_START_ERROR = 'workflow_start_error'
@@ -1,9 +1,12 @@
+import os
 from threading import Lock
 from typing import Any
 
 from prometheus_client import Counter
 from prometheus_client import Gauge
+from prometheus_client import multiprocess
 from prometheus_client import start_wsgi_server
+from prometheus_client import values
 from prometheus_client.registry import CollectorRegistry
 from pydantic import BaseModel
 from pydantic import Field
@@ -36,6 +39,7 @@ class Metrics(metaclass=MetricsSingletonMeta):
     gauges: dict[str, Gauge] = {}
     registry: CollectorRegistry
     settings: MetricsSettings
+    multiprocess_dir: str | None = None
 
     def __init__(self, settings: MetricsSettings | None = None):
         if settings is not None:
@@ -49,6 +53,32 @@ class Metrics(metaclass=MetricsSingletonMeta):
             self.registry = CollectorRegistry()
             start_wsgi_server(self.settings.port, registry=self.registry)
 
+    def enable_multiprocess(self, directory: str) -> None:
+        """
+        Keep values of metrics in files of a directory shared by forked worker processes.
+
+        Has to be called before the processes are forked. The endpoint of this process then serves metrics
+        aggregated from all processes, metrics created by this process so far are dropped.
+        """
+        if not self.settings.metrics_enabled:
+            return
+
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = directory
+        # Value class is chosen by prometheus_client on import, metrics created from now on use the files
+        values.ValueClass = values.get_value_class()  # type: ignore[no-untyped-call]
+        for collector in [*self.counters.values(), *self.gauges.values()]:
+            self.registry.unregister(collector)
+        self.counters.clear()
+        self.gauges.clear()
+
+        multiprocess.MultiProcessCollector(self.registry, path=directory)  # type: ignore[no-untyped-call]
+        self.multiprocess_dir = directory
+
+    def mark_process_dead(self, pid: int) -> None:
+        """Drop gauges of an exited worker process from the aggregated metrics."""
+        if self.multiprocess_dir is not None:
+            multiprocess.mark_process_dead(pid, self.multiprocess_dir)  # type: ignore[no-untyped-call]
+
     def increment_counter(
             self, name: MetricName, documentation: MetricDocumentation, labels: dict[MetricLabel, str]
     ) -> None:
@@ -96,6 +126,8 @@ class Metrics(metaclass=MetricsSingletonMeta):
     def __generate_gauge(
             self, name: MetricName, documentation: MetricDocumentation, label_names: list[MetricLabel]
     ) -> Gauge:
+        # Gauges of live worker processes are exported per process when metrics are shared by processes
         return Gauge(
-            name=name, documentation=documentation, labelnames=label_names, registry=self.registry
+            name=name, documentation=documentation, labelnames=label_names, registry=self.registry,
+            multiprocess_mode='liveall'
         )
@@ -17,8 +17,12 @@ class ServiceWorkersImpl:
         return self.service_workers
 
     def register(self, conductor_client: FrinxConductorWrapper) -> None:
+        # Definitions of all workers are diffed against the server and registered in one request
+        conductor_client.register_task_definitions(
+            [task.task_def.dict(by_alias=True, exclude_none=True) for task in self.service_workers]
+        )
         for task in self.service_workers:
-            task.register(conductor_client)
+            task.register(conductor_client, register_definition=False)
 
     @classmethod
     def _inner_class_list(cls) -> list[WorkerImpl]:
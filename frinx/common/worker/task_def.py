@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from enum import Enum
 from typing import Optional
 
 from pydantic import BaseModel
@@ -104,9 +105,17 @@ class FailedTaskError(ConductorWorkerError):
         self.error_msg = error_msg
 
 
+class ExecutionBackend(str, Enum):
+    # Execute on the consumer thread which polled the task
+    THREAD = 'THREAD'
+    # Execute in a shared pool of processes, suitable for CPU-bound workers
+    PROCESS = 'PROCESS'
+
+
 class TaskExecutionProperties(BaseModel):
     exclude_empty_inputs: bool = False
     transform_string_to_json_valid: bool = False
+    execution_backend: ExecutionBackend = ExecutionBackend.THREAD
 
     class Config:
         allow_mutation = False
@@ -6,6 +6,7 @@ from pydantic import Field
 from pydantic import validator
 
 from frinx.common.conductor_enums import TaskResultStatus
+from frinx.common.type_aliases import DictAny
 from frinx.common.util import snake_to_camel_case
 from frinx.common.worker.task_def import TaskOutput
 
@@ -30,6 +31,10 @@ class TaskResult(BaseModel, Generic[TO]):
     status: TaskResultStatus
     output: TO | None = None
     logs: list[str] | str = Field(default=[])
+    # Conductor hands an IN_PROGRESS task back to a worker after this delay
+    callback_after_seconds: int | None = Field(default=None, ge=0)
+    # State of an IN_PROGRESS task, returned by WorkerImpl.get_checkpoint when the task is executed again
+    checkpoint: DictAny | None = None
 
     class Config:
         validate_assignment = True
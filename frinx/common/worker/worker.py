@@ -1,9 +1,10 @@
+import inspect
 import logging
 import time
 from abc import ABC
 from abc import abstractmethod
-from json import JSONDecodeError
-from json import loads as json_loads
+from collections.abc import Awaitable
+from contextvars import ContextVar
 from typing import Any
 from typing import TypeAlias
 
@@ -11,6 +12,7 @@ from pydantic import ValidationError
 from pydantic.dataclasses import dataclass
 
 from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.common import json_codec
 from frinx.common.conductor_enums import TaskResultStatus
 from frinx.common.telemetry.common import increment_task_execution_error
 from frinx.common.telemetry.common import increment_task_poll
@@ -35,6 +37,11 @@ metrics = Metrics()
 RawTaskIO: TypeAlias = dict[str, Any]
 TaskExecLog: TypeAlias = str
 
+# Checkpoint of an IN_PROGRESS task is kept by Conductor in the output data of the task
+CHECKPOINT_KEY = '_checkpoint'
+# Checkpoint of the task executed in the current thread or asyncio task
+task_checkpoint: ContextVar[DictAny | None] = ContextVar('task_checkpoint', default=None)
+
 
 class Config:
     arbitrary_types_allowed = True
@@ -103,20 +110,37 @@ class WorkerImpl(ABC):
 
         return task_def
 
-    def register(self, conductor_client: FrinxConductorWrapper) -> None:
+    def register(self, conductor_client: FrinxConductorWrapper, register_definition: bool = True) -> None:
         conductor_client.register(
             task_type=self.task_def.name,
             task_definition=self.task_def.dict(by_alias=True, exclude_none=True),
-            exec_function=self._execute_wrapper,
+            exec_function=self._execute_wrapper_async if self.is_async() else self._execute_wrapper,
+            execution_backend=self.ExecutionProperties().execution_backend,
+            register_definition=register_definition,
         )
 
     @abstractmethod
-    def execute(self, worker_input: Any) -> TaskResult[Any]:
+    def execute(self, worker_input: Any) -> TaskResult[Any] | Awaitable[TaskResult[Any]]:
         # worker_input parameter has to be of type any, otherwise all other subclasses of WorkerImpl would
         # violate Liskov substitution principle.
         # https://mypy.readthedocs.io/en/stable/common_issues.html#incompatible-overrides
+        # Execute can be also defined as a coroutine, e.g. 'async def execute', to run on an event loop.
         pass
 
+    @staticmethod
+    def get_checkpoint() -> DictAny | None:
+        """
+        State saved by the previous IN_PROGRESS result of the executed task.
+
+        Long-running workers return IN_PROGRESS with callback_after_seconds and a checkpoint instead of
+        blocking a thread, Conductor hands the task back after the delay. None on the first execution.
+        """
+        return task_checkpoint.get()
+
+    @classmethod
+    def is_async(cls) -> bool:
+        return inspect.iscoroutinefunction(cls.execute)
+
     @classmethod
     def _execute_wrapper(cls, task: RawTaskIO) -> Any:
         task_type = str(task.get('taskType'))
@@ -132,8 +156,67 @@ class WorkerImpl(ABC):
             logger.error('Validation error occurred: %s', error)
             return TaskResult(status=TaskResultStatus.FAILED, logs=[TaskExecLog(str(error))]).dict()
 
+    @classmethod
+    async def _execute_wrapper_async(cls, task: RawTaskIO) -> Any:
+        task_type = str(task.get('taskType'))
+        increment_task_poll(metrics, task_type)
+        try:
+            logger.debug('Executing task %s:', task)
+            task_result: RawTaskIO = await cls._execute_func_async(task)
+            logger.debug('Task result %s:', task_result)
+            return task_result
+        except Exception as error:
+            increment_task_execution_error(metrics, task_type, error)
+            increment_uncaught_exception(metrics, task_type)
+            logger.error('Validation error occurred: %s', error)
+            return TaskResult(status=TaskResultStatus.FAILED, logs=[TaskExecLog(str(error))]).dict()
+
     @classmethod
     def _execute_func(cls, task: RawTaskIO) -> RawTaskIO:
+        worker_input = cls._parse_worker_input(task)
+        checkpoint_token = task_checkpoint.set(cls._read_checkpoint(task))
+        try:
+            if not metrics.settings.metrics_enabled:
+                return cls._result_to_dict(cls.execute(cls, worker_input))  # type: ignore[arg-type]
+
+            start_time = time.time()
+            task_result: RawTaskIO = cls._result_to_dict(cls.execute(cls, worker_input))  # type: ignore[arg-type]
+            finish_time = time.time()
+            record_task_execute_time(metrics, str(task.get('taskType')), finish_time - start_time)
+            return task_result
+        finally:
+            task_checkpoint.reset(checkpoint_token)
+
+    @classmethod
+    async def _execute_func_async(cls, task: RawTaskIO) -> RawTaskIO:
+        worker_input = cls._parse_worker_input(task)
+        checkpoint_token = task_checkpoint.set(cls._read_checkpoint(task))
+        try:
+            start_time = time.time()
+            task_result: TaskResult[Any] = await cls.execute(cls, worker_input)  # type: ignore[arg-type, misc]
+            finish_time = time.time()
+        finally:
+            task_checkpoint.reset(checkpoint_token)
+        if metrics.settings.metrics_enabled:
+            record_task_execute_time(metrics, str(task.get('taskType')), finish_time - start_time)
+        return cls._result_to_dict(task_result)
+
+    @staticmethod
+    def _read_checkpoint(task: RawTaskIO) -> DictAny | None:
+        output_data = task.get('outputData') or {}
+        checkpoint: DictAny | None = output_data.get(CHECKPOINT_KEY)
+        return checkpoint
+
+    @staticmethod
+    def _result_to_dict(task_result: TaskResult[Any]) -> RawTaskIO:
+        result = task_result.dict()
+        checkpoint = result.pop('checkpoint')
+        if checkpoint is not None:
+            result['output'] = {**(result['output'] or {}), CHECKPOINT_KEY: checkpoint}
+        return result
+
+    @classmethod
+    def _parse_worker_input(cls, task: RawTaskIO) -> TaskInput:
 
         input_data: DictAny = task['inputData']
         execution_properties = cls.ExecutionProperties()
@@ -149,28 +232,19 @@ class WorkerImpl(ABC):
             logger.debug('Worker input data after json serialization: %s:', input_data)
 
         try:
-            worker_input = cls.WorkerInput.parse_obj(input_data)
+            return cls.WorkerInput.parse_obj(input_data)
         except ValidationError as error:
             logger.error('Validation error occurred: %s', error)
             raise error
 
-        if not metrics.settings.metrics_enabled:
-            return cls.execute(cls, worker_input).dict()  # type: ignore[arg-type]
-
-        start_time = time.time()
-        task_result: RawTaskIO = cls.execute(cls, worker_input).dict()  # type: ignore[arg-type]
-        finish_time = time.time()
-        record_task_execute_time(metrics, str(task.get('taskType')), finish_time - start_time)
-        return task_result
-
     @classmethod
     def _transform_input_data_to_json(cls, input_data: DictAny) -> DictAny:
         for k, v in cls.WorkerInput.__fields__.items():
             if v.outer_type_ == list[str] or v.outer_type_ == DictAny:
                 if type(input_data.get(k)) == str:
                     try:
-                        input_data[k] = json_loads(str(input_data.get(k)))
-                    except JSONDecodeError as e:
+                        input_data[k] = json_codec.loads(str(input_data.get(k)))
+                    except json_codec.JSONDecodeError as e:
                         raise Exception(f'Worker input {k} is invalid JSON, {e}')
         return input_data
 
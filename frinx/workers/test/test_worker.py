@@ -1,3 +1,4 @@
+import math
 import random
 import time
 from typing import Optional
@@ -60,10 +61,22 @@ class TestWorker(ServiceWorkersImpl):
                     logs=['Invalid sleep time, must be > 0 and < 600'],
                 )
 
-            time.sleep(sleep)
+            checkpoint = self.get_checkpoint()
+            started = time.time() if checkpoint is None else checkpoint['started']
+            remaining = started + sleep - time.time()
+            if remaining > 0:
+                # Consumer thread is released right away, Conductor hands the task back after the sleep.
+                # A task handed back early, e.g. after a lost lease, sleeps for the rest of the time.
+                return TaskResult(
+                    status=TaskResultStatus.IN_PROGRESS,
+                    logs=['Sleep worker invoked. Sleeping'],
+                    callback_after_seconds=math.ceil(remaining),
+                    checkpoint={'started': started}
+                )
+
             return TaskResult(
                 status=TaskResultStatus.COMPLETED,
-                logs=['Sleep worker invoked. Sleeping'],
+                logs=['Sleep worker finished'],
                 output=self.WorkerOutput(time=sleep)
             )
 
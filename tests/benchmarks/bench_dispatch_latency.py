@@ -0,0 +1,175 @@
+"""
+Compare task pickup latency of the queue-scan and long-poll dispatch modes of FrinxConductorWrapper.
+
+The wrapper talks to an in-memory stand-in of the Conductor task API, so only the dispatch overhead
+of the SDK is measured. Run it as a script:
+
+    python tests/benchmarks/bench_dispatch_latency.py --tasks 200 --threads 8 --types 20
+
+It also measures pickup latency of the first tasks enqueued after the worker was idle for --idle seconds,
+pass --max-polling-interval to see the cost of the queue-scan backoff.
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections import deque
+from threading import Thread
+from typing import Any
+
+from frinx.client.conductor import TaskClient
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import DispatchMode
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+
+
+class InMemoryTaskClient(TaskClient):
+    """Task queues of Conductor kept in memory, poll requests honor the long-poll timeout."""
+
+    def __init__(self) -> None:
+        super().__init__('http://localhost')
+        self.condition = threading.Condition()
+        self.queues: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self.queue_scans = 0
+
+    def enqueue(self, task_type: str) -> None:
+        task = {
+            'taskId': str(uuid.uuid4()),
+            'taskType': task_type,
+            'inputData': {'enqueued': time.monotonic()},
+        }
+        with self.condition:
+            self.queues[task_type].append(task)
+            self.condition.notify_all()
+
+    def poll_for_task(self, task_type: str, worker_id: str, domain: str | None = None) -> Any:
+        with self.condition:
+            queue = self.queues[task_type]
+            return queue.popleft() if queue else None
+
+    def poll_for_batch(
+            self, task_type: str, count: int, timeout: int, worker_id: str, domain: str | None = None
+    ) -> Any:
+        deadline = time.monotonic() + timeout / 1000
+        with self.condition:
+            queue = self.queues[task_type]
+            while not queue and self.condition.wait(max(deadline - time.monotonic(), 0)):
+                pass
+            return [queue.popleft() for _ in range(min(count, len(queue)))]
+
+    def get_tasks_in_queue(self, task_name: str) -> Any:
+        with self.condition:
+            self.queue_scans += 1
+            return {task_type: len(queue) for task_type, queue in self.queues.items()}
+
+    def get_task_queue_sizes(self, task_types: list[str]) -> Any:
+        with self.condition:
+            self.queue_scans += 1
+            return {task_type: len(self.queues[task_type]) for task_type in task_types}
+
+    def update_task(self, task_obj: dict[str, Any]) -> Any:
+        return None
+
+
+class LatencyRecorder:
+    def __init__(self, expected: int) -> None:
+        self.latencies: list[float] = []
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.expected = expected
+
+    def exec_function(self, task: dict[str, Any]) -> dict[str, Any]:
+        latency = time.monotonic() - task['inputData']['enqueued']
+        with self.lock:
+            self.latencies.append(latency)
+            if len(self.latencies) >= self.expected:
+                self.done.set()
+        return {'status': 'COMPLETED', 'output': {}}
+
+
+def start_wrapper(
+        mode: DispatchMode, threads: int, types: int, interval: float, max_polling_interval: float | None,
+        recorder: LatencyRecorder
+) -> tuple[InMemoryTaskClient, list[str]]:
+    task_client = InMemoryTaskClient()
+    settings = ConductorWrapperSettings(dispatch_mode=mode, max_polling_interval=max_polling_interval)
+    wrapper = FrinxConductorWrapper('http://localhost', threads, polling_interval=interval, settings=settings)
+    wrapper.task_client = task_client
+    task_types = [f'BENCH_task_{index}' for index in range(types)]
+    for task_type in task_types:
+        wrapper.task_source.register_task_type(task_type, recorder.exec_function)
+
+    Thread(target=wrapper.start_workers, daemon=True).start()
+    return task_client, task_types
+
+
+def run_mode(
+        mode: DispatchMode, tasks: int, threads: int, types: int, interval: float, max_polling_interval: float | None
+) -> dict[str, float]:
+    recorder = LatencyRecorder(tasks)
+    task_client, task_types = start_wrapper(mode, threads, types, interval, max_polling_interval, recorder)
+    time.sleep(0.5)
+
+    for _ in range(tasks):
+        task_client.enqueue(random.choice(task_types))
+        time.sleep(random.uniform(0, 2 * interval))
+
+    recorder.done.wait(timeout=60)
+    latencies = sorted(recorder.latencies)
+    return {
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'max_ms': latencies[-1] * 1000,
+        'queue_scans': task_client.queue_scans,
+    }
+
+
+def run_after_idle(
+        mode: DispatchMode, rounds: int, idle: float, threads: int, types: int, interval: float,
+        max_polling_interval: float | None
+) -> list[float]:
+    """Pickup latencies in milliseconds of single tasks enqueued after the worker was idle for idle seconds."""
+    recorder = LatencyRecorder(rounds)
+    task_client, task_types = start_wrapper(mode, threads, types, interval, max_polling_interval, recorder)
+
+    for picked_up in range(1, rounds + 1):
+        time.sleep(idle)
+        task_client.enqueue(random.choice(task_types))
+        while len(recorder.latencies) < picked_up:
+            time.sleep(0.001)
+    return [latency * 1000 for latency in recorder.latencies]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=200, help='number of enqueued tasks per mode')
+    parser.add_argument('--threads', type=int, default=8, help='consumer thread count')
+    parser.add_argument('--types', type=int, default=20, help='registered task type count')
+    parser.add_argument('--interval', type=float, default=0.1, help='polling interval in seconds')
+    parser.add_argument('--max-polling-interval', type=float, default=None, help='queue-scan backoff limit')
+    parser.add_argument('--idle', type=float, default=3.0, help='idle period before a single task in seconds')
+    parser.add_argument('--idle-rounds', type=int, default=5, help='count of tasks enqueued after idle periods')
+    args = parser.parse_args()
+
+    for mode in DispatchMode:
+        result = run_mode(mode, args.tasks, args.threads, args.types, args.interval, args.max_polling_interval)
+        print(
+            f"{mode.value:<12} p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+            f"max {result['max_ms']:8.2f} ms  queue scans {result['queue_scans']}"
+        )
+
+    for mode in DispatchMode:
+        latencies = run_after_idle(
+            mode, args.idle_rounds, args.idle, args.threads, args.types, args.interval, args.max_polling_interval
+        )
+        print(
+            f"{mode.value:<12} after {args.idle:.1f} s idle  mean {statistics.mean(latencies):8.2f} ms  "
+            f"max {max(latencies):8.2f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare encoding and decoding speed of the available JSON codecs on representative task payloads.
+
+Payloads are a polled task with a device configuration in its input, a task result update and a batch
+of polled tasks. Run it as a script:
+
+    python tests/benchmarks/bench_json_codec.py --iterations 2000
+"""
+import argparse
+import time
+import uuid
+from typing import Any
+
+from frinx.common.json_codec import JsonCodec
+from frinx.common.json_codec import OrjsonCodec
+
+
+def polled_task(interfaces: int) -> dict[str, Any]:
+    return {
+        'taskType': 'UNICONFIG_Write_structured_device_data',
+        'status': 'IN_PROGRESS',
+        'taskId': str(uuid.uuid4()),
+        'workflowInstanceId': str(uuid.uuid4()),
+        'pollCount': 1,
+        'responseTimeoutSeconds': 3600,
+        'inputData': {
+            'device_id': 'R1',
+            'uri': '/frinx-openconfig-interfaces:interfaces',
+            'template': {
+                'interface': [
+                    {
+                        'name': f'GigabitEthernet0/0/0/{index}',
+                        'config': {'name': f'GigabitEthernet0/0/0/{index}', 'mtu': 1500, 'enabled': True},
+                        'description': 'uplink to core router',
+                        'counters': {'in-octets': index * 1024, 'out-octets': index * 2048, 'errors': 0.0},
+                    }
+                    for index in range(interfaces)
+                ]
+            },
+        },
+    }
+
+
+def task_result(task: dict[str, Any]) -> dict[str, Any]:
+    return {
+        'taskId': task['taskId'],
+        'workflowInstanceId': task['workflowInstanceId'],
+        'status': 'COMPLETED',
+        'outputData': {'response_body': task['inputData']['template'], 'response_code': 201},
+        'logs': ['Write of the structured device data finished'],
+        'workerId': 'worker-1',
+    }
+
+
+def measure(codec: JsonCodec, payload: Any, iterations: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded = codec.encode(payload)
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.loads(encoded)
+    decode_time = time.perf_counter() - start
+    return encode_time / iterations * 1e6, decode_time / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000, help='encodings and decodings per payload')
+    parser.add_argument('--interfaces', type=int, default=50, help='interfaces in the device configuration')
+    args = parser.parse_args()
+
+    codecs = [JsonCodec()]
+    try:
+        codecs.append(OrjsonCodec())
+    except ImportError:
+        print('orjson is not installed, only the json codec is measured')
+
+    task = polled_task(args.interfaces)
+    payloads = {
+        'polled task': task,
+        'task result': task_result(task),
+        'poll batch': [polled_task(args.interfaces // 10) for _ in range(10)],
+    }
+
+    print(f'{"payload":<12} {"codec":<8} {"size":>8} {"encode us":>10} {"decode us":>10}')
+    for label, payload in payloads.items():
+        for codec in codecs:
+            encode_us, decode_us = measure(codec, payload, args.iterations)
+            size = len(codec.encode(payload))
+            print(f'{label:<12} {codec.name:<8} {size:>8} {encode_us:>10.1f} {decode_us:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare throughput of short tasks with task results sent from consumer threads and by background senders.
+
+The wrapper talks to an in-memory stand-in of the Conductor task API, where every result update takes
+--update-delay seconds to be acknowledged and every task runs for --exec-time seconds. Run it as a script:
+
+    python tests/benchmarks/bench_result_reporting.py --tasks 2000 --threads 8 --exec-time 0.01
+"""
+import argparse
+import threading
+import time
+import uuid
+from collections import deque
+from threading import Thread
+from typing import Any
+
+from frinx.client.conductor import TaskClient
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import DispatchMode
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+
+TASK_TYPE = 'BENCH_short_task'
+
+
+class SlowUpdateTaskClient(TaskClient):
+    """One in-memory task queue, result updates are acknowledged after a fixed delay."""
+
+    def __init__(self, tasks: int, update_delay: float) -> None:
+        super().__init__('http://localhost')
+        self.lock = threading.Lock()
+        self.queue: deque[dict[str, Any]] = deque(
+            {'taskId': str(uuid.uuid4()), 'taskType': TASK_TYPE, 'inputData': {}} for _ in range(tasks)
+        )
+        self.update_delay = update_delay
+        self.expected = tasks
+        self.updated = 0
+        self.done = threading.Event()
+
+    def poll_for_batch(
+            self, task_type: str, count: int, timeout: int, worker_id: str, domain: str | None = None
+    ) -> Any:
+        with self.lock:
+            polled = [self.queue.popleft() for _ in range(min(count, len(self.queue)))]
+        if not polled:
+            time.sleep(timeout / 1000)
+        return polled
+
+    def update_task(self, task_obj: dict[str, Any]) -> Any:
+        time.sleep(self.update_delay)
+        with self.lock:
+            self.updated += 1
+            if self.updated >= self.expected:
+                self.done.set()
+
+
+def run(sender_count: int, tasks: int, threads: int, exec_time: float, update_delay: float) -> float:
+    def exec_function(task: dict[str, Any]) -> dict[str, Any]:
+        time.sleep(exec_time)
+        return {'status': 'COMPLETED', 'output': {}}
+
+    task_client = SlowUpdateTaskClient(tasks, update_delay)
+    settings = ConductorWrapperSettings(
+        dispatch_mode=DispatchMode.LONG_POLL, batch_poll_size=threads, result_sender_count=sender_count
+    )
+    wrapper = FrinxConductorWrapper('http://localhost', threads, settings=settings)
+    wrapper.task_client = task_client
+    wrapper.task_source.register_task_type(TASK_TYPE, exec_function)
+
+    start = time.monotonic()
+    Thread(target=wrapper.start_workers, daemon=True).start()
+    task_client.done.wait(timeout=120)
+    return tasks / (time.monotonic() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=2000, help='number of enqueued tasks per run')
+    parser.add_argument('--threads', type=int, default=8, help='consumer thread count')
+    parser.add_argument('--senders', type=int, default=4, help='background sender thread count')
+    parser.add_argument('--exec-time', type=float, default=0.01, help='duration of a task in seconds')
+    parser.add_argument('--update-delay', type=float, default=0.005, help='duration of a result update in seconds')
+    args = parser.parse_args()
+
+    for label, sender_count in (('synchronous', 0), ('pipelined', args.senders)):
+        throughput = run(sender_count, args.tasks, args.threads, args.exec_time, args.update_delay)
+        print(f'{label:<12} {throughput:10.1f} tasks/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Microbenchmark of TaskSource.get_next_task with many registered task types and consumer threads.
+
+Compares the weighted fair scheduler of TaskSource with the former round-robin spin over all registered
+task types. Only a few queues are non-empty, which is the usual state of a busy cluster. Run it as a script:
+
+    python tests/benchmarks/bench_task_scheduler.py --types 200 --threads 256 --non-empty 5
+"""
+import argparse
+import time
+from collections import Counter
+from threading import Thread
+from typing import Any
+
+from frinx.client.frinx_conductor_wrapper import NextWorkerTask
+from frinx.client.frinx_conductor_wrapper import RegisteredWorkerTask
+from frinx.client.frinx_conductor_wrapper import TaskSource
+
+
+class RoundRobinTaskSource(TaskSource):
+    """TaskSource selecting task types by spinning round-robin over all registered types."""
+
+    def __init__(self, worker_count: int) -> None:
+        super().__init__(worker_count=worker_count)
+        self.last_task_position = 0
+
+    def round_robin_task_types(self) -> str:
+        task_type = self.task_types_list[self.last_task_position]
+        self.last_task_position += 1
+        if self.last_task_position == len(self.task_types):
+            self.last_task_position = 0
+        return task_type
+
+    def get_next_task(
+            self, last_task_type: str | None, last_execution_time: float | None = None
+    ) -> NextWorkerTask | None:
+        if last_task_type:
+            self.task_finished(last_task_type)
+
+        with self.lock:
+            if len(self.filtered_queue) == 0:
+                return None
+
+            task_type = ''
+            while task_type not in self.filtered_queue:
+                task_type = self.round_robin_task_types()
+
+            counters = self.counters[task_type]
+            with counters.lock:
+                counters.running += 1
+            self.running_tasks.append(task_type)
+
+            registered_task: RegisteredWorkerTask = self.task_types[task_type]
+
+            self.filtered_queue[task_type] -= 1
+            if self.filtered_queue[task_type] <= 0:
+                self.filtered_queue.pop(task_type, None)
+
+            return NextWorkerTask(
+                task_type=task_type, exec_function=registered_task.exec_function, poll_uuid=self.actual_uuid
+            )
+
+
+def _exec_function(task: Any) -> Any:
+    return task
+
+
+def run(task_source: TaskSource, types: int, threads: int, non_empty: int, duration: float) -> dict[str, Any]:
+    task_types = [f'BENCH_task_{index}' for index in range(types)]
+    for task_type in task_types:
+        task_source.register_task_type(task_type, _exec_function)
+
+    # Non-empty queues are spread over the list of registered types, depths differ by an order of magnitude
+    step = max(types // non_empty, 1)
+    queue = {task_types[index * step]: 100 * 10 ** (index % 2) for index in range(non_empty)}
+
+    counters: list[Counter[str]] = [Counter() for _ in range(threads)]
+    start = time.monotonic()
+    deadline = start + duration
+
+    def consumer(counter: Counter[str]) -> None:
+        last_task_type = None
+        while time.monotonic() < deadline:
+            next_task = task_source.get_next_task(last_task_type, 0.01)
+            last_task_type = next_task.task_type if next_task else None
+            counter['calls'] += 1
+            if next_task:
+                counter[next_task.task_type] += 1
+            else:
+                # Idle consumer threads of the wrapper sleep for a polling interval
+                time.sleep(0.01)
+
+    def queue_scanner() -> None:
+        while time.monotonic() < deadline:
+            task_source.handle_tasks(dict(queue))
+            time.sleep(0.01)
+
+    workers = [Thread(target=queue_scanner, daemon=True)]
+    workers.extend(Thread(target=consumer, args=(counter,), daemon=True) for counter in counters)
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - start
+
+    total: Counter[str] = sum(counters, Counter())
+    calls = total.pop('calls')
+    return {'calls_per_second': calls / elapsed, 'tasks_per_second': sum(total.values()) / elapsed, 'tasks': total}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--types', type=int, default=200, help='registered task type count')
+    parser.add_argument('--threads', type=int, default=256, help='consumer thread count')
+    parser.add_argument('--non-empty', type=int, default=5, help='count of non-empty queues')
+    parser.add_argument('--duration', type=float, default=3.0, help='duration of a run in seconds')
+    args = parser.parse_args()
+
+    for name, task_source in (
+            ('round-robin', RoundRobinTaskSource(worker_count=args.threads)),
+            ('weighted-fair', TaskSource(worker_count=args.threads)),
+    ):
+        result = run(task_source, args.types, args.threads, args.non_empty, args.duration)
+        shares = ', '.join(f'{count}' for _, count in sorted(result['tasks'].items()))
+        print(
+            f"{name:<14} get_next_task {result['calls_per_second']:10.0f}/s  "
+            f"tasks {result['tasks_per_second']:10.0f}/s  tasks per queue [{shares}]"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Contention benchmark of TaskSource.get_next_task with a growing count of consumer threads.
+
+Consumer threads call get_next_task in a loop and spend --work seconds outside of TaskSource between calls,
+like a consumer thread waiting for Conductor. The queue scanner swaps in a new queue snapshot every
+--scan-interval seconds. Reported are calls per second and latencies of get_next_task and of handle_tasks,
+which grow with the time spent waiting for locks. Run it as a script:
+
+    python tests/benchmarks/bench_task_source_contention.py --threads 8 32 128 512 --types 200
+"""
+import argparse
+import statistics
+import time
+from threading import Thread
+from typing import Any
+
+from frinx.client.frinx_conductor_wrapper import TaskSource
+
+
+def _exec_function(task: Any) -> Any:
+    return task
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def run(threads: int, types: int, non_empty: int, batch: int, work: float, scan_interval: float,
+        duration: float) -> dict[str, float]:
+    task_source = TaskSource(max_batch_size=batch, worker_count=threads)
+    task_types = [f'BENCH_task_{index}' for index in range(types)]
+    for task_type in task_types:
+        task_source.register_task_type(task_type, _exec_function)
+
+    step = max(types // non_empty, 1)
+    # Queues never drain within a scan interval, so consumer threads are never parked
+    queue = {task_types[index * step]: 1_000_000 for index in range(non_empty)}
+    task_source.handle_tasks(dict(queue))
+
+    latencies: list[list[float]] = [[] for _ in range(threads)]
+    scan_latencies: list[float] = []
+    start = time.monotonic()
+    deadline = start + duration
+
+    def consumer(samples: list[float]) -> None:
+        last_task_type = None
+        while time.monotonic() < deadline:
+            call_start = time.perf_counter()
+            next_task = task_source.get_next_task(last_task_type, work)
+            samples.append(time.perf_counter() - call_start)
+            last_task_type = next_task.task_type if next_task else None
+            if next_task is not None and next_task.poll_count > 1:
+                # Tasks of a batch poll over the first one are handed over to the other consumer threads
+                task_source.claim_tasks(next_task.task_type, [{} for _ in range(next_task.poll_count - 1)])
+            time.sleep(work)
+
+    def queue_scanner() -> None:
+        while time.monotonic() < deadline:
+            scan_start = time.perf_counter()
+            task_source.handle_tasks(dict(queue))
+            scan_latencies.append(time.perf_counter() - scan_start)
+            time.sleep(scan_interval)
+
+    workers = [Thread(target=queue_scanner, daemon=True)]
+    workers.extend(Thread(target=consumer, args=(samples,), daemon=True) for samples in latencies)
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - start
+
+    calls = [latency for samples in latencies for latency in samples]
+    return {
+        'calls_per_second': len(calls) / elapsed,
+        'p50_us': statistics.median(calls) * 1e6,
+        'p99_us': percentile(calls, 0.99) * 1e6,
+        'scan_p99_us': percentile(scan_latencies, 0.99) * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=[8, 32, 128, 512], help='consumer thread counts')
+    parser.add_argument('--types', type=int, default=200, help='registered task type count')
+    parser.add_argument('--non-empty', type=int, default=5, help='count of non-empty queues')
+    parser.add_argument('--batch', type=int, default=1, help='batch poll size')
+    parser.add_argument('--work', type=float, default=0.001, help='seconds spent outside TaskSource per task')
+    parser.add_argument('--scan-interval', type=float, default=0.01, help='seconds between queue snapshots')
+    parser.add_argument('--duration', type=float, default=3.0, help='duration of a run in seconds')
+    args = parser.parse_args()
+
+    print(f'{"threads":>8} {"calls/s":>10} {"p50 us":>8} {"p99 us":>9} {"scan p99 us":>12}')
+    for threads in args.threads:
+        result = run(
+            threads, args.types, args.non_empty, args.batch, args.work, args.scan_interval, args.duration
+        )
+        print(
+            f"{threads:>8} {result['calls_per_second']:>10.0f} {result['p50_us']:>8.1f} "
+            f"{result['p99_us']:>9.1f} {result['scan_p99_us']:>12.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+End-to-end throughput of FrinxConductorWrapper executing the test workers against a local mock Conductor.
+
+The mock Conductor from mock_conductor.py runs in this process and the worker runs in a spawned child
+process, so the CPU time per task counts only the SDK and the worker. Tasks of a worker type are enqueued
+all at once, or at --rate tasks per second to measure pickup latency without a backlog. Reported are
+finished tasks per second, p50 and p99 pickup latency and CPU time of the worker process per task.
+Run it as a script from the repository root:
+
+    PYTHONPATH=. python tests/benchmarks/bench_worker_throughput.py --workers echo lorem --threads 1 4 16
+"""
+import argparse
+import multiprocessing
+import statistics
+import time
+from multiprocessing.synchronize import Event
+from threading import Thread
+from typing import Any
+
+from mock_conductor import MockConductorServer
+
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import DispatchMode
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.common.worker.worker import WorkerImpl
+from frinx.workers.test import test_worker
+
+# Imported through the module, pytest would take a TestWorker class for a test case
+WORKERS: dict[str, tuple[type[WorkerImpl], dict[str, Any]]] = {
+    'echo': (test_worker.TestWorker.Echo, {'input': 'hello'}),
+    'sleep': (test_worker.TestWorker.Sleep, {'time': 1}),
+    'lorem': (test_worker.TestWorker.LoremIpsum, {'num_paragraphs': 5, 'num_sentences': 10, 'num_words': 10}),
+}
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def run_worker(
+        server_url: str, worker: str, threads: int, settings: dict[str, Any], ready: Event, stop: Event,
+        results: 'multiprocessing.Queue[float]'
+) -> None:
+    wrapper = FrinxConductorWrapper(
+        server_url, threads, polling_interval=0.1, settings=ConductorWrapperSettings(**settings)
+    )
+    worker_class, _ = WORKERS[worker]
+    worker_class().register(wrapper)
+
+    cpu_start = time.process_time()
+    Thread(target=wrapper.start_workers, daemon=True).start()
+    ready.set()
+    stop.wait()
+    results.put(time.process_time() - cpu_start)
+
+
+def run(worker: str, threads: int, tasks: int, rate: float | None, settings: dict[str, Any]) -> dict[str, float]:
+    context = multiprocessing.get_context('spawn')
+    server = MockConductorServer()
+    server.start()
+    try:
+        conductor = server.conductor
+        ready, stop = context.Event(), context.Event()
+        results: multiprocessing.Queue[float] = context.Queue()
+        process = context.Process(
+            target=run_worker, args=(server.url, worker, threads, settings, ready, stop, results), daemon=True
+        )
+        process.start()
+        try:
+            ready.wait(timeout=60)
+            worker_class, input_data = WORKERS[worker]
+            task_type = worker_class().task_def.name
+            if rate is None:
+                conductor.enqueue(task_type, input_data, tasks)
+            else:
+                for _ in range(tasks):
+                    conductor.enqueue(task_type, input_data)
+                    time.sleep(1 / rate)
+
+            finished = conductor.wait_for_finished(tasks, timeout=600)
+            stop.set()
+            cpu_time = results.get(timeout=60)
+        finally:
+            process.terminate()
+            process.join()
+    finally:
+        server.stop()
+
+    if not finished:
+        raise RuntimeError(f'Only {conductor.finished_count()} of {tasks} tasks finished')
+    assert conductor.first_available is not None and conductor.last_finished is not None
+    elapsed = conductor.last_finished - conductor.first_available
+    return {
+        'tasks_per_second': tasks / elapsed,
+        'pickup_p50_ms': statistics.median(conductor.pickup_latencies) * 1000,
+        'pickup_p99_ms': percentile(conductor.pickup_latencies, 0.99) * 1000,
+        'cpu_per_task_us': cpu_time / tasks * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', nargs='+', choices=list(WORKERS), default=list(WORKERS), help='test workers')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16], help='consumer thread counts')
+    parser.add_argument('--tasks', type=int, default=1000, help='enqueued tasks per run')
+    parser.add_argument('--rate', type=float, default=None, help='enqueued tasks per second, all at once by default')
+    parser.add_argument(
+        '--mode', choices=[mode.value for mode in DispatchMode], default=DispatchMode.QUEUE_SCAN.value,
+        help='dispatch mode of the wrapper'
+    )
+    parser.add_argument('--batch', type=int, default=1, help='batch poll size')
+    parser.add_argument('--senders', type=int, default=4, help='result sender threads, 0 sends from consumer threads')
+    args = parser.parse_args()
+
+    settings = {
+        'dispatch_mode': args.mode,
+        'batch_poll_size': args.batch,
+        'result_sender_count': args.senders,
+        'heartbeat_interval': None,
+    }
+    print(f'{"worker":<8} {"threads":>8} {"tasks/s":>9} {"p50 ms":>9} {"p99 ms":>9} {"CPU us/task":>12}')
+    for worker in args.workers:
+        for threads in args.threads:
+            result = run(worker, threads, args.tasks, args.rate, settings)
+            print(
+                f"{worker:<8} {threads:>8} {result['tasks_per_second']:>9.1f} {result['pickup_p50_ms']:>9.2f} "
+                f"{result['pickup_p99_ms']:>9.2f} {result['cpu_per_task_us']:>12.0f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
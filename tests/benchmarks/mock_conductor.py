@@ -0,0 +1,316 @@
+"""
+In-process stand-in of the Conductor API used by the end-to-end benchmarks.
+
+Serves task queues with single, batch and long polls, queue sizes, task result updates, and task and workflow
+definitions on a local port, so FrinxConductorWrapper runs unchanged against it. Results of IN_PROGRESS
+tasks with callbackAfterSeconds are enqueued again after the delay with their output, like Conductor does.
+Every poll records the pickup latency of the task, the time since the task became available to workers.
+"""
+import heapq
+import json
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+FINAL_STATUSES = frozenset({'COMPLETED', 'FAILED', 'FAILED_WITH_TERMINAL_ERROR'})
+
+
+@dataclass(order=True)
+class DelayedTask:
+    due: float
+    task: dict[str, Any] = field(compare=False)
+
+
+class MockConductor:
+    """Task queues and definitions of the stand-in, safe to use from the threads of the HTTP server."""
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.queues: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        # Monotonic time since which a task is available to workers, by task id
+        self.available_since: dict[str, float] = {}
+        self.delayed: list[DelayedTask] = []
+        self.polled: dict[str, dict[str, Any]] = {}
+        self.pickup_latencies: list[float] = []
+        self.finished: dict[str, str] = {}
+        self.first_available: float | None = None
+        self.last_finished: float | None = None
+        self.task_defs: dict[str, dict[str, Any]] = {}
+        self.workflow_defs: dict[tuple[str, int], dict[str, Any]] = {}
+
+    def enqueue(self, task_type: str, input_data: dict[str, Any], count: int = 1) -> None:
+        now = time.monotonic()
+        with self.condition:
+            if self.first_available is None:
+                self.first_available = now
+            for _ in range(count):
+                task: dict[str, Any] = {
+                    'taskId': str(uuid.uuid4()),
+                    'taskType': task_type,
+                    'workflowInstanceId': str(uuid.uuid4()),
+                    'status': 'SCHEDULED',
+                    'inputData': dict(input_data),
+                    'outputData': {},
+                    'responseTimeoutSeconds': 3600,
+                }
+                self.queues[task_type].append(task)
+                self.available_since[task['taskId']] = now
+            self.condition.notify_all()
+
+    def finished_count(self) -> int:
+        with self.condition:
+            return len(self.finished)
+
+    def wait_for_finished(self, count: int, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while len(self.finished) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def poll(self, task_type: str, count: int, timeout: float) -> list[dict[str, Any]]:
+        """Claim up to count tasks, waiting up to timeout seconds while the queue is empty."""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            self.__enqueue_due()
+            queue = self.queues[task_type]
+            while not queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                if self.delayed:
+                    remaining = min(remaining, max(self.delayed[0].due - time.monotonic(), 0))
+                self.condition.wait(remaining)
+                self.__enqueue_due()
+
+            now = time.monotonic()
+            tasks = [queue.popleft() for _ in range(min(count, len(queue)))]
+            for task in tasks:
+                task['status'] = 'IN_PROGRESS'
+                task['pollCount'] = task.get('pollCount', 0) + 1
+                self.pickup_latencies.append(now - self.available_since.pop(task['taskId']))
+                self.polled[task['taskId']] = task
+            return tasks
+
+    def queue_sizes(self, task_types: list[str] | None = None) -> dict[str, int]:
+        with self.condition:
+            self.__enqueue_due()
+            if task_types is None:
+                return {task_type: len(queue) for task_type, queue in self.queues.items()}
+            return {task_type: len(self.queues[task_type]) for task_type in task_types}
+
+    def update(self, task_result: dict[str, Any]) -> None:
+        with self.condition:
+            task = self.polled.get(task_result['taskId'])
+            if task is None:
+                raise KeyError(task_result['taskId'])
+            if task_result.get('extendLease'):
+                return
+
+            del self.polled[task['taskId']]
+            task['status'] = task_result['status']
+            task['outputData'] = task_result.get('outputData') or {}
+            if task['status'] in FINAL_STATUSES:
+                self.finished[task['taskId']] = task['status']
+                self.last_finished = time.monotonic()
+                self.condition.notify_all()
+                return
+
+            # IN_PROGRESS tasks are handed back to workers after their callback delay
+            task['status'] = 'SCHEDULED'
+            due = time.monotonic() + (task_result.get('callbackAfterSeconds') or 0)
+            heapq.heappush(self.delayed, DelayedTask(due, task))
+            self.condition.notify_all()
+
+    def __enqueue_due(self) -> None:
+        now = time.monotonic()
+        while self.delayed and self.delayed[0].due <= now:
+            delayed = heapq.heappop(self.delayed)
+            self.queues[delayed.task['taskType']].append(delayed.task)
+            self.available_since[delayed.task['taskId']] = delayed.due
+
+
+class MockConductorHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections, the SDK reuses them like with a real Conductor
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, Nagle's algorithm would hold the body for a delayed ACK
+    disable_nagle_algorithm = True
+    server: 'MockConductorServer'
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.dispatch('GET')
+
+    def do_POST(self) -> None:
+        self.dispatch('POST')
+
+    def do_PUT(self) -> None:
+        self.dispatch('PUT')
+
+    def do_DELETE(self) -> None:
+        self.dispatch('DELETE')
+
+    def dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.fullmatch(url.path)
+            if route_method == method and match is not None:
+                try:
+                    response = handler(self.server.conductor, params, body, *match.groups())
+                except KeyError as error:
+                    self.respond(404, {'message': f'Not found: {error}'})
+                    return
+                self.respond(200 if response is not None else 204, response)
+                return
+        self.respond(404, {'message': f'No route for {method} {url.path}'})
+
+    def respond(self, status: int, response: Any) -> None:
+        if isinstance(response, str):
+            content, content_type = response.encode(), 'text/plain'
+        else:
+            content, content_type = (b'' if response is None else json.dumps(response).encode()), 'application/json'
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+Handler = Callable[..., Any]
+
+
+def _poll(conductor: MockConductor, params: dict[str, list[str]], body: Any, task_type: str) -> Any:
+    tasks = conductor.poll(task_type, 1, 0)
+    return tasks[0] if tasks else None
+
+
+def _poll_batch(conductor: MockConductor, params: dict[str, list[str]], body: Any, task_type: str) -> Any:
+    count = int(params.get('count', ['1'])[0])
+    timeout = int(params.get('timeout', ['100'])[0]) / 1000
+    return conductor.poll(task_type, count, timeout)
+
+
+def _queue_all(conductor: MockConductor, params: dict[str, list[str]], body: Any) -> Any:
+    return conductor.queue_sizes()
+
+
+def _queue_sizes(conductor: MockConductor, params: dict[str, list[str]], body: Any) -> Any:
+    return conductor.queue_sizes(params.get('taskType', []))
+
+
+def _queue_size(conductor: MockConductor, params: dict[str, list[str]], body: Any) -> Any:
+    task_type = params['taskType'][0]
+    return conductor.queue_sizes([task_type])[task_type]
+
+
+def _update(conductor: MockConductor, params: dict[str, list[str]], body: Any) -> Any:
+    conductor.update(body)
+    return str(body['taskId'])
+
+
+def _get_task_defs(conductor: MockConductor, params: dict[str, list[str]], body: Any) -> Any:
+    return list(conductor.task_defs.values())
+
+
+def _get_task_def(conductor: MockConductor, params: dict[str, list[str]], body: Any, name: str) -> Any:
+    return conductor.task_defs[name]
+
+
+def _put_task_defs(conductor: MockConductor, params: dict[str, list[str]], body: Any) -> Any:
+    for task_def in body if isinstance(body, list) else [body]:
+        conductor.task_defs[task_def['name']] = task_def
+    return None
+
+
+def _delete_task_def(conductor: MockConductor, params: dict[str, list[str]], body: Any, name: str) -> Any:
+    del conductor.task_defs[name]
+    return None
+
+
+def _get_workflow_defs(conductor: MockConductor, params: dict[str, list[str]], body: Any) -> Any:
+    return list(conductor.workflow_defs.values())
+
+
+def _get_workflow_def(conductor: MockConductor, params: dict[str, list[str]], body: Any, name: str) -> Any:
+    versions = [version for workflow_name, version in conductor.workflow_defs if workflow_name == name]
+    version = int(params['version'][0]) if 'version' in params else max(versions, default=0)
+    return conductor.workflow_defs[(name, version)]
+
+
+def _put_workflow_defs(conductor: MockConductor, params: dict[str, list[str]], body: Any) -> Any:
+    for workflow_def in body if isinstance(body, list) else [body]:
+        conductor.workflow_defs[(workflow_def['name'], workflow_def.get('version', 1))] = workflow_def
+    return None
+
+
+def _delete_workflow_def(
+        conductor: MockConductor, params: dict[str, list[str]], body: Any, name: str, version: str
+) -> Any:
+    del conductor.workflow_defs[(name, int(version))]
+    return None
+
+
+ROUTES: list[tuple[str, re.Pattern[str], Handler]] = [
+    ('GET', re.compile(r'/api/tasks/poll/batch/([^/]+)'), _poll_batch),
+    ('GET', re.compile(r'/api/tasks/poll/([^/]+)'), _poll),
+    ('GET', re.compile(r'/api/tasks/queue/all'), _queue_all),
+    ('GET', re.compile(r'/api/tasks/queue/sizes'), _queue_sizes),
+    ('GET', re.compile(r'/api/tasks/queue/size'), _queue_size),
+    ('POST', re.compile(r'/api/tasks/?'), _update),
+    ('GET', re.compile(r'/api/metadata/taskdefs/?'), _get_task_defs),
+    ('GET', re.compile(r'/api/metadata/taskdefs/([^/]+)'), _get_task_def),
+    ('POST', re.compile(r'/api/metadata/taskdefs/?'), _put_task_defs),
+    ('PUT', re.compile(r'/api/metadata/taskdefs/?'), _put_task_defs),
+    ('DELETE', re.compile(r'/api/metadata/taskdefs/([^/]+)'), _delete_task_def),
+    ('GET', re.compile(r'/api/metadata/workflow/?'), _get_workflow_defs),
+    ('GET', re.compile(r'/api/metadata/workflow/([^/]+)'), _get_workflow_def),
+    ('POST', re.compile(r'/api/metadata/workflow/?'), _put_workflow_defs),
+    ('PUT', re.compile(r'/api/metadata/workflow/?'), _put_workflow_defs),
+    ('DELETE', re.compile(r'/api/metadata/workflow/([^/]+)/(\d+)'), _delete_workflow_def),
+]
+
+
+class MockConductorServer(ThreadingHTTPServer):
+    """HTTP server of a MockConductor on a local port, served by a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0) -> None:
+        super().__init__(('127.0.0.1', port), MockConductorHandler)
+        self.conductor = MockConductor()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Connections of a terminated worker process are reset, nothing to report
+        pass
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/api'
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
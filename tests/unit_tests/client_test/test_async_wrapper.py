@@ -0,0 +1,137 @@
+import asyncio
+import inspect
+from typing import Any
+
+from pytest_mock import MockerFixture
+
+from frinx.client.async_frinx_conductor_wrapper import AsyncFrinxConductorWrapper
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.common.conductor_enums import TaskResultStatus
+from frinx.common.worker.task_def import TaskDefinition
+from frinx.common.worker.task_def import TaskInput
+from frinx.common.worker.task_def import TaskOutput
+from frinx.common.worker.task_result import TaskResult
+from frinx.common.worker.worker import WorkerImpl
+
+
+class AsyncEcho(WorkerImpl):
+    class WorkerDefinition(TaskDefinition):
+        name: str = 'TEST_async_echo'
+        description: str = 'Helper class used in tests.'
+
+    class WorkerInput(TaskInput):
+        input: str
+
+    class WorkerOutput(TaskOutput):
+        output: str
+
+    async def execute(self, worker_input: WorkerInput) -> TaskResult[WorkerOutput]:
+        await asyncio.sleep(0)
+        return TaskResult(status=TaskResultStatus.COMPLETED, output=self.WorkerOutput(output=worker_input.input))
+
+
+class RecordingTaskClient:
+    EXTERNAL_INPUT_KEY = 'externalInputPayloadStoragePath'
+
+    def __init__(self) -> None:
+        self.updates: list[dict[str, Any]] = []
+
+    async def update_task(self, task_obj: dict[str, Any]) -> None:
+        self.updates.append(task_obj)
+
+
+class QueueTaskClient(RecordingTaskClient):
+    """Serves count tasks of every task type, each poll request takes a while."""
+
+    def __init__(self, count: int) -> None:
+        super().__init__()
+        self.remaining: dict[str, int] = {}
+        self.count = count
+
+    async def poll_for_batch(
+            self, task_type: str, count: int, timeout: int, worker_id: str, domain: str | None = None
+    ) -> list[dict[str, Any]]:
+        await asyncio.sleep(0.01)
+        remaining = self.remaining.setdefault(task_type, self.count)
+        count = min(count, remaining)
+        self.remaining[task_type] -= count
+        return [
+            {'taskId': f'{task_type}-{remaining - index}', 'taskType': task_type, 'inputData': {}}
+            for index in range(count)
+        ]
+
+
+class TestAsyncWrapper:
+    def test_async_worker_registers_coroutine(self, mocker: MockerFixture) -> None:
+        mocker.patch('frinx.client.frinx_conductor_wrapper.requests.post')
+        wrapper = AsyncFrinxConductorWrapper('http://localhost', 10)
+        AsyncEcho().register(wrapper)
+
+        assert AsyncEcho.is_async()
+        registered_task = wrapper.task_source.task_types['TEST_async_echo']
+        assert inspect.iscoroutinefunction(registered_task.exec_function)
+
+    def test_execute_async_worker(self) -> None:
+        wrapper = AsyncFrinxConductorWrapper('http://localhost', 10)
+        task_client = RecordingTaskClient()
+        wrapper.async_task_client = task_client  # type: ignore[assignment]
+        task = {'taskId': '1', 'taskType': 'TEST_async_echo', 'inputData': {'input': 'hello'}}
+
+        asyncio.run(wrapper.execute_async(task, AsyncEcho._execute_wrapper_async))
+
+        assert task_client.updates[0]['status'] == TaskResultStatus.COMPLETED
+        assert task_client.updates[0]['outputData'] == {'output': 'hello'}
+
+    def test_execute_sync_function_on_executor(self) -> None:
+        wrapper = AsyncFrinxConductorWrapper('http://localhost', 10)
+        task_client = RecordingTaskClient()
+        wrapper.async_task_client = task_client  # type: ignore[assignment]
+        task = {'taskId': '1', 'taskType': 'TEST_sync', 'inputData': {}}
+
+        asyncio.run(wrapper.execute_async(task, lambda _: None))
+
+        assert task_client.updates[0]['status'] == 'FAILED'
+
+    def test_async_worker_in_threaded_wrapper(self) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=ConductorWrapperSettings(result_sender_count=0))
+        updates: list[dict[str, Any]] = []
+        wrapper.task_client.update_task = updates.append  # type: ignore[method-assign, assignment]
+        task = {'taskId': '1', 'taskType': 'TEST_async_echo', 'inputData': {'input': 'hello'}}
+
+        wrapper.execute(task, AsyncEcho._execute_wrapper_async)
+
+        assert updates[0]['status'] == TaskResultStatus.COMPLETED
+        assert updates[0]['outputData'] == {'output': 'hello'}
+
+    def test_pollers_do_not_exceed_max_task_count(self) -> None:
+        settings = ConductorWrapperSettings(batch_poll_size=2, heartbeat_interval=None)
+        wrapper = AsyncFrinxConductorWrapper('http://localhost', 2, settings=settings)
+        task_client = QueueTaskClient(count=4)
+        wrapper.async_task_client = task_client  # type: ignore[assignment]
+        running = 0
+        max_running = 0
+
+        async def exec_function(task: dict[str, Any]) -> dict[str, Any]:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {'status': 'COMPLETED', 'output': {}}
+
+        task_types = ['TEST_a', 'TEST_b', 'TEST_c']
+        for task_type in task_types:
+            wrapper.register(task_type, {}, exec_function, register_definition=False)
+
+        async def run_pollers() -> None:
+            pollers = [asyncio.create_task(wrapper.long_poll_task_type_async(task_type)) for task_type in task_types]
+            while len(task_client.updates) < 12:
+                await asyncio.sleep(0.01)
+            for poller in pollers:
+                poller.cancel()
+            await asyncio.gather(*pollers, return_exceptions=True)
+
+        asyncio.run(asyncio.wait_for(run_pollers(), timeout=10))
+        assert max_running <= 2
+        assert wrapper.free_slots == 2
@@ -0,0 +1,117 @@
+from typing import Any
+
+from pytest_mock import MockerFixture
+
+from frinx.client.concurrency_controller import AdaptiveConcurrencyController
+from frinx.client.concurrency_controller import AdaptiveConcurrencySettings
+from frinx.client.concurrency_controller import LatencyStage
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.frinx_conductor_wrapper import TaskSource
+from frinx.common.telemetry.metrics import Metrics
+
+
+def _exec_function(task: Any) -> Any:
+    return task
+
+
+def _controller(**settings: Any) -> AdaptiveConcurrencyController:
+    controller = AdaptiveConcurrencyController(Metrics(), AdaptiveConcurrencySettings(window=10, **settings))
+    controller.register_task_type('TEST_echo', 8)
+    return controller
+
+
+def _record_window(
+        controller: AdaptiveConcurrencyController, latency: float, errors: int = 0,
+        stage: LatencyStage = LatencyStage.EXECUTE
+) -> None:
+    for index in range(controller.settings.window):
+        controller.record('TEST_echo', stage, latency, failed=index < errors)
+
+
+class TestAdaptiveConcurrencyController:
+    def test_limit_starts_at_pool_size(self) -> None:
+        controller = _controller()
+        assert controller.limit('TEST_echo') == 8
+        assert controller.limit('TEST_echo', 3) == 3
+        assert controller.limit('TEST_unknown') is None
+        assert controller.limit('TEST_unknown', 3) == 3
+
+    def test_errors_decrease_limit_multiplicatively(self) -> None:
+        controller = _controller()
+        _record_window(controller, 0.1, errors=5)
+        assert controller.limit('TEST_echo') == 4
+        _record_window(controller, 0.1, errors=5)
+        assert controller.limit('TEST_echo') == 2
+        _record_window(controller, 0.1, errors=5)
+        _record_window(controller, 0.1, errors=5)
+        assert controller.limit('TEST_echo') == 1
+
+    def test_limit_recovers_additively(self) -> None:
+        controller = _controller()
+        _record_window(controller, 0.1, errors=5)
+        assert controller.limit('TEST_echo') == 4
+        _record_window(controller, 0.1)
+        assert controller.limit('TEST_echo') == 5
+        for _ in range(10):
+            _record_window(controller, 0.1)
+        assert controller.limit('TEST_echo') == 8
+
+    def test_latency_over_baseline_decreases_limit(self) -> None:
+        controller = _controller()
+        _record_window(controller, 0.1, stage=LatencyStage.UPDATE)
+        _record_window(controller, 0.15, stage=LatencyStage.UPDATE)
+        assert controller.limit('TEST_echo') == 8
+        _record_window(controller, 0.5, stage=LatencyStage.UPDATE)
+        assert controller.limit('TEST_echo') == 4
+
+    def test_jitter_of_instant_requests_is_ignored(self) -> None:
+        controller = _controller()
+        _record_window(controller, 0.0001, stage=LatencyStage.POLL)
+        _record_window(controller, 0.001, stage=LatencyStage.POLL)
+        assert controller.limit('TEST_echo') == 8
+
+    def test_limit_gauge(self, mocker: MockerFixture) -> None:
+        record = mocker.patch('frinx.client.concurrency_controller.record_task_concurrency_limit')
+        controller = _controller()
+        # Limit stays at its maximum, unchanged limits are not recorded again
+        _record_window(controller, 0.1)
+        _record_window(controller, 0.1, errors=5)
+        _record_window(controller, 0.1, errors=5)
+        _record_window(controller, 0.1)
+        _record_window(controller, 0.1)
+
+        assert [call.args[1:] for call in record.call_args_list] == [
+            ('TEST_echo', 8), ('TEST_echo', 4), ('TEST_echo', 2), ('TEST_echo', 3), ('TEST_echo', 4)
+        ]
+
+
+class TestAdaptiveConcurrencyIntegration:
+    def test_task_source_respects_adaptive_limit(self) -> None:
+        controller = _controller()
+        task_source = TaskSource(worker_count=8, concurrency_controller=controller)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        _record_window(controller, 0.1, errors=5)
+        _record_window(controller, 0.1, errors=5)
+        task_source.handle_tasks({'TEST_echo': 5})
+
+        assert task_source.get_next_task(None) is not None
+        assert task_source.get_next_task(None) is not None
+        assert task_source.get_next_task(None) is None
+        assert task_source.free_capacity('TEST_echo') == 0
+
+    def test_wrapper_feeds_controller(self) -> None:
+        settings = ConductorWrapperSettings(
+            result_sender_count=0, adaptive_concurrency=AdaptiveConcurrencySettings(window=4)
+        )
+        wrapper = FrinxConductorWrapper('http://localhost', 8, settings=settings)
+        wrapper.register('TEST_echo', {}, _exec_function, register_definition=False)
+        wrapper.task_client.update_task = lambda task: None  # type: ignore[method-assign, assignment, misc]
+        assert wrapper.concurrency_controller is not None
+        assert wrapper.concurrency_controller.limit('TEST_echo') == 8
+
+        # Every failed execution and its successful update make two samples
+        for index in range(2):
+            wrapper.execute({'taskId': str(index), 'taskType': 'TEST_echo'}, lambda task: None)
+
+        assert wrapper.concurrency_controller.limit('TEST_echo') == 4
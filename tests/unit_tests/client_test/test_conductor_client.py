@@ -0,0 +1,76 @@
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from frinx.client.conductor import PooledHTTPAdapter
+from frinx.client.conductor import WFClientMgr
+from frinx.client.conductor import resize_session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        if self.path.startswith('/tasks/slow'):
+            time.sleep(0.5)
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except BrokenPipeError:
+            # Client gave up waiting for a slow response
+            pass
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledSession:
+    def test_connections_are_reused(self, server_url: str) -> None:
+        clients = WFClientMgr(server_url)
+
+        for _ in range(5):
+            assert clients.task_client.get_task('abc') == {'path': '/tasks/abc'}
+        clients.metadata_client.get_all_task_defs()
+
+        stats = clients.task_client.connection_stats()
+        assert stats.request_count == 6
+        assert stats.connection_count == 1
+        assert stats.reused_count == 5
+        assert clients.metadata_client.connection_stats() == stats
+
+    def test_resize_session(self, server_url: str) -> None:
+        clients = WFClientMgr(server_url, pool_size=2)
+        clients.task_client.get_task('abc')
+        resize_session(clients.session, 5)
+
+        adapter = clients.session.get_adapter(server_url)
+        assert isinstance(adapter, PooledHTTPAdapter)
+        assert adapter._pool_maxsize == 5
+        assert clients.session.get_adapter('https://localhost') is adapter
+        assert clients.task_client.get_task('abc') == {'path': '/tasks/abc'}
+
+    def test_read_timeout(self, server_url: str) -> None:
+        clients = WFClientMgr(server_url, timeout=(1.0, 0.1))
+
+        with pytest.raises(requests.Timeout):
+            clients.task_client.get_task('slow')
@@ -0,0 +1,105 @@
+import io
+import json
+import os
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from frinx.client.external_payload import ExternalPayloadCache
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+
+
+def _body(payload: Any) -> io.BytesIO:
+    body = io.BytesIO(json.dumps(payload).encode())
+    body.seek(0, io.SEEK_END)
+    return body
+
+
+class FakeResponse:
+    def __init__(self, payload: Any) -> None:
+        self.content = json.dumps(payload).encode()
+
+    def __enter__(self) -> 'FakeResponse':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def iter_content(self, chunk_size: int) -> Any:
+        for index in range(0, len(self.content), chunk_size):
+            yield self.content[index:index + chunk_size]
+
+
+class TestExternalPayloadCache:
+    def test_least_recently_used_payload_is_evicted(self, tmp_path: Any) -> None:
+        cache = ExternalPayloadCache(max_size=30, directory=str(tmp_path))
+        for path in ('a', 'b'):
+            body = _body({'path': path})
+            cache.store(path, io.BytesIO(body.getvalue()), body.tell())
+
+        assert cache.load('a') == {'path': 'a'}
+        body = _body({'path': 'c'})
+        cache.store('c', io.BytesIO(body.getvalue()), body.tell())
+
+        assert cache.load('b') is None
+        assert cache.load('a') == {'path': 'a'}
+        assert cache.load('c') == {'path': 'c'}
+        assert len(os.listdir(tmp_path)) == 2
+
+    def test_oversized_payload_is_not_cached(self, tmp_path: Any) -> None:
+        cache = ExternalPayloadCache(max_size=10, directory=str(tmp_path))
+        body = _body({'payload': 'x' * 100})
+        cache.store('a', io.BytesIO(body.getvalue()), body.tell())
+        assert cache.load('a') is None
+
+    def test_files_of_previous_process_are_removed(self, tmp_path: Any) -> None:
+        stale_file = tmp_path / ('0' * 64)
+        stale_file.write_bytes(b'{}')
+        (tmp_path / 'other').write_bytes(b'{}')
+
+        cache = ExternalPayloadCache(max_size=30, directory=str(tmp_path))
+        body = _body({'path': 'a'})
+        cache.store('a', io.BytesIO(body.getvalue()), body.tell())
+        assert not stale_file.exists()
+        assert len(os.listdir(tmp_path)) == 2
+
+    def test_temporary_directory_is_removed(self) -> None:
+        cache = ExternalPayloadCache(max_size=30)
+        body = _body({'path': 'a'})
+        cache.store('a', io.BytesIO(body.getvalue()), body.tell())
+        directory = cache.get_directory()
+        assert os.listdir(directory)
+
+        del cache
+        assert not os.path.exists(directory)
+
+
+class TestExternalPayloadInput:
+    @pytest.mark.parametrize('spool_size', [0, 1024 * 1024])
+    def test_input_is_downloaded_once(self, mocker: MockerFixture, tmp_path: Any, spool_size: int) -> None:
+        settings = ConductorWrapperSettings(
+            external_payload_cache_size=1024 * 1024, external_payload_cache_dir=str(tmp_path),
+            external_payload_spool_size=spool_size
+        )
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=settings)
+        mocker.patch.object(
+            wrapper.task_client, 'get_task_input_external_payload_location', return_value={'uri': 'http://s3/a'}
+        )
+        payload = {'config': 'x' * 200000}
+        get = mocker.patch.object(wrapper.task_client.session, 'get', return_value=FakeResponse(payload))
+        used = mocker.patch('frinx.client.frinx_conductor_wrapper.increment_external_payload_used')
+
+        for task_id in ('1', '2'):
+            task = {'taskId': task_id, 'taskType': 'TEST_echo', 'externalInputPayloadStoragePath': 'path/a'}
+            assert wrapper.replace_external_payload_input(task) == {
+                'taskId': task_id, 'taskType': 'TEST_echo', 'inputData': payload
+            }
+
+        get.assert_called_once()
+        assert get.call_args.kwargs['stream'] is True
+        assert used.call_count == 2
@@ -0,0 +1,81 @@
+import time
+from typing import Any
+
+from pytest_mock import MockerFixture
+
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.frinx_conductor_wrapper import NextWorkerTask
+from frinx.client.in_flight import InFlightRegistry
+
+
+class TestInFlightRegistry:
+    def test_counts_per_task_type(self) -> None:
+        registry = InFlightRegistry()
+        registry.add('TEST_echo', {'taskId': '1'}, None)
+        registry.add('TEST_echo', {'taskId': '2'}, None)
+        registry.add('TEST_sleep', {'taskId': '3'}, None)
+        registry.remove('2')
+
+        assert registry.counts() == {'TEST_echo': 1, 'TEST_sleep': 1}
+
+    def test_due_for_extension(self) -> None:
+        registry = InFlightRegistry()
+        registry.add('TEST_sleep', {'taskId': 'short', 'responseTimeoutSeconds': 0.1}, None)
+        registry.add('TEST_sleep', {'taskId': 'long'}, 60)
+        registry.add('TEST_sleep', {'taskId': 'unlimited'}, None)
+        time.sleep(0.06)
+
+        assert [in_flight.task_id for in_flight in registry.due_for_extension(0.5)] == ['short']
+        registry.lease_extended('short', time.monotonic())
+        assert registry.due_for_extension(0.5) == []
+
+    def test_lease_starts_at_poll(self) -> None:
+        registry = InFlightRegistry()
+        # Task waited 40 seconds for a consumer thread after its poll
+        registry.add('TEST_sleep', {'taskId': 'claimed'}, 60, lease_start=time.monotonic() - 40)
+        registry.add('TEST_sleep', {'taskId': 'started'}, 60)
+
+        assert [in_flight.task_id for in_flight in registry.due_for_extension(0.5)] == ['claimed']
+
+    def test_claimed_task_keeps_its_poll_time(self, mocker: MockerFixture) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=ConductorWrapperSettings(result_sender_count=0))
+        wrapper.register('TEST_echo', {}, lambda task: {'status': 'COMPLETED', 'output': {}}, register_definition=False)
+        mocker.patch.object(wrapper.task_client, 'update_task')
+        add = mocker.spy(wrapper.in_flight, 'add')
+
+        polled_at = time.monotonic() - 10
+        wrapper.pool_of('TEST_echo').task_source.claim_tasks('TEST_echo', [{'taskId': '1'}], polled_at)
+        next_task = wrapper.pool_of('TEST_echo').task_source.get_next_task(None)
+        assert next_task is not None
+        wrapper.process_task(next_task)
+        assert add.call_args.args[3] == polled_at
+
+
+class TestLeaseExtension:
+    def test_heartbeat_of_long_running_task(self) -> None:
+        settings = ConductorWrapperSettings(result_sender_count=0, lease_extension_ratio=0.2)
+        wrapper = FrinxConductorWrapper('http://localhost', 1, worker_id='worker', settings=settings)
+        updates: list[dict[str, Any]] = []
+        wrapper.task_client.update_task = updates.append  # type: ignore[method-assign, assignment]
+
+        def exec_function(task: dict[str, Any]) -> dict[str, Any]:
+            time.sleep(0.03)
+            wrapper.extend_leases()
+            return {'status': 'COMPLETED', 'output': {}}
+
+        wrapper.task_source.register_task_type('TEST_slow', exec_function, response_timeout_seconds=0.1)
+        task = {'taskId': '1', 'workflowInstanceId': 'wf', 'outputData': {'_checkpoint': {'step': 1}}}
+        wrapper.process_task(NextWorkerTask('TEST_slow', exec_function, None, polled_task=task))
+
+        assert updates[0] == {
+            'taskId': '1',
+            'workflowInstanceId': 'wf',
+            'status': 'IN_PROGRESS',
+            'outputData': {'_checkpoint': {'step': 1}},
+            'logs': [],
+            'workerId': 'worker',
+            'extendLease': True,
+        }
+        assert updates[1]['status'] == 'COMPLETED'
+        assert wrapper.in_flight.counts() == {}
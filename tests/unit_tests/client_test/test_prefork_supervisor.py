@@ -0,0 +1,41 @@
+import gc
+import os
+import signal
+import time
+from pathlib import Path
+
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.prefork_supervisor import PreforkSupervisor
+from frinx.client.prefork_supervisor import SupervisorSettings
+
+
+class CrashingWrapper(FrinxConductorWrapper):
+    """Worker processes crash until the third one, which stops the supervisor."""
+
+    def __init__(self, starts_dir: Path) -> None:
+        super().__init__('http://localhost', 1)
+        self.starts_dir = starts_dir
+
+    def start_workers(self) -> None:
+        (self.starts_dir / str(os.getpid())).write_text(str(gc.get_freeze_count()))
+        if len(list(self.starts_dir.iterdir())) < 3:
+            raise RuntimeError('Worker crashed')
+        os.kill(os.getppid(), signal.SIGTERM)
+        time.sleep(10)
+
+
+class TestPreforkSupervisor:
+    def test_crashed_workers_are_restarted(self, tmp_path: Path) -> None:
+        starts_dir = tmp_path / 'starts'
+        starts_dir.mkdir()
+        settings = SupervisorSettings(processes=1, restart_delay=0, metrics_dir=str(tmp_path / 'metrics'))
+        supervisor = PreforkSupervisor(CrashingWrapper(starts_dir), settings)
+
+        supervisor.run()
+
+        starts = list(starts_dir.iterdir())
+        assert len(starts) == 3
+        # Objects of the supervisor were frozen before the fork
+        assert all(int(start.read_text()) > 0 for start in starts)
+        assert supervisor.workers == set()
+        assert gc.get_freeze_count() == 0
@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+import signal
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.process_pool import TaskProcessPool
+from frinx.common.worker.task_def import ExecutionBackend
+from frinx.common.worker.task_def import TaskExecutionProperties
+from frinx.workers.test import test_worker
+
+
+def get_pid(task: dict[str, Any]) -> int:
+    return os.getpid()
+
+
+def kill_process(task: dict[str, Any]) -> None:
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+class TestTaskProcessPool:
+    def test_execute_worker_in_process(self) -> None:
+        pool = TaskProcessPool(processes=1)
+        task = {'taskId': '1', 'taskType': 'TEST_lorem_ipsum', 'inputData': {'num_paragraphs': 1}}
+        try:
+            result = pool.execute(test_worker.TestWorker.LoremIpsum._execute_wrapper, task)
+        finally:
+            pool.close()
+
+        assert result['status'] == 'COMPLETED'
+        assert result['output']['bytes'] > 0
+
+    def test_processes_are_recycled(self) -> None:
+        pool = TaskProcessPool(processes=1, max_tasks_per_child=1)
+        try:
+            pids = {pool.execute(get_pid, {}) for _ in range(3)}
+        finally:
+            pool.close()
+
+        assert len(pids) == 3
+        assert os.getpid() not in pids
+
+    def test_killed_process_times_out(self) -> None:
+        pool = TaskProcessPool(processes=1)
+        try:
+            with pytest.raises(multiprocessing.TimeoutError):
+                pool.execute(kill_process, {'taskId': '1', 'timeoutSeconds': 1})
+            # Pool with the lost task is terminated, the next task starts a fresh one
+            assert not pool.retired
+            assert pool.execute(get_pid, {}) != os.getpid()
+        finally:
+            pool.close()
+
+    def test_register_process_backend(self, mocker: MockerFixture) -> None:
+        mocker.patch('frinx.client.frinx_conductor_wrapper.requests.post')
+
+        class LoremIpsum(test_worker.TestWorker.LoremIpsum):
+            class ExecutionProperties(TaskExecutionProperties):
+                execution_backend: ExecutionBackend = ExecutionBackend.PROCESS
+
+        wrapper = FrinxConductorWrapper('http://localhost', 1)
+        execute = mocker.patch.object(wrapper.process_pool, 'execute', return_value={'status': 'COMPLETED'})
+        LoremIpsum().register(wrapper)
+
+        exec_function = wrapper.task_source.task_types['TEST_lorem_ipsum'].exec_function
+        assert exec_function({'taskId': '1'}) == {'status': 'COMPLETED'}
+        execute.assert_called_once_with(LoremIpsum._execute_wrapper, {'taskId': '1'}, timeout=60)
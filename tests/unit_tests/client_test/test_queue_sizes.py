@@ -0,0 +1,82 @@
+from typing import Any
+
+import requests
+from pytest_mock import MockerFixture
+
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+
+
+def _exec_function(task: Any) -> Any:
+    return task
+
+
+def _wrapper(task_types: list[str], settings: ConductorWrapperSettings | None = None) -> FrinxConductorWrapper:
+    wrapper = FrinxConductorWrapper('http://localhost', 1, settings=settings)
+    for task_type in task_types:
+        wrapper.task_source.register_task_type(task_type, _exec_function)
+    return wrapper
+
+
+class TestQueueSizes:
+    def test_batched_query_of_registered_types(self, mocker: MockerFixture) -> None:
+        task_types = [f'TEST_{index}' for index in range(150)]
+        wrapper = _wrapper(task_types)
+        sizes = mocker.patch.object(
+            wrapper.task_client, 'get_task_queue_sizes', side_effect=lambda types: {types[0]: 1}
+        )
+        queue_all = mocker.patch.object(wrapper.task_client, 'get_tasks_in_queue')
+
+        assert wrapper.read_queue_sizes() == {'TEST_0': 1, 'TEST_100': 1}
+        assert sizes.call_count == 2
+        queue_all.assert_not_called()
+
+    def test_fallback_to_per_type_lookups(self, mocker: MockerFixture) -> None:
+        wrapper = _wrapper(['TEST_a', 'TEST_b'])
+        response = requests.Response()
+        response.status_code = 404
+        mocker.patch.object(
+            wrapper.task_client, 'get_task_queue_sizes', side_effect=requests.HTTPError(response=response)
+        )
+        mocker.patch.object(wrapper.task_client, 'get_task_queue_size', side_effect=[3, None, 4, 0])
+
+        assert wrapper.read_queue_sizes() == {'TEST_a': 3, 'TEST_b': 0}
+        assert not wrapper.batched_queue_sizes
+        assert wrapper.read_queue_sizes() == {'TEST_a': 4, 'TEST_b': 0}
+
+    def test_unscoped_query(self, mocker: MockerFixture) -> None:
+        wrapper = _wrapper(['TEST_a'], ConductorWrapperSettings(scoped_queue_query=False))
+        mocker.patch.object(wrapper.task_client, 'get_tasks_in_queue', return_value={'TEST_a': 1, 'OTHER': 2})
+        assert wrapper.read_queue_sizes() == {'TEST_a': 1, 'OTHER': 2}
+
+    def test_unchanged_sizes_are_skipped(self) -> None:
+        wrapper = _wrapper(['TEST_a'])
+
+        assert wrapper.queue_sizes_changed({'TEST_a': 2})
+        wrapper.task_source.handle_tasks({'TEST_a': 2})
+        assert not wrapper.queue_sizes_changed({'TEST_a': 2})
+
+        # Local snapshot is drained, the same sizes are applied again
+        wrapper.task_source.get_next_task(None)
+        wrapper.task_source.get_next_task(None)
+        assert wrapper.queue_sizes_changed({'TEST_a': 2})
+
+        assert wrapper.queue_sizes_changed({'TEST_a': 0})
+        assert not wrapper.queue_sizes_changed({'TEST_a': 0})
+
+    def test_drained_queue_is_applied_again(self) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 4)
+        wrapper.register('TEST_slow', {'concurrentExecLimit': 1}, _exec_function, register_definition=False)
+        wrapper.register('TEST_fast', {}, _exec_function, register_definition=False)
+
+        assert wrapper.queue_sizes_changed({'TEST_slow': 10, 'TEST_fast': 1})
+        wrapper.handle_tasks({'TEST_slow': 10, 'TEST_fast': 1})
+        polled = {wrapper.task_source.get_next_task(None).task_type for _ in range(2)}  # type: ignore[union-attr]
+        assert polled == {'TEST_slow', 'TEST_fast'}
+        assert wrapper.task_source.filtered_queue == {'TEST_slow': 9}
+
+        # New task of TEST_fast, while the saturated TEST_slow keeps its queue in the snapshot
+        assert wrapper.queue_sizes_changed({'TEST_slow': 10, 'TEST_fast': 1})
+        wrapper.handle_tasks({'TEST_slow': 10, 'TEST_fast': 1})
+        next_task = wrapper.task_source.get_next_task(None)
+        assert next_task is not None and next_task.task_type == 'TEST_fast'
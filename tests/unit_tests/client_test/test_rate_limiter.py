@@ -0,0 +1,139 @@
+import threading
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+from pytest_mock import MockerFixture
+
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.frinx_conductor_wrapper import TaskSource
+from frinx.client.rate_limiter import EndpointRateLimitSettings
+from frinx.client.rate_limiter import RateLimiter
+from frinx.common.telemetry.metrics import Metrics
+
+
+def _exec_function(task: Any) -> Any:
+    return task
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(mocker: MockerFixture) -> FakeClock:
+    clock = FakeClock()
+    mocker.patch('frinx.client.rate_limiter.time', clock)
+    return clock
+
+
+def _rate_limiter() -> RateLimiter:
+    endpoints = {'cli': EndpointRateLimitSettings(rate=2, burst=4, task_types=['TEST_read', 'TEST_write'])}
+    rate_limiter = RateLimiter(Metrics(), endpoints)
+    rate_limiter.register_task_type('TEST_read', 3, 1)
+    rate_limiter.register_task_type('TEST_write')
+    rate_limiter.register_task_type('TEST_echo', 0, 5)
+    return rate_limiter
+
+
+class TestRateLimiter:
+    def test_task_type_bucket(self, clock: FakeClock) -> None:
+        rate_limiter = _rate_limiter()
+        assert rate_limiter.acquire('TEST_read', 10) == 3
+        assert rate_limiter.acquire('TEST_read', 1) == 0
+        assert not rate_limiter.available('TEST_read')
+        assert rate_limiter.delay('TEST_read') == pytest.approx(1 / 3)
+
+        clock.now += 1 / 3
+        assert rate_limiter.acquire('TEST_read', 10) == 1
+
+    def test_endpoint_bucket_shared_by_task_types(self, clock: FakeClock) -> None:
+        rate_limiter = _rate_limiter()
+        assert rate_limiter.acquire('TEST_read', 2) == 2
+        # Endpoint bucket holds 2 tokens left, the task bucket of TEST_read one
+        assert rate_limiter.acquire('TEST_write', 10) == 2
+        assert rate_limiter.acquire('TEST_read', 1) == 0
+
+        clock.now += 0.5
+        assert rate_limiter.acquire('TEST_read', 10) == 1
+
+    def test_unlimited_task_types(self, clock: FakeClock) -> None:
+        rate_limiter = _rate_limiter()
+        assert rate_limiter.acquire('TEST_echo', 100) == 100
+        assert rate_limiter.acquire('TEST_unknown', 100) == 100
+        assert rate_limiter.available('TEST_echo')
+        assert rate_limiter.delay('TEST_echo') == 0
+
+    def test_throttled_polls_counted_as_paused(self, clock: FakeClock, mocker: MockerFixture) -> None:
+        increment = mocker.patch('frinx.client.rate_limiter.increment_task_paused')
+        rate_limiter = _rate_limiter()
+        rate_limiter.acquire('TEST_read', 3)
+
+        # Checks of the scheduler are not polls, only the withheld poll is counted
+        assert not rate_limiter.available('TEST_read')
+        assert rate_limiter.acquire('TEST_read', 1) == 0
+        assert rate_limiter.available('TEST_write')
+        assert [call.args[1] for call in increment.call_args_list] == ['TEST_read']
+
+    def test_tokens_are_not_granted_twice(self) -> None:
+        rate_limiter = RateLimiter(Metrics(), {'cli': EndpointRateLimitSettings(rate=0.001, burst=100)})
+        rate_limiter.register_task_type('TEST_read', 100, 100_000)
+        granted: list[int] = []
+
+        def acquire() -> None:
+            for _ in range(50):
+                granted.append(rate_limiter.acquire('TEST_read', 1))
+
+        threads = [threading.Thread(target=acquire) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(granted) == 100
+
+
+class TestRateLimitedPolling:
+    def test_endpoint_assigned_twice(self) -> None:
+        with pytest.raises(ValidationError):
+            ConductorWrapperSettings(
+                endpoint_rate_limits={
+                    'a': EndpointRateLimitSettings(rate=1, task_types=['TEST_echo']),
+                    'b': EndpointRateLimitSettings(rate=1, task_types=['TEST_echo']),
+                }
+            )
+
+    def test_throttled_task_type_is_not_polled(self, clock: FakeClock) -> None:
+        task_source = TaskSource(max_batch_size=10, worker_count=16, rate_limiter=_rate_limiter())
+        task_source.register_task_type('TEST_read', _exec_function)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        task_source.handle_tasks({'TEST_read': 10})
+
+        next_task = task_source.get_next_task(None)
+        assert next_task is not None
+        assert next_task.poll_count == 3
+        assert task_source.get_next_task(None) is None
+        assert task_source.filtered_queue == {'TEST_read': 7}
+
+        # Other task types are polled meanwhile
+        task_source.handle_tasks({'TEST_read': 7, 'TEST_echo': 2})
+        next_task = task_source.get_next_task(None)
+        assert next_task is not None
+        assert next_task.task_type == 'TEST_echo'
+
+    def test_rate_limits_from_task_definition(self, clock: FakeClock) -> None:
+        settings = ConductorWrapperSettings(
+            endpoint_rate_limits={'cli': EndpointRateLimitSettings(rate=1, task_types=['TEST_write'])}
+        )
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=settings)
+        task_definition = {'rateLimitPerFrequency': 5, 'rateLimitFrequencyInSeconds': 10}
+        wrapper.register('TEST_read', task_definition, _exec_function, register_definition=False)
+        wrapper.register('TEST_write', {}, _exec_function, register_definition=False)
+
+        assert wrapper.rate_limiter.acquire('TEST_read', 10) == 5
+        assert wrapper.rate_limiter.acquire('TEST_write', 10) == 1
+        assert wrapper.task_source.rate_limiter is wrapper.rate_limiter
@@ -0,0 +1,229 @@
+import json
+import os
+import signal
+import threading
+import time
+from typing import Any
+
+import pytest
+import requests
+from pytest_mock import MockerFixture
+
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.result_reporter import TaskResultReporter
+from frinx.common import json_codec
+
+
+def _http_error(status_code: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+class FlakyUpdate:
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.attempts = 0
+        self.sent: list[dict[str, Any]] = []
+
+    def __call__(self, task_obj: dict[str, Any]) -> None:
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(task_obj)
+
+
+class TestTaskResultReporter:
+    def test_retry_of_retryable_errors(self) -> None:
+        update = FlakyUpdate(_http_error(503), requests.ConnectionError())
+        reporter = TaskResultReporter(update, sender_count=1, retry_backoff=0.001)
+
+        reporter.report({'taskId': 'a'})
+        reporter.flush()
+
+        assert update.sent == [{'taskId': 'a'}]
+        assert update.attempts == 3
+
+    @pytest.mark.parametrize('error', [_http_error(400), ValueError('unexpected')])
+    def test_no_retry_of_other_errors(self, error: Exception) -> None:
+        update = FlakyUpdate(error)
+        reporter = TaskResultReporter(update, sender_count=1, retry_backoff=0.001)
+
+        reporter.report({'taskId': 'a'})
+        reporter.flush()
+
+        assert update.sent == []
+        assert update.attempts == 1
+
+    def test_update_attempts_observed(self) -> None:
+        observed: list[tuple[str, bool]] = []
+        reporter = TaskResultReporter(
+            FlakyUpdate(_http_error(503)), sender_count=1, retry_backoff=0.001,
+            observe=lambda task_type, latency, failed: observed.append((task_type, failed))
+        )
+
+        reporter.report({'taskId': 'a'}, 'TEST_a')
+        reporter.report({'taskId': 'b'})
+        reporter.flush()
+
+        assert observed == [('TEST_a', True), ('TEST_a', False)]
+
+    def test_retries_are_limited(self) -> None:
+        update = FlakyUpdate(*[_http_error(503)] * 5)
+        reporter = TaskResultReporter(update, sender_count=1, max_retries=2, retry_backoff=0.001)
+
+        reporter.report({'taskId': 'a'})
+        reporter.flush()
+
+        assert update.sent == []
+        assert update.attempts == 3
+
+    def test_backpressure_of_full_queue(self) -> None:
+        release = threading.Event()
+        reporter = TaskResultReporter(lambda task: release.wait(), sender_count=1, queue_size=1)
+        reporter.report({'taskId': 'sending'})
+        reporter.report({'taskId': 'queued'})
+
+        blocked = threading.Thread(target=reporter.report, args=({'taskId': 'blocked'},))
+        blocked.start()
+        blocked.join(timeout=0.1)
+        assert blocked.is_alive()
+
+        release.set()
+        blocked.join(timeout=1)
+        assert not blocked.is_alive()
+        reporter.flush()
+
+    def test_flush_timeout_drops_unsent_results(self, caplog: pytest.LogCaptureFixture) -> None:
+        release = threading.Event()
+        reporter = TaskResultReporter(lambda task: release.wait(), sender_count=1)
+        for task_id in ('sending', 'queued', 'another'):
+            reporter.report({'taskId': task_id})
+
+        assert reporter.flush(timeout=0.05) == 3
+        assert 'Dropping 3 task results' in caplog.text
+
+        release.set()
+        assert reporter.flush(timeout=1) == 0
+
+
+class TestWrapperResultReporting:
+    def test_results_sent_by_reporter(self) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 1, worker_id='worker')
+        update = FlakyUpdate()
+        wrapper.task_client.update_task = update  # type: ignore[method-assign]
+        task = {
+            'taskId': 'a',
+            'workflowInstanceId': 'wf',
+            'inputData': {'config': 'x' * 1000},
+            'workflowTask': {'name': 'TEST_a'},
+        }
+
+        wrapper.execute(task, lambda task: {'status': 'COMPLETED', 'output': {'result': 1}})
+        assert wrapper.result_reporter is not None
+        wrapper.result_reporter.flush()
+
+        # Only fields read by Conductor are sent back
+        assert update.sent == [
+            {
+                'taskId': 'a',
+                'workflowInstanceId': 'wf',
+                'status': 'COMPLETED',
+                'outputData': {'result': 1},
+                'logs': [],
+                'workerId': 'worker',
+            }
+        ]
+
+    def test_results_flushed_on_sigterm(self, mocker: MockerFixture) -> None:
+        settings = ConductorWrapperSettings(heartbeat_interval=None)
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=settings)
+        update = FlakyUpdate()
+
+        def slow_update(task: dict[str, Any]) -> None:
+            time.sleep(0.05)
+            update(task)
+
+        wrapper.task_client.update_task = slow_update  # type: ignore[method-assign, assignment]
+
+        def scan_queues() -> None:
+            assert wrapper.result_reporter is not None
+            wrapper.result_reporter.report({'taskId': 'a'})
+            os.kill(os.getpid(), signal.SIGTERM)
+            time.sleep(5)
+
+        mocker.patch.object(wrapper, 'start_queue_scan_workers', side_effect=scan_queues)
+        with pytest.raises(SystemExit) as exit_info:
+            wrapper.start_workers()
+
+        assert exit_info.value.code == 128 + signal.SIGTERM
+        assert update.sent == [{'taskId': 'a'}]
+        assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+
+    def test_synchronous_results(self) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=ConductorWrapperSettings(result_sender_count=0))
+        update = FlakyUpdate()
+        wrapper.task_client.update_task = update  # type: ignore[method-assign]
+
+        wrapper.execute({'taskId': 'a'}, lambda task: None)
+
+        assert wrapper.result_reporter is None
+        assert update.sent[0]['status'] == 'FAILED'
+
+
+class TestExternalOutput:
+    def _wrapper(self, mocker: MockerFixture) -> tuple[FrinxConductorWrapper, list[dict[str, Any]]]:
+        settings = ConductorWrapperSettings(result_sender_count=0, external_output_threshold=100)
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=settings)
+        updates: list[dict[str, Any]] = []
+        wrapper.task_client.update_task = updates.append  # type: ignore[method-assign, assignment]
+        mocker.patch.object(
+            wrapper.task_client,
+            'get_task_output_external_payload_location',
+            return_value={'uri': 'http://s3/output', 'path': 'task/output.json'}
+        )
+        return wrapper, updates
+
+    def test_large_output_is_offloaded(self, mocker: MockerFixture) -> None:
+        wrapper, updates = self._wrapper(mocker)
+        put = mocker.patch.object(wrapper.task_client.session, 'put')
+        output = {'response': 'x' * 1000}
+
+        wrapper.execute({'taskId': 'a', 'taskType': 'TEST_a'}, lambda task: {'status': 'COMPLETED', 'output': output})
+
+        assert put.call_args.args == ('http://s3/output',)
+        assert json.loads(put.call_args.kwargs['data']) == output
+        assert updates[0]['outputData'] == {}
+        assert updates[0]['externalOutputPayloadStoragePath'] == 'task/output.json'
+
+    def test_small_output_is_sent_inline(self, mocker: MockerFixture) -> None:
+        wrapper, updates = self._wrapper(mocker)
+        put = mocker.patch.object(wrapper.task_client.session, 'put')
+
+        wrapper.execute({'taskId': 'a', 'taskType': 'TEST_a'}, lambda task: {'status': 'COMPLETED', 'output': {'a': 1}})
+
+        put.assert_not_called()
+        assert updates[0]['outputData'] == {'a': 1}
+        assert 'externalOutputPayloadStoragePath' not in updates[0]
+
+    def test_output_is_encoded_once(self, mocker: MockerFixture) -> None:
+        wrapper, _ = self._wrapper(mocker)
+        output = {'response': 'šťastný'}
+        encode = mocker.spy(json_codec.codec, 'encode')
+
+        task_result = wrapper.prepare_task_result({'taskId': 'a', 'status': 'COMPLETED', 'outputData': output})
+        body = json_codec.encode(task_result)
+        assert json.loads(body) == task_result
+        assert task_result['outputData'] == output
+        assert sum(call.args[0] == output for call in encode.call_args_list) == 1
+
+    def test_failed_upload_sends_output_inline(self, mocker: MockerFixture) -> None:
+        wrapper, updates = self._wrapper(mocker)
+        mocker.patch.object(wrapper.task_client.session, 'put', side_effect=requests.ConnectionError())
+        output = {'response': 'x' * 1000}
+
+        wrapper.execute({'taskId': 'a', 'taskType': 'TEST_a'}, lambda task: {'status': 'COMPLETED', 'output': output})
+
+        assert updates[0]['status'] == 'COMPLETED'
+        assert updates[0]['outputData'] == output
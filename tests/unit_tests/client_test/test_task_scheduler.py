@@ -0,0 +1,43 @@
+from collections import Counter
+
+from frinx.client.task_scheduler import WeightedFairScheduler
+
+
+def _always_available(task_type: str) -> bool:
+    return True
+
+
+class TestWeightedFairScheduler:
+    def test_deep_queues_drain_proportionally(self) -> None:
+        scheduler = WeightedFairScheduler()
+        queue = {'TEST_a': 300, 'TEST_b': 100}
+
+        selected = Counter(scheduler.select(queue, _always_available) for _ in range(400))
+        assert selected['TEST_a'] == 300
+        assert selected['TEST_b'] == 100
+
+    def test_only_available_types_are_selected(self) -> None:
+        scheduler = WeightedFairScheduler()
+        queue = {'TEST_a': 300, 'TEST_b': 100}
+
+        assert scheduler.select(queue, lambda task_type: task_type == 'TEST_b') == 'TEST_b'
+        assert scheduler.select(queue, lambda task_type: False) is None
+        assert scheduler.select({}, _always_available) is None
+
+    def test_slow_types_get_share_of_thread_time(self) -> None:
+        scheduler = WeightedFairScheduler()
+        scheduler.record_execution_time('TEST_sleep', 1.0)
+        scheduler.record_execution_time('TEST_echo', 0.01)
+        queue = {'TEST_sleep': 100, 'TEST_echo': 100}
+
+        selected = Counter(scheduler.select(queue, _always_available) for _ in range(101))
+        assert selected['TEST_sleep'] == 1
+        assert selected['TEST_echo'] == 100
+
+    def test_priorities(self) -> None:
+        scheduler = WeightedFairScheduler(priorities={'TEST_a': 3.0})
+        queue = {'TEST_a': 100, 'TEST_b': 100}
+
+        selected = Counter(scheduler.select(queue, _always_available) for _ in range(40))
+        assert selected['TEST_a'] == 30
+        assert selected['TEST_b'] == 10
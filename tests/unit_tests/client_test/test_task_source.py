@@ -0,0 +1,371 @@
+import threading
+import time
+from typing import Any
+
+from frinx.client.frinx_conductor_wrapper import SHARED_POOL
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import DispatchMode
+from frinx.client.frinx_conductor_wrapper import DispatchQueue
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.frinx_conductor_wrapper import NextWorkerTask
+from frinx.client.frinx_conductor_wrapper import TaskSource
+
+
+def _exec_function(task: Any) -> Any:
+    return task
+
+
+class TestTaskSource:
+    def test_single_poll_without_batch(self) -> None:
+        task_source = TaskSource(worker_count=4)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        task_source.handle_tasks({'TEST_echo': 3, 'OTHER_type': 5})
+
+        next_task = task_source.get_next_task(None)
+        assert next_task is not None
+        assert next_task.task_type == 'TEST_echo'
+        assert next_task.poll_count == 1
+        assert task_source.filtered_queue == {'TEST_echo': 2}
+
+    def test_batch_poll_limited_by_queue_depth(self) -> None:
+        task_source = TaskSource(max_batch_size=10, worker_count=16)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        task_source.handle_tasks({'TEST_echo': 3})
+
+        next_task = task_source.get_next_task(None)
+        assert next_task is not None
+        assert next_task.poll_count == 3
+        assert task_source.filtered_queue == {}
+
+    def test_batch_poll_limited_by_idle_workers(self) -> None:
+        task_source = TaskSource(max_batch_size=10, worker_count=2)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        task_source.handle_tasks({'TEST_echo': 50})
+
+        next_task = task_source.get_next_task(None)
+        assert next_task is not None
+        assert next_task.poll_count == 2
+
+    def test_concurrency_limit_skips_saturated_type(self) -> None:
+        task_source = TaskSource(worker_count=8)
+        task_source.register_task_type('TEST_sleep', _exec_function, concurrency_limit=1)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        task_source.handle_tasks({'TEST_sleep': 5, 'TEST_echo': 5})
+
+        task_types = [next_task.task_type for next_task in iter(lambda: task_source.get_next_task(None), None)]
+        assert task_types.count('TEST_sleep') == 1
+        assert task_types.count('TEST_echo') == 5
+
+        # Finished task frees the capacity of the type
+        next_task = task_source.get_next_task('TEST_sleep')
+        assert next_task is not None and next_task.task_type == 'TEST_sleep'
+
+    def test_concurrency_limit_caps_batch_poll(self) -> None:
+        task_source = TaskSource(max_batch_size=10, worker_count=16)
+        task_source.register_task_type('TEST_echo', _exec_function, concurrency_limit=3)
+        task_source.handle_tasks({'TEST_echo': 50})
+
+        first = task_source.get_next_task(None)
+        assert first is not None and first.poll_count == 3
+        task_source.claim_tasks('TEST_echo', [{'taskId': '2'}, {'taskId': '3'}], reserved=2)
+        assert task_source.free_capacity('TEST_echo') == 0
+
+    def test_batch_poll_in_progress_counts_against_limit(self) -> None:
+        task_source = TaskSource(max_batch_size=10, worker_count=16)
+        task_source.register_task_type('TEST_echo', _exec_function, concurrency_limit=3)
+        task_source.handle_tasks({'TEST_echo': 50})
+
+        first = task_source.get_next_task(None)
+        assert first is not None and first.poll_count == 3
+        # Other consumer threads do not poll while the batch is on its way
+        assert task_source.get_next_task(None) is None
+
+        # Batch returned one task less than reserved, the rest of the capacity is released
+        task_source.claim_tasks('TEST_echo', [{'taskId': '2'}], reserved=2)
+        assert task_source.free_capacity('TEST_echo') == 1
+        second = task_source.get_next_task(None)
+        assert second is not None and second.polled_task == {'taskId': '2'}
+        third = task_source.get_next_task(None)
+        assert third is not None and third.poll_count == 1
+        assert task_source.get_next_task(None) is None
+        assert task_source.counters['TEST_echo'].running == 3
+
+    def test_prefetch_in_progress_counts_against_limit(self) -> None:
+        task_source = TaskSource(worker_count=4, prefetch_size=4)
+        task_source.register_task_type('TEST_echo', _exec_function, concurrency_limit=1)
+        task_source.handle_tasks({'TEST_echo': 8})
+
+        prefetch = task_source.wait_for_prefetch(0)
+        assert [next_task.poll_count for next_task in prefetch] == [1]
+        assert task_source.get_next_task(None) is None
+
+        # Prefetch found the queue empty, a consumer thread may poll again
+        task_source.claim_tasks('TEST_echo', [], reserved=1)
+        next_task = task_source.get_next_task(None)
+        assert next_task is not None and next_task.poll_count == 1
+
+    def test_claimed_tasks_are_handed_over(self) -> None:
+        task_source = TaskSource(max_batch_size=3, worker_count=3)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        task_source.handle_tasks({'TEST_echo': 3})
+
+        first = task_source.get_next_task(None)
+        assert first is not None
+        task_source.claim_tasks('TEST_echo', [{'taskId': '2'}, {'taskId': '3'}])
+
+        second = task_source.get_next_task(None)
+        third = task_source.get_next_task(None)
+        assert second is not None and second.polled_task == {'taskId': '2'}
+        assert third is not None and third.polled_task == {'taskId': '3'}
+        assert task_source.get_next_task(None) is None
+        assert task_source.actual_task_types_running['TEST_echo'] == 3
+
+    def test_idle_consumer_is_woken_by_new_tasks(self) -> None:
+        task_source = TaskSource(worker_count=1)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        woken = threading.Event()
+
+        def consumer() -> None:
+            task_source.wait_for_tasks(timeout=10)
+            woken.set()
+
+        thread = threading.Thread(target=consumer, daemon=True)
+        thread.start()
+        time.sleep(0.05)
+        assert not woken.is_set()
+
+        task_source.handle_tasks({'TEST_echo': 1})
+        assert woken.wait(timeout=1)
+        thread.join()
+
+    def test_polling_interval_backoff(self) -> None:
+        settings = ConductorWrapperSettings(
+            polling_backoff_factor=2.0, max_polling_interval=0.5, idle_scans_before_backoff=1
+        )
+        wrapper = FrinxConductorWrapper('http://localhost', 1, polling_interval=0.1, settings=settings)
+        wrapper.task_source.register_task_type('TEST_echo', _exec_function)
+
+        assert wrapper.task_source.is_idle()
+        assert wrapper.next_polling_interval(0.1) == 0.1
+        assert wrapper.next_polling_interval(0.1) == 0.2
+        assert wrapper.next_polling_interval(0.4) == 0.5
+
+        wrapper.task_source.handle_tasks({'TEST_echo': 1})
+        assert not wrapper.task_source.is_idle()
+        assert wrapper.next_polling_interval(0.5) == 0.1
+
+    def test_polling_interval_backoff_disabled_by_default(self) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 1, polling_interval=0.1)
+        wrapper.task_source.register_task_type('TEST_echo', _exec_function)
+
+        polling_interval = 0.1
+        for _ in range(wrapper.settings.idle_scans_before_backoff + 5):
+            polling_interval = wrapper.next_polling_interval(polling_interval)
+        assert polling_interval == 0.1
+        assert wrapper.max_polling_interval == 0.1
+
+    def test_prefetch_reserves_queued_tasks(self) -> None:
+        task_source = TaskSource(worker_count=4, prefetch_size=5)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        task_source.register_task_type('TEST_sleep', _exec_function)
+        task_source.handle_tasks({'TEST_echo': 8, 'TEST_sleep': 2})
+
+        prefetch = {next_task.task_type: next_task.poll_count for next_task in task_source.wait_for_prefetch(0)}
+        assert prefetch == {'TEST_echo': 5, 'TEST_sleep': 2}
+        assert task_source.filtered_queue == {'TEST_echo': 3}
+
+        task_source.claim_tasks('TEST_echo', [{'taskId': str(index)} for index in range(5)], reserved=5)
+        assert task_source.wait_for_prefetch(0) == []
+
+        # Consumed task makes room in the buffer
+        next_task = task_source.get_next_task(None)
+        assert next_task is not None and next_task.polled_task == {'taskId': '0'}
+        prefetch = {next_task.task_type: next_task.poll_count for next_task in task_source.wait_for_prefetch(0)}
+        assert prefetch == {'TEST_echo': 1}
+
+    def test_prefetch_limited_by_response_timeout(self) -> None:
+        task_source = TaskSource(prefetch_size=100, prefetch_timeout_ratio=0.5)
+        task_source.register_task_type('TEST_sleep', _exec_function, response_timeout_seconds=10)
+
+        assert task_source.prefetch_limit('TEST_sleep') == 100
+        task_source.scheduler.record_execution_time('TEST_sleep', 1.0)
+        assert task_source.prefetch_limit('TEST_sleep') == 5
+
+    def test_prefetch_limited_by_other_claimed_tasks(self) -> None:
+        task_source = TaskSource(prefetch_size=100, prefetch_timeout_ratio=0.5)
+        task_source.register_task_type('TEST_sleep', _exec_function, response_timeout_seconds=10)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        task_source.scheduler.record_execution_time('TEST_sleep', 1.0)
+        task_source.scheduler.record_execution_time('TEST_echo', 1.0)
+
+        # Claimed tasks of TEST_echo are started before the prefetched ones of TEST_sleep
+        task_source.claim_tasks('TEST_echo', [{'taskId': str(index)} for index in range(3)])
+        assert task_source.prefetch_limit('TEST_sleep') == 2
+        task_source.claim_tasks('TEST_echo', [{'taskId': str(index)} for index in range(3, 6)])
+        assert task_source.prefetch_limit('TEST_sleep') == 0
+
+    def test_stale_claimed_task_is_marked(self) -> None:
+        task_source = TaskSource(prefetch_size=2, prefetch_timeout_ratio=0.5)
+        task_source.register_task_type('TEST_echo', _exec_function, response_timeout_seconds=0.1)
+        task_source.claim_tasks('TEST_echo', [{'taskId': 'stale'}])
+        time.sleep(0.06)
+        task_source.claim_tasks('TEST_echo', [{'taskId': 'fresh'}])
+
+        stale_task = task_source.get_next_task(None)
+        assert stale_task is not None and stale_task.polled_task == {'taskId': 'stale'} and stale_task.stale
+        fresh_task = task_source.get_next_task('TEST_echo')
+        assert fresh_task is not None and fresh_task.polled_task == {'taskId': 'fresh'} and not fresh_task.stale
+        assert task_source.claimed_count == 0
+        assert task_source.running_count == 1
+
+    def test_stale_task_is_handed_back(self) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=ConductorWrapperSettings(result_sender_count=0))
+        executed: list[Any] = []
+        updates: list[dict[str, Any]] = []
+        wrapper.register('TEST_echo', {}, executed.append, register_definition=False)
+        wrapper.task_client.update_task = updates.append  # type: ignore[method-assign, assignment]
+
+        polled_task = {'taskId': 'stale', 'taskType': 'TEST_echo', 'outputData': {'checkpoint': 1}}
+        wrapper.process_task(NextWorkerTask('TEST_echo', executed.append, None, polled_task=polled_task, stale=True))
+        assert executed == []
+        assert len(updates) == 1
+        assert updates[0]['status'] == 'IN_PROGRESS'
+        assert updates[0]['callbackAfterSeconds'] == 0
+        assert updates[0]['outputData'] == {'checkpoint': 1}
+
+    def test_counters_stay_consistent_under_contention(self) -> None:
+        task_source = TaskSource(max_batch_size=4, worker_count=32)
+        task_source.register_task_type('TEST_sleep', _exec_function, concurrency_limit=3)
+        task_source.register_task_type('TEST_echo', _exec_function)
+        deadline = time.monotonic() + 0.5
+        over_limit = threading.Event()
+
+        def consumer() -> None:
+            last_task_type = None
+            while time.monotonic() < deadline:
+                next_task = task_source.get_next_task(last_task_type, 0.001)
+                last_task_type = next_task.task_type if next_task else None
+                if next_task is not None and next_task.poll_count > 1:
+                    task_source.claim_tasks(next_task.task_type, [{} for _ in range(next_task.poll_count - 1)])
+                if task_source.actual_task_types_running['TEST_sleep'] > 3:
+                    over_limit.set()
+            if last_task_type:
+                task_source.task_finished(last_task_type)
+
+        def queue_scanner() -> None:
+            while time.monotonic() < deadline:
+                task_source.handle_tasks({'TEST_sleep': 100, 'TEST_echo': 100})
+                time.sleep(0.001)
+
+        threads = [threading.Thread(target=queue_scanner)]
+        threads.extend(threading.Thread(target=consumer) for _ in range(32))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Tasks claimed at the end stay claimed, all started tasks are finished
+        assert not over_limit.is_set()
+        assert task_source.running_count == 0
+        assert dict(task_source.actual_task_types_running) == {'TEST_sleep': 0, 'TEST_echo': 0}
+        claimed = [task_type for task_type, _, _ in task_source.claimed_tasks]
+        assert task_source.counters['TEST_sleep'].claimed == claimed.count('TEST_sleep')
+        assert task_source.counters['TEST_echo'].claimed == claimed.count('TEST_echo')
+
+
+class TestDispatchQueue:
+    def test_poll_count_follows_free_workers(self) -> None:
+        dispatch_queue = DispatchQueue(worker_count=2)
+        assert dispatch_queue.wait_for_free_workers('TEST_echo', 10) == 2
+
+        # Poll returned one task, the other worker is given back
+        dispatch_queue.put(NextWorkerTask('TEST_echo', _exec_function, None, polled_task={'taskId': '1'}))
+        dispatch_queue.release('TEST_echo', 1)
+        assert dispatch_queue.wait_for_free_workers('TEST_echo', 10) == 1
+        dispatch_queue.release('TEST_echo', 1)
+
+        next_task = dispatch_queue.get()
+        assert next_task.polled_task == {'taskId': '1'}
+        dispatch_queue.task_done('TEST_echo')
+        assert dispatch_queue.wait_for_free_workers('TEST_echo', 10) == 2
+
+    def test_reserved_workers_are_not_granted_twice(self) -> None:
+        dispatch_queue = DispatchQueue(worker_count=4)
+        assert dispatch_queue.wait_for_free_workers('TEST_echo', 3) == 3
+        # Second poller gets only the worker left while the first poll is still open
+        assert dispatch_queue.wait_for_free_workers('TEST_other', 3) == 1
+        assert dispatch_queue.free_workers == 0
+
+        dispatch_queue.release('TEST_echo', 3)
+        assert dispatch_queue.free_workers == 3
+        assert dispatch_queue.in_flight['TEST_echo'] == 0
+
+    def test_concurrency_limit(self) -> None:
+        dispatch_queue = DispatchQueue(worker_count=8)
+        assert dispatch_queue.wait_for_free_workers('TEST_echo', 10, concurrency_limit=2) == 2
+
+        dispatch_queue.release('TEST_echo', 1)
+        assert dispatch_queue.wait_for_free_workers('TEST_echo', 10, concurrency_limit=2) == 1
+        assert dispatch_queue.wait_for_free_workers('TEST_other', 10) == 6
+
+    def test_free_workers_go_to_waiting_pollers_in_order(self) -> None:
+        dispatch_queue = DispatchQueue(worker_count=1)
+        assert dispatch_queue.wait_for_free_workers('TEST_echo', 1) == 1
+        granted: list[str] = []
+
+        def poll(task_type: str) -> None:
+            dispatch_queue.wait_for_free_workers(task_type, 1)
+            granted.append(task_type)
+
+        other_poller = threading.Thread(target=poll, args=('TEST_other',), daemon=True)
+        other_poller.start()
+        while not dispatch_queue.pollers_waiting():
+            time.sleep(0.001)
+
+        # The poller giving back its worker has to queue up behind the waiting one
+        dispatch_queue.release('TEST_echo', 1)
+        echo_poller = threading.Thread(target=poll, args=('TEST_echo',), daemon=True)
+        echo_poller.start()
+        other_poller.join(timeout=1)
+        assert granted == ['TEST_other']
+
+        dispatch_queue.release('TEST_other', 1)
+        echo_poller.join(timeout=1)
+        assert granted == ['TEST_other', 'TEST_echo']
+
+    def test_pollers_at_concurrency_limit_do_not_wait_for_workers(self) -> None:
+        dispatch_queue = DispatchQueue(worker_count=1)
+        assert dispatch_queue.wait_for_free_workers('TEST_echo', 1, concurrency_limit=1) == 1
+        threading.Thread(
+            target=dispatch_queue.wait_for_free_workers, args=('TEST_echo', 1, 1), daemon=True
+        ).start()
+        time.sleep(0.05)
+        assert not dispatch_queue.pollers_waiting()
+
+    def test_long_polls_are_short_while_other_types_wait(self) -> None:
+        settings = ConductorWrapperSettings(result_sender_count=0, dispatch_mode=DispatchMode.LONG_POLL)
+        wrapper = FrinxConductorWrapper('http://localhost', 1, settings=settings)
+        task_types = ['TEST_echo', 'TEST_other']
+        for task_type in task_types:
+            wrapper.task_source.register_task_type(task_type, _exec_function)
+        polls: list[tuple[str, int]] = []
+        stop = threading.Event()
+
+        def poll_for_batch(task_type: str, count: int, timeout: int, worker_id: str) -> list[Any]:
+            if stop.is_set():
+                threading.Event().wait()
+            polls.append((task_type, timeout))
+            time.sleep(0.01)
+            return []
+
+        wrapper.task_client.poll_for_batch = poll_for_batch  # type: ignore[method-assign, assignment]
+        for task_type in task_types:
+            threading.Thread(
+                target=wrapper.long_poll_task_type, args=(task_type, wrapper.pools[SHARED_POOL]), daemon=True
+            ).start()
+        time.sleep(0.3)
+        stop.set()
+
+        # Both task types take turns on the single worker with polls of the batch poll timeout
+        assert {task_type for task_type, _ in polls} == set(task_types)
+        assert all(timeout == settings.batch_poll_timeout for _, timeout in polls[2:])
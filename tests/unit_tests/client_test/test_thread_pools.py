@@ -0,0 +1,193 @@
+import threading
+import time
+import uuid
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from frinx.client.frinx_conductor_wrapper import SHARED_POOL
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import ConsumerPool
+from frinx.client.frinx_conductor_wrapper import DispatchMode
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.client.frinx_conductor_wrapper import NextWorkerTask
+from frinx.client.frinx_conductor_wrapper import TaskSource
+from frinx.client.frinx_conductor_wrapper import ThreadPoolSettings
+from frinx.common.telemetry.metrics import Metrics
+
+
+def _exec_function(task: dict[str, Any]) -> dict[str, Any]:
+    return {'status': 'COMPLETED', 'output': {}}
+
+
+def _wrapper(max_thread_count: int = 1) -> FrinxConductorWrapper:
+    settings = ConductorWrapperSettings(
+        result_sender_count=0,
+        thread_pools={'provisioning': ThreadPoolSettings(size=1, task_types=['TEST_slow'])}
+    )
+    wrapper = FrinxConductorWrapper('http://localhost', max_thread_count, settings=settings)
+    wrapper.register('TEST_slow', {}, _exec_function, register_definition=False)
+    wrapper.register('TEST_fast', {}, _exec_function, register_definition=False)
+    return wrapper
+
+
+class TestThreadPoolSettings:
+    def test_task_type_in_more_pools(self) -> None:
+        with pytest.raises(ValidationError):
+            ConductorWrapperSettings(
+                thread_pools={
+                    'a': ThreadPoolSettings(size=1, task_types=['TEST_echo']),
+                    'b': ThreadPoolSettings(size=1, task_types=['TEST_echo']),
+                }
+            )
+
+    def test_reserved_pool_name(self) -> None:
+        with pytest.raises(ValidationError):
+            ConductorWrapperSettings(thread_pools={SHARED_POOL: ThreadPoolSettings(size=1)})
+
+
+class TestThreadPools:
+    def test_queue_sizes_split_between_pools(self) -> None:
+        wrapper = _wrapper()
+        wrapper.handle_tasks({'TEST_slow': 3, 'TEST_fast': 2})
+
+        shared_task = wrapper.pools[SHARED_POOL].task_source.get_next_task(None)
+        pool_task = wrapper.pools['provisioning'].task_source.get_next_task(None)
+        assert shared_task is not None and shared_task.task_type == 'TEST_fast'
+        assert pool_task is not None and pool_task.task_type == 'TEST_slow'
+        assert wrapper.pools[SHARED_POOL].task_source.filtered_queue == {'TEST_fast': 1}
+        assert wrapper.pools['provisioning'].task_source.filtered_queue == {'TEST_slow': 2}
+        # Registry of all task types is kept for lookups by task type
+        assert set(wrapper.task_source.task_types) == {'TEST_slow', 'TEST_fast'}
+
+    def test_batch_polled_tasks_claimed_by_their_pool(self) -> None:
+        settings = ConductorWrapperSettings(
+            result_sender_count=0, batch_poll_size=4,
+            thread_pools={'provisioning': ThreadPoolSettings(size=4, task_types=['TEST_slow'])}
+        )
+        wrapper = FrinxConductorWrapper('http://localhost', 4, settings=settings)
+        wrapper.register('TEST_slow', {}, _exec_function, register_definition=False)
+
+        def poll_for_batch(
+                task_type: str, count: int, timeout: int, worker_id: str, domain: str | None = None
+        ) -> list[dict[str, Any]]:
+            return [{'taskId': str(index), 'taskType': task_type} for index in range(count)]
+
+        wrapper.task_client.poll_for_batch = poll_for_batch  # type: ignore[method-assign]
+        wrapper.handle_tasks({'TEST_slow': 3})
+        pool_source = wrapper.pools['provisioning'].task_source
+        next_task = pool_source.get_next_task(None)
+        assert next_task is not None and next_task.poll_count == 3
+
+        assert wrapper.poll_task(next_task) is not None
+        assert pool_source.claimed_count == 2
+        assert pool_source.counters['TEST_slow'].reserved == 0
+        assert wrapper.pools[SHARED_POOL].task_source.claimed_count == 0
+
+    def test_failed_batch_poll_releases_reserved_tasks(self) -> None:
+        settings = ConductorWrapperSettings(result_sender_count=0, batch_poll_size=4)
+        wrapper = FrinxConductorWrapper('http://localhost', 4, settings=settings)
+        wrapper.register('TEST_slow', {'concurrentExecLimit': 3}, _exec_function, register_definition=False)
+        wrapper.task_client.poll_for_batch = lambda *args, **kwargs: None  # type: ignore[method-assign]
+        wrapper.handle_tasks({'TEST_slow': 3})
+        task_source = wrapper.pool_of('TEST_slow').task_source
+
+        next_task = task_source.get_next_task(None)
+        assert next_task is not None and next_task.poll_count == 3
+        assert task_source.free_capacity('TEST_slow') == 0
+        assert wrapper.poll_task(next_task) is None
+        assert task_source.counters['TEST_slow'].reserved == 0
+        assert task_source.free_capacity('TEST_slow') == 2
+
+    def test_connection_pool_size(self) -> None:
+        settings = ConductorWrapperSettings(result_sender_count=2, heartbeat_interval=1, prefetch_size=2)
+        wrapper = FrinxConductorWrapper('http://localhost', 4, settings=settings)
+        # Consumer threads, result senders, queue scanner, heartbeat and one prefetch thread per pool
+        assert wrapper.connection_pool_size() == 4 + 2 + 1 + 1 + 1
+
+        settings = ConductorWrapperSettings(
+            result_sender_count=0, heartbeat_interval=None, dispatch_mode=DispatchMode.LONG_POLL,
+            thread_pools={'provisioning': ThreadPoolSettings(size=2, task_types=['TEST_slow'])}
+        )
+        wrapper = FrinxConductorWrapper('http://localhost', 4, settings=settings)
+        wrapper.register('TEST_slow', {}, _exec_function, register_definition=False)
+        wrapper.register('TEST_fast', {}, _exec_function, register_definition=False)
+        # Consumer threads of both pools, the registering thread and one long-poll thread per task type
+        assert wrapper.connection_pool_size() == 4 + 2 + 1 + 2
+
+    def test_slow_tasks_do_not_starve_other_pools(self) -> None:
+        wrapper = _wrapper()
+        slow_started = threading.Event()
+        release = threading.Event()
+        completed: list[str] = []
+        all_fast_completed = threading.Event()
+
+        def slow_function(task: dict[str, Any]) -> dict[str, Any]:
+            slow_started.set()
+            release.wait(timeout=5)
+            return {'status': 'COMPLETED', 'output': {}}
+
+        def update_task(task: dict[str, Any]) -> None:
+            completed.append(task['taskId'])
+            if sum(task_id.startswith('TEST_fast') for task_id in completed) == 3:
+                all_fast_completed.set()
+
+        def poll_for_task(task_type: str, worker_id: str, domain: str | None = None) -> dict[str, Any]:
+            return {'taskId': f'{task_type}-{uuid.uuid4()}', 'taskType': task_type, 'inputData': {}}
+
+        wrapper.register('TEST_slow', {}, slow_function, register_definition=False)
+        wrapper.task_client.poll_for_task = poll_for_task  # type: ignore[method-assign]
+        wrapper.task_client.update_task = update_task  # type: ignore[method-assign, assignment]
+        for pool in wrapper.pools.values():
+            pool.start(wrapper.consume_task, pool)
+
+        wrapper.handle_tasks({'TEST_slow': 5, 'TEST_fast': 3})
+        try:
+            assert slow_started.wait(timeout=5)
+            assert all_fast_completed.wait(timeout=5)
+            assert wrapper.pools['provisioning'].busy == 1
+            assert not any(task_id.startswith('TEST_slow') for task_id in completed)
+        finally:
+            release.set()
+
+
+class TestElasticPool:
+    def test_scale_between_min_and_max(self) -> None:
+        pool = ConsumerPool('elastic', 4, TaskSource(), Metrics(), min_size=1)
+        pool.start(lambda: None)
+        assert pool.threads == 1
+
+        pool.scale(3)
+        assert pool.threads == 3
+        pool.scale(10)
+        assert pool.threads == 4
+
+        assert [pool.retire() for _ in range(4)] == [True, True, True, False]
+        assert pool.threads == 1
+
+    def test_dispatched_task_demand(self) -> None:
+        pool = ConsumerPool('elastic', 4, TaskSource(), Metrics(), min_size=1)
+        assert pool.dispatch_queue.wait_for_free_workers('TEST_echo', 2) == 2
+        pool.dispatch_queue.put(NextWorkerTask('TEST_echo', _exec_function, None, polled_task={'taskId': '1'}))
+        pool.dispatch_queue.put(NextWorkerTask('TEST_echo', _exec_function, None, polled_task={'taskId': '2'}))
+        assert pool.dispatch_queue.task_demand() == 2
+
+        pool.dispatch_queue.get()
+        pool.dispatch_queue.task_done('TEST_echo')
+        assert pool.dispatch_queue.task_demand() == 1
+
+    def test_idle_threads_retire(self) -> None:
+        settings = ConductorWrapperSettings(
+            result_sender_count=0, min_thread_count=1, thread_idle_timeout=0.05, max_polling_interval=0.01
+        )
+        wrapper = FrinxConductorWrapper('http://localhost', 3, settings=settings)
+        pool = wrapper.pools[SHARED_POOL]
+        pool.start(wrapper.consume_task, pool)
+        pool.scale(3)
+        assert pool.threads == 3
+
+        deadline = time.monotonic() + 5
+        while pool.threads > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.threads == 1
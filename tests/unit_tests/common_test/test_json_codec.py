@@ -0,0 +1,62 @@
+import json
+from collections.abc import Iterator
+
+import pytest
+
+from frinx.common import json_codec
+from frinx.common.json_codec import JsonCodec
+from frinx.common.json_codec import OrjsonCodec
+
+CODECS: list[JsonCodec] = [JsonCodec()]
+try:
+    CODECS.append(OrjsonCodec())
+except ImportError:
+    pass
+
+PAYLOAD = {
+    'taskId': 'c6a3d35e-3a5c-4b4c-9ad6-1d2f3b0a4c2e',
+    'inputData': {'device': 'R1', 'config': {'interfaces': [{'name': 'eth0', 'mtu': 1500}]}, 'note': 'šťastný'},
+    'pollCount': 1,
+    'ratio': 0.5,
+    'done': False,
+    'result': None,
+}
+
+
+@pytest.fixture
+def restore_codec() -> Iterator[None]:
+    codec = json_codec.get_codec()
+    yield
+    json_codec.set_codec(codec)
+
+
+class TestJsonCodec:
+    @pytest.mark.parametrize('codec', CODECS, ids=lambda codec: codec.name)
+    def test_round_trip(self, codec: JsonCodec) -> None:
+        encoded = codec.encode(PAYLOAD)
+        assert isinstance(encoded, bytes)
+        assert 'šťastný'.encode('utf8') in encoded
+        assert codec.loads(encoded) == PAYLOAD
+        assert codec.loads(codec.dumps(PAYLOAD)) == PAYLOAD
+        assert json.loads(encoded) == PAYLOAD
+
+    @pytest.mark.parametrize('codec', CODECS, ids=lambda codec: codec.name)
+    def test_stdlib_compatible_encoding(self, codec: JsonCodec) -> None:
+        payload = {1: 'int key', 'big': 2 ** 70, 'list': (1, 2)}
+        assert codec.loads(codec.encode(payload)) == json.loads(json.dumps(payload))
+
+    @pytest.mark.parametrize('codec', CODECS, ids=lambda codec: codec.name)
+    def test_decode_error(self, codec: JsonCodec) -> None:
+        with pytest.raises(json_codec.JSONDecodeError):
+            codec.loads('{"invalid": ')
+
+    def test_encoded_dict(self) -> None:
+        encoded = json_codec.EncodedDict({'a': 1}, b'{"a": 1, "encoded": true}')
+        assert encoded == {'a': 1}
+        assert json_codec.encode(encoded) == b'{"a": 1, "encoded": true}'
+
+    def test_set_codec(self, restore_codec: None) -> None:
+        codec = JsonCodec()
+        json_codec.set_codec(codec)
+        assert json_codec.get_codec() is codec
+        assert json_codec.dumps({'a': 1}) == '{"a": 1}'
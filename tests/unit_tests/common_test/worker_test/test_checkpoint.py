@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any
+
+from frinx.client.frinx_conductor_wrapper import ConductorWrapperSettings
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.common.conductor_enums import TaskResultStatus
+from frinx.common.worker.task_def import TaskDefinition
+from frinx.common.worker.task_def import TaskInput
+from frinx.common.worker.task_def import TaskOutput
+from frinx.common.worker.task_result import TaskResult
+from frinx.common.worker.worker import CHECKPOINT_KEY
+from frinx.common.worker.worker import WorkerImpl
+from frinx.workers.test import test_worker
+
+
+class AsyncCounter(WorkerImpl):
+    class WorkerDefinition(TaskDefinition):
+        name: str = 'TEST_async_counter'
+        description: str = 'Helper class used in tests.'
+
+    class WorkerInput(TaskInput):
+        ...
+
+    class WorkerOutput(TaskOutput):
+        count: int
+
+    async def execute(self, worker_input: WorkerInput) -> TaskResult[WorkerOutput]:
+        count = (self.get_checkpoint() or {}).get('count', 0) + 1
+        if count < 3:
+            return TaskResult(
+                status=TaskResultStatus.IN_PROGRESS, callback_after_seconds=1, checkpoint={'count': count}
+            )
+        return TaskResult(status=TaskResultStatus.COMPLETED, output=self.WorkerOutput(count=count))
+
+
+class TestCheckpointedWorker:
+    def test_sleep_worker_releases_thread(self) -> None:
+        task: dict[str, Any] = {'taskId': '1', 'taskType': 'TEST_sleep', 'inputData': {'time': 30}}
+
+        result = test_worker.TestWorker.Sleep._execute_wrapper(task)
+        assert result['status'] == TaskResultStatus.IN_PROGRESS
+        assert result['callback_after_seconds'] == 30
+        assert 'started' in result['output'][CHECKPOINT_KEY]
+
+        # Conductor hands the task back with output data of the IN_PROGRESS result, early here
+        task['outputData'] = result['output']
+        result = test_worker.TestWorker.Sleep._execute_wrapper(task)
+        assert result['status'] == TaskResultStatus.IN_PROGRESS
+        assert 0 < result['callback_after_seconds'] <= 30
+        started = result['output'][CHECKPOINT_KEY]['started']
+        assert started == task['outputData'][CHECKPOINT_KEY]['started']
+
+        # Handed back after the whole sleep
+        task['outputData'] = {CHECKPOINT_KEY: {'started': started - 30}}
+        result = test_worker.TestWorker.Sleep._execute_wrapper(task)
+        assert result['status'] == TaskResultStatus.COMPLETED
+        assert result['output'] == {'time': 30}
+
+    def test_async_worker_resumes_from_checkpoint(self) -> None:
+        task: dict[str, Any] = {'taskId': '1', 'taskType': 'TEST_async_counter', 'inputData': {}}
+
+        for count in (1, 2):
+            result = asyncio.run(AsyncCounter._execute_wrapper_async(task))
+            assert result['status'] == TaskResultStatus.IN_PROGRESS
+            assert result['output'] == {CHECKPOINT_KEY: {'count': count}}
+            task['outputData'] = result['output']
+
+        result = asyncio.run(AsyncCounter._execute_wrapper_async(task))
+        assert result['output'] == {'count': 3}
+        assert AsyncCounter.get_checkpoint() is None
+
+    def test_callback_delay_is_reported(self) -> None:
+        settings = ConductorWrapperSettings(result_sender_count=0)
+        wrapper = FrinxConductorWrapper('http://localhost', 1, worker_id='worker', settings=settings)
+        updates: list[dict[str, Any]] = []
+        wrapper.task_client.update_task = updates.append  # type: ignore[method-assign, assignment]
+        task = {'taskId': '1', 'workflowInstanceId': 'wf', 'taskType': 'TEST_sleep', 'inputData': {'time': 5}}
+
+        wrapper.execute(task, test_worker.TestWorker.Sleep._execute_wrapper)
+
+        assert updates[0]['status'] == TaskResultStatus.IN_PROGRESS
+        assert updates[0]['callbackAfterSeconds'] == 5
+        assert CHECKPOINT_KEY in updates[0]['outputData']
@@ -0,0 +1,54 @@
+from pytest_mock import MockerFixture
+
+from frinx.client.frinx_conductor_wrapper import FrinxConductorWrapper
+from frinx.workers.test import test_worker
+
+
+class TestServiceWorkersRegister:
+    def test_only_new_and_changed_definitions_are_sent(self, mocker: MockerFixture) -> None:
+        post = mocker.patch('frinx.client.frinx_conductor_wrapper.requests.post')
+        wrapper = FrinxConductorWrapper('http://localhost', 1)
+        service = test_worker.TestWorker()
+        local = {
+            task.task_def.name: wrapper.build_task_definition(
+                task.task_def.name, task.task_def.dict(by_alias=True, exclude_none=True)
+            )
+            for task in service.tasks()
+        }
+
+        unchanged = {**local['TEST_echo'], 'createTime': 1, 'ownerApp': 'server'}
+        changed = {**local['TEST_sleep'], 'timeoutSeconds': 1}
+        mocker.patch.object(wrapper.metadata_client, 'get_all_task_defs', return_value=[unchanged, changed])
+        register_task_defs = mocker.patch.object(wrapper.metadata_client, 'register_task_defs')
+
+        service.register(wrapper)
+
+        post.assert_not_called()
+        register_task_defs.assert_called_once()
+        sent = {definition['name'] for definition in register_task_defs.call_args.args[0]}
+        assert sent == set(local) - {'TEST_echo'}
+        assert set(wrapper.task_source.task_types) == set(local)
+
+    def test_nothing_sent_when_unchanged(self, mocker: MockerFixture) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 1)
+        service = test_worker.TestWorker()
+        remote = [
+            wrapper.build_task_definition(task.task_def.name, task.task_def.dict(by_alias=True, exclude_none=True))
+            for task in service.tasks()
+        ]
+        mocker.patch.object(wrapper.metadata_client, 'get_all_task_defs', return_value=remote)
+        register_task_defs = mocker.patch.object(wrapper.metadata_client, 'register_task_defs')
+
+        service.register(wrapper)
+
+        register_task_defs.assert_not_called()
+
+    def test_all_definitions_sent_when_read_fails(self, mocker: MockerFixture) -> None:
+        wrapper = FrinxConductorWrapper('http://localhost', 1)
+        service = test_worker.TestWorker()
+        mocker.patch.object(wrapper.metadata_client, 'get_all_task_defs', side_effect=ConnectionError())
+        register_task_defs = mocker.patch.object(wrapper.metadata_client, 'register_task_defs')
+
+        service.register(wrapper)
+
+        assert len(register_task_defs.call_args.args[0]) == len(service.tasks())